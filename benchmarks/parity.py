@@ -0,0 +1,367 @@
+"""
+Parity harness for alternative implementations of the pattern-based steps of the preprocessing.
+
+The patterns of 'convert_title', 'extract_locations', 'extract_requirements' and 'extract_experience' encode subtle
+rules (the precedence of the title categories and experience patterns, lookbehinds, case sensitivity, the order of the
+splits of the locations), so a faster implementation has to be checked against the reference implementation in
+preprocessing.py. The harness prepares the input of every compared function with the reference pipeline, runs the
+reference and each alternative engine on a copy of it and compares all output columns cell by cell (missing values
+are equal to each other, lists are compared element by element). This is done on a fixed corpus (built-in job ads
+with the edge cases of the patterns or the raw data of a crawl) and on a synthetic corpus (see synthetic_jobs.py). For
+every function, the durations and the speedup of each engine are reported together with the differing cells. The
+harness exits with status 1 if any output differs.
+
+An engine is either 'records' (the feature extraction for single job ads in record_features.py, applied to every row)
+or the name of an importable module that defines some of the compared functions with the same parameters and results
+as preprocessing.py. Has to be executed from the root directory of the repository:
+
+    python benchmarks/parity.py --engines records --num_jobs 5000
+"""
+
+import importlib
+import os
+import sys
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import preprocessing
+from arguments import parse_parity_harness
+from patterns import EXPERIENCE_CATEGORIES
+from record_features import classify_title, split_locations, extract_requirements, extract_experience
+from synthetic_jobs import generate_jobs
+
+
+# steps of the reference pipeline up to the last compared function
+PIPELINE = ["filter_contract_types", "convert_work_types", "convert_title", "extract_experience_level",
+            "convert_salary", "extract_locations", "create_location_features", "convert_industries",
+            "convert_company_size", "extract_requirements", "extract_experience"]
+
+# job ads of the fixed corpus as (title, location, content) with overlapping title categories, notations of locations
+# and phrasings of requirements and experience, further columns are taken from DEFAULT_RECORD
+EDGE_CASES = [
+    ("Senior Data Scientist (m/w/d)", "München, Home Office",
+     "Du hast mindestens 5 Jahre Berufserfahrung mit Python, SQL und Docker."),
+    ("Data Analyst / Software Developer", "Berlin / Hamburg",
+     "You have 3+ years of experience with NoSQL databases and Javascript."),
+    ("Head of Machine Learning", "Frankfurt am Main",
+     "Mehrjährige Berufserfahrung in der Führung von Teams, Promotion in Informatik."),
+    ("KI-Entwickler (m/w/d)", "Frankfurt a.M.",
+     "Erste Berufserfahrung mit R Studio und C++ wünschenswert, Studium der Physik."),
+    ("Mainframe-Entwickler", "Bad Homburg vor der Höhe",
+     "Kenntnisse in Java und C sind von Vorteil, ebenso (R) und Go ."),
+    ("Cloud Architect", "St. Ingbert",
+     "Several years of professional experience with AWS, Azure Synapse and Big Query."),
+    ("Datenbankadministrator", "Raum Stuttgart",
+     "3-5 Jahre einschlägige Erfahrung mit Oracle, MySQL, PostgreSQL und SQL Server."),
+    ("Research Engineer", "Köln oder Bonn",
+     "PhD in computer science, two years professional experience in deep learning and NLP."),
+    ("Trainee Business-Intelligence", "Düsseldorf und Essen",
+     "Berufseinsteiger mit Bachelor und Master in BWL, Excel und Power BI."),
+    ("Junior Consultant Data Warehouse", "Bundesweit",
+     "Gute Kenntnisse in excellent Excel, GitHub und Spark; Kassel ist kein SAS."),
+    ("MLOps Lead", "Stuttgart (Vaihingen)",
+     "Langjährige Erfahrung mit Kubernetes, Kubeflow, MLflow und Terraform."),
+    ("Werkstudent (m/w/d) Statistik", "Hamburg - Altona",
+     "Du studierst Mathematik oder Statistik und hast erste praktische Erfahrung mit Pandas und Numpy."),
+    ("Sachbearbeiter Buchhaltung", "10115 Berlin",
+     "Abgeschlossene kaufmännische Ausbildung, sicherer Umgang mit MS Office."),
+    ("Jr. Data Engineer", "Metropolregion Rhein-Neckar",
+     "1 Jahr Berufserfahrung mit Kafka, Airflow und dbt, Diplom oder Master."),
+    ("Sr. Reporting Specialist", "Leipzig; Dresden",
+     "Fundierte Kenntnisse in Tableau und Looker, zehn Jahre Berufserfahrung."),
+    ("Data Science Consultant", "Berlin + 3 weitere",
+     "Drei Jahre relevante Erfahrung in Regression, Klassifikation und Clustering."),
+    ("Data Scientist", "Home-Office",
+     "Einige Jahre Berufserfahrung in Zeitreihen und Forecasting mit statsmodels."),
+    ("Deep-Learning Researcher", "keine Angabe",
+     "15 Jahre Berufserfahrung mit Tensorflow, Keras und Pytorch sind nicht nötig."),
+    ("Chief Data Officer", "Mannheim, , Heidelberg",
+     "A proven track record, 10+ years relevant experience and leadership skills."),
+    ("AI Product Owner", "Schwäbisch Hall",
+     "Mehr als fünf Jahre Berufserfahrung, analytisches Denkvermögen und Kommunikationsstärke."),
+    ("Statistiker (m/w/d)", "New York",
+     "Mindestens zwei- bis dreijährige Berufserfahrung, strukturierte Arbeitsweise und Sorgfalt."),
+    ("Analytics Engineer", "Hannover (bei Laatzen)",
+     "At least one year of work experience with dbt, Snowflake and Redshift."),
+    ("Software Engineer Python", "Nürnberg, Erlangen, Fürth",
+     "Berufserfahrung wünschenswert, aber keine Voraussetzung; Linux, Bash und Git."),
+    ("Data Engineer Big Data", "Wolfsburg/Braunschweig",
+     "You bring 5 years experience in Hadoop, Hive, HBase and Scala ."),
+    ("Datenanalyst", "Lindau (Bodensee)",
+     "Mehrere Jahre Berufserfahrung im Controlling, gute SAP-Kenntnisse."),
+    ("Machine Learning Engineer", "Remote",
+     "Practical experience with scikit-learn, XGBoost and LightGBM, first experience with FastAPI."),
+    ("Data Scientist NLP", "Potsdam",
+     "Erfahrung mit spaCy, NLTK und Spracherkennung; Neugier und Lernbereitschaft."),
+    ("Business Intelligence Developer", "Dortmund",
+     "2-3 Jahre Erfahrung mit Power BI, DAX und SSAS, C# von Vorteil."),
+    ("Teamleiter Data Science", "Karlsruhe",
+     "Mehrjährige einschlägige Berufserfahrung, davon drei Jahre Führungserfahrung."),
+    ("Quantitative Analyst", "München",
+     "Abgeschlossenes Studium (Mathematik, Physik), Matlab, Julia oder R; 4 Jahre Erfahrung."),
+    ("Computer Vision Engineer", "Ingolstadt",
+     "Erfahrung in Bildverarbeitung, CNN und autonomes Fahren; Robotik ist ein Plus."),
+    ("Praktikant Data Science", "Aachen",
+     "Für Berufseinstieg geeignet, erste Kenntnisse in Python und SQL."),
+]
+DEFAULT_RECORD = {"company": "Beispiel GmbH", "contract_type": "Feste Anstellung",
+                  "work_type": "Vollzeit, Home Office möglich", "company_link": np.nan, "release_date": "2024-05-02",
+                  "salary": np.nan, "company_size": "501-1000", "industry": "IT & Internet|Beratung", "rating": 4.1,
+                  "num_ratings": 120}
+
+
+def convert_title_records(df):
+    """Classifies the job titles with record_features.classify_title."""
+
+    df["title_category"] = [classify_title(title) for title in df["title"]]
+    return df
+
+
+def extract_locations_records(df):
+    """Splits the lists of locations with record_features.split_locations."""
+
+    locations = pd.Series([split_locations(location) for location in df["location"]], index=df.index,
+                          name="location").explode()
+    df_long = df.drop("location", axis=1).join(locations)
+    locations_list = df_long.groupby("link")["location"].apply(lambda x: x.tolist())
+    df = pd.merge(df.drop("location", axis=1), locations_list, on="link", how="left")
+    return df, df_long
+
+
+def extract_requirements_records(df):
+    """Extracts the requirements with record_features.extract_requirements."""
+
+    requirements = pd.DataFrame([extract_requirements(content) for content in df["content"]], index=df.index)
+    return pd.concat([df, requirements], axis=1)
+
+
+def extract_experience_records(df):
+    """Extracts the required professional experience with record_features.extract_experience."""
+
+    experience = [extract_experience(content, level, trainee)
+                  for content, level, trainee in zip(df["content"], df["experience_level"], df["trainee"])]
+    for category in EXPERIENCE_CATEGORIES:
+        df[category] = [experience_bin == category for experience_bin in experience]
+    return df
+
+
+ENGINES = {"records": {"convert_title": convert_title_records, "extract_locations": extract_locations_records,
+                       "extract_requirements": extract_requirements_records,
+                       "extract_experience": extract_experience_records}}
+
+
+def main():
+    """Compares the engines with the reference implementation on both corpora and prints the results."""
+
+    warnings.filterwarnings("ignore")
+    args = parse_parity_harness()
+    engines = {name: load_engine(name, args.functions) for name in args.engines}
+    if args.corpus is None:
+        fixed = create_fixed_corpus()
+    else:
+        fixed = pd.read_csv(args.corpus)
+    corpora = {"fixed corpus": fixed, "synthetic corpus": generate_jobs(args.num_jobs, args.seed)}
+
+    width = max(map(len, engines))
+    identical = True
+    for corpus, df in corpora.items():
+        inputs = prepare_inputs(df, args.functions)
+        print(f"{corpus} ({len(df)} job ads)")
+        for function in args.functions:
+            outputs, reference_seconds = run_function(getattr(preprocessing, function), inputs[function])
+            for name, engine in engines.items():
+                if function not in engine:
+                    continue
+                alternative, seconds = run_function(engine[function], inputs[function])
+                differences, cells = compare_outputs(outputs, alternative)
+                identical = identical and not differences and not cells
+                print(f"  {function:<22} reference {reference_seconds:8.3f} s   {name:>{width}} {seconds:8.3f} s   "
+                      f"speedup {reference_seconds / max(seconds, 1e-9):6.1f}x   "
+                      f"{'identical' if not differences and not cells else f'{len(cells)} differing cells'}")
+                for difference in differences:
+                    print(f"    {difference}")
+                for link, column, expected, actual in cells[:args.examples]:
+                    print(f"    {link} {column}: {expected!r} (reference) != {actual!r} ({name})")
+    if not identical:
+        sys.exit(1)
+    print("all outputs are identical")
+    return None
+
+
+def load_engine(name, functions):
+    """Loads the functions of an alternative engine.
+
+    Parameters
+    ----------
+    name: str
+        'records' or the name of an importable module
+    functions: list
+        names of the compared functions
+
+    Returns
+    -------
+    engine: dict
+        implementation of every compared function that the engine provides
+    """
+
+    if name in ENGINES:
+        return {function: ENGINES[name][function] for function in functions if function in ENGINES[name]}
+    module = importlib.import_module(name)
+    return {function: getattr(module, function) for function in functions if hasattr(module, function)}
+
+
+def create_fixed_corpus():
+    """Creates the raw data of the built-in job ads.
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        job ads with the columns of 'data_raw.csv'
+    """
+
+    records = [dict(DEFAULT_RECORD, link=f"https://www.stepstone.de/stellenangebote--parity--{i}.html", title=title,
+                    location=location, content=content)
+               for i, (title, location, content) in enumerate(EDGE_CASES)]
+    # trainee positions, a repost with a different link and a job ad without location (the reference cannot handle job
+    # ads without description)
+    records[8]["contract_type"] = "Trainee"
+    records[31]["contract_type"] = "Feste Anstellung, Trainee"
+    records.append(dict(records[0], link="https://www.stepstone.de/stellenangebote--parity--repost.html"))
+    records.append(dict(records[1], link="https://www.stepstone.de/stellenangebote--parity--no-location.html",
+                        location=np.nan))
+    return pd.DataFrame(records)
+
+
+def prepare_inputs(df, functions):
+    """Runs the reference pipeline and keeps the input of every compared function.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        raw data
+    functions: list
+        names of the compared functions
+
+    Returns
+    -------
+    inputs: dict
+        input dataframe of every compared function
+    """
+
+    inputs = {}
+    last = max(PIPELINE.index(function) for function in functions)
+    for step in PIPELINE[:last + 1]:
+        if step in functions:
+            inputs[step] = df.copy()
+        if step == "extract_locations":
+            df, _ = preprocessing.extract_locations(df)
+        elif step == "create_location_features":
+            df = preprocessing.create_location_features(df, None, False)
+        else:
+            df = getattr(preprocessing, step)(df)
+    return inputs
+
+
+def run_function(function, df):
+    """Runs a function on a copy of its input and measures the duration.
+
+    Parameters
+    ----------
+    function: callable
+        compared function
+    df: pandas.DataFrame
+        input of the function
+
+    Returns
+    -------
+    outputs: tuple
+        resulting dataframes (e.g. the wide and long format of extract_locations)
+    seconds: float
+        duration of the function
+    """
+
+    df = df.copy()
+    start = time.perf_counter()
+    outputs = function(df)
+    seconds = time.perf_counter() - start
+    return (outputs if isinstance(outputs, tuple) else (outputs,)), seconds
+
+
+def compare_outputs(expected, actual):
+    """Compares the outputs of the reference and an alternative engine cell by cell.
+
+    Parameters
+    ----------
+    expected: tuple
+        dataframes of the reference
+    actual: tuple
+        dataframes of the alternative engine
+
+    Returns
+    -------
+    differences: list
+        differences of the structure (number of outputs, columns, index and data types)
+    cells: list
+        link, column and both values of every differing cell
+    """
+
+    if len(expected) != len(actual):
+        return [f"{len(actual)} instead of {len(expected)} results"], []
+    differences = []
+    cells = []
+    for expected_df, actual_df in zip(expected, actual):
+        missing = [column for column in expected_df.columns if column not in actual_df.columns]
+        extra = [column for column in actual_df.columns if column not in expected_df.columns]
+        if missing:
+            differences.append(f"missing columns: {', '.join(map(str, missing))}")
+        if extra:
+            differences.append(f"additional columns: {', '.join(map(str, extra))}")
+        if not missing and not extra and list(expected_df.columns) != list(actual_df.columns):
+            differences.append("different order of the columns")
+        if not expected_df.index.equals(actual_df.index):
+            differences.append(f"different index ({len(actual_df)} instead of {len(expected_df)} rows)")
+            continue
+        links = expected_df["link"] if "link" in expected_df.columns else pd.Series(expected_df.index)
+        for column in [column for column in expected_df.columns if column in actual_df.columns]:
+            if expected_df[column].dtype != actual_df[column].dtype:
+                differences.append(f"data type of {column}: {actual_df[column].dtype} instead of "
+                                   f"{expected_df[column].dtype}")
+            for link, expected_value, actual_value in zip(links, expected_df[column], actual_df[column]):
+                if not equal_values(expected_value, actual_value):
+                    cells.append((link, column, expected_value, actual_value))
+    return differences, cells
+
+
+def equal_values(expected, actual):
+    """Checks if two cells are equal (missing values are equal to each other, lists are compared element-wise).
+
+    Parameters
+    ----------
+    expected: object
+        value of the reference
+    actual: object
+        value of the alternative engine
+
+    Returns
+    -------
+    equal: bool
+        if both values are equal
+    """
+
+    if isinstance(expected, (list, np.ndarray)) or isinstance(actual, (list, np.ndarray)):
+        if not isinstance(expected, (list, np.ndarray)) or not isinstance(actual, (list, np.ndarray)):
+            return False
+        return len(expected) == len(actual) and all(map(equal_values, expected, actual))
+    if pd.isna(expected) or pd.isna(actual):
+        return bool(pd.isna(expected) and pd.isna(actual))
+    # True and "True" are different, but numpy and Python scalars of the same value are not
+    return isinstance(expected, str) == isinstance(actual, str) and bool(expected == actual)
+
+
+if __name__ == "__main__":
+    main()
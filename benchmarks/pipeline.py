@@ -0,0 +1,232 @@
+"""
+Benchmark of the preprocessing and the analyses of the web app on synthetic job ads (see synthetic_jobs.py).
+
+Every step of the preprocessing (without the Positionstack API) and the creation of the data structures of the
+requirement analysis, the job recommendation and the search for similar job ads is run at several numbers of job ads.
+The stages are measured with pipeline_report.run_stage, like the steps of the preprocessing. Every stage is timed
+several times on a copy of its input without tracing the memory allocations; the fastest and the median run are
+reported. The peak of the memory allocated by Python during the stage is measured with tracemalloc in a separate run,
+which also provides the input of the next stage. The results can be saved as baseline, and later runs are compared with
+it: a stage whose fastest time or peak memory increased by more than the tolerance is reported as regression and the
+benchmark exits with status 1. Since the results depend on the machine, the baseline is not part of
+the repository. Has to be executed from the root directory of the repository:
+
+    python benchmarks/pipeline.py --scales 1000 10000 100000 --save_baseline
+    python benchmarks/pipeline.py --scales 1000 10000 100000
+"""
+
+import json
+import os
+import sys
+import tracemalloc
+import warnings
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from arguments import parse_pipeline_benchmark
+from preprocessing import (filter_contract_types, convert_work_types, convert_title, extract_experience_level,
+                           convert_salary, extract_locations, create_location_features, convert_industries,
+                           convert_company_size, extract_requirements, extract_experience, remove_duplicates)
+from recommendation_engine import create_engine, recommend
+from requirement_cube import create_cube, lookup_percentages
+from near_duplicates import create_index, remove_near_duplicates
+from pipeline_report import create_report, run_stage
+from similar_jobs import relevant_job_features, create_similarity_index, find_similar_jobs
+from skill_matrix import pack_flags, select_rows
+from synthetic_jobs import generate_jobs
+
+
+# increases below these limits are treated as noise, even if they exceed the tolerance
+MIN_SECONDS = 0.05
+MIN_MEGABYTES = 1.0
+
+
+def analyse_requirements(state):
+    """Creates the cube of the requirement analysis and looks up the percentages without filters."""
+
+    cube = create_cube(state["df"], state["skills"])
+    lookup_percentages(cube, "All", "All", "All")
+    return {"cube": cube}
+
+
+def recommend_jobs(state):
+    """Creates the matching engine of the job recommendation and recommends jobs for one applicant."""
+
+    relevant = (state["df"]["title_category"] != "Others").to_numpy()
+    engine = create_engine(state["df"].loc[relevant], select_rows(state["skills"], relevant))
+    recommend(engine, "Much (>=5 years)", "Phd", "All", ["python", "sql", "aws"], 1, 10)
+    return {"engine": engine}
+
+
+def find_similar(state):
+    """Creates the nearest-neighbour index and finds the job ads that are similar to the first one."""
+
+    index = create_similarity_index(*relevant_job_features(state["df"], state["skills"]))
+    if len(index["links"]) > 0:
+        find_similar_jobs(index, index["links"][0], 10)
+    return {"index": index}
+
+
+# every stage receives the results of the previous stages and returns the ones that it creates or changes
+STAGES = [
+    ("filter_contract_types", lambda state: {"df": filter_contract_types(state["df"])}),
+    ("convert_work_types", lambda state: {"df": convert_work_types(state["df"])}),
+    ("convert_title", lambda state: {"df": convert_title(state["df"])}),
+    ("extract_experience_level", lambda state: {"df": extract_experience_level(state["df"])}),
+    ("convert_salary", lambda state: {"df": convert_salary(state["df"])}),
+    ("extract_locations", lambda state: dict(zip(["df", "df_long"], extract_locations(state["df"])))),
+    ("create_location_features", lambda state: {"df": create_location_features(state["df"], None, False)}),
+    ("convert_industries", lambda state: {"df": convert_industries(state["df"])}),
+    ("convert_company_size", lambda state: {"df": convert_company_size(state["df"])}),
+    ("extract_requirements", lambda state: {"df": extract_requirements(state["df"])}),
+    ("extract_experience", lambda state: {"df": extract_experience(state["df"])}),
+    ("remove_duplicates", lambda state: {"df": remove_duplicates(state["df"])}),
+    ("remove_near_duplicates", lambda state: {"df": remove_near_duplicates(state["df"], create_index(), 0.8)}),
+    ("pack_flags", lambda state: {"skills": pack_flags(state["df"])}),
+    ("requirements_analysis", analyse_requirements),
+    ("job_recommendation", recommend_jobs),
+    ("similar_jobs", find_similar),
+]
+
+
+def main():
+    """Runs the stages at all scales and saves the results as baseline or compares them with the baseline."""
+
+    warnings.filterwarnings("ignore")
+    args = parse_pipeline_benchmark()
+    # the first run compiles the regular expressions of the patterns, which should not be part of the measurement
+    run_stages(generate_jobs(100, args.seed), 1)
+    results = {}
+    for scale in args.scales:
+        print(f"{scale} job ads (fastest and median of {args.repeat} runs)")
+        results[str(scale)] = run_stages(generate_jobs(scale, args.seed), args.repeat)
+        for stage, result in results[str(scale)].items():
+            print(f"  {stage:<26} {result['rows_in']:>8} -> {result['rows_out']:>8} rows "
+                  f"{result['seconds']:10.3f} s {result['median_seconds']:10.3f} s "
+                  f"{result['peak_megabytes']:10.1f} MB")
+        print(f"  {'total':<26} {'':>21}      {sum(r['seconds'] for r in results[str(scale)].values()):10.3f} s "
+              f"{sum(r['median_seconds'] for r in results[str(scale)].values()):10.3f} s")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump({"seed": args.seed, "scales": results}, file, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return None
+    try:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+    except FileNotFoundError:
+        print(f"No baseline found at {args.baseline} (create it with --save_baseline).")
+        return None
+    if baseline["seed"] != args.seed:
+        print(f"The baseline was created with seed {baseline['seed']}, the results are not comparable.")
+        return None
+    regressions = find_regressions(results, baseline["scales"], args.tolerance)
+    for regression in regressions:
+        print(f"regression: {regression}")
+    if regressions:
+        sys.exit(1)
+    print(f"no regressions compared with {args.baseline} (tolerance {args.tolerance:.0%})")
+    return None
+
+
+def run_stages(df, repeat):
+    """Runs all stages on the job ads and measures them.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        raw data
+    repeat: int
+        number of timed runs of every stage
+
+    Returns
+    -------
+    results: dict
+        number of job ads before and after, fastest and median wall time and peak memory of every stage
+    """
+
+    state = {"df": df}
+    results = {}
+    for stage, function in STAGES:
+        rows_in = len(state["df"])
+        seconds = [measure_stage(function, state, False)[1]["wall_seconds"] for _ in range(repeat)]
+        result, measurements = measure_stage(function, state, True)
+        state.update(result)
+        results[stage] = {"rows_in": rows_in, "rows_out": len(state["df"]), "seconds": min(seconds),
+                          "median_seconds": float(np.median(seconds)), "peak_megabytes": measurements["peak_memory_mb"]}
+    return results
+
+
+def measure_stage(function, state, memory):
+    """Runs a stage once with pipeline_report.run_stage.
+
+    The stage receives a copy of the job ads, since some steps of the preprocessing change their input.
+
+    Parameters
+    ----------
+    function: callable
+        stage
+    state: dict
+        results of the previous stages
+    memory: bool
+        if the peak memory should be measured (the allocations are only traced during this run)
+
+    Returns
+    -------
+    result: dict
+        results that the stage creates or changes
+    measurements: dict
+        measurements of the run (see pipeline_report.run_stage)
+    """
+
+    report = create_report(memory=memory)
+    state = dict(state, df=state["df"].copy())
+    result = run_stage(report, function, state)
+    if memory:
+        tracemalloc.stop()
+    measurements = next(iter(report["stages"].values()))
+    return result, measurements
+
+
+def find_regressions(results, baseline, tolerance):
+    """Compares the results with the baseline.
+
+    Parameters
+    ----------
+    results: dict
+        results of every stage per scale
+    baseline: dict
+        saved results of every stage per scale
+    tolerance: float
+        relative increase that counts as regression
+
+    Returns
+    -------
+    regressions: list
+        description of every stage and measure that increased by more than the tolerance (only scales and stages that
+        are part of both are compared)
+    """
+
+    regressions = []
+    for scale, stages in results.items():
+        for stage, result in stages.items():
+            previous = baseline.get(scale, {}).get(stage)
+            if previous is None:
+                continue
+            for measure, unit, noise in [("seconds", "s", MIN_SECONDS), ("peak_megabytes", "MB", MIN_MEGABYTES)]:
+                increase = result[measure] - previous[measure]
+                if increase > noise and increase > tolerance * previous[measure]:
+                    regressions.append(f"{stage} with {scale} job ads: {previous[measure]:.3f} {unit} -> "
+                                       f"{result[measure]:.3f} {unit} (+{increase / max(previous[measure], 1e-9):.0%})")
+            if result["rows_out"] != previous["rows_out"]:
+                regressions.append(f"{stage} with {scale} job ads: {previous['rows_out']} -> {result['rows_out']} "
+                                   f"job ads after the stage")
+    return regressions
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Benchmark of the feature extraction for the online salary estimation.
+
+Compares the latency of 'preprocessing.preprocess_data' (one-row dataframe through the pandas pipeline) with
+'record_features.extract_features' (plain dictionary with precompiled patterns) and checks that both paths produce the
+same feature vector and salary estimate. Has to be executed from the root directory of the repository:
+
+    python benchmarks/salary_features.py --directory data
+"""
+
+import contextlib
+import io
+import os
+import sys
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from arguments import parse_feature_benchmark
+from preprocessing import preprocess_data
+from record_features import extract_features
+
+
+SAMPLE_RECORDS = [
+    {"link": "https://www.stepstone.de/stellenangebote--Senior-Data-Scientist-Muenchen--1.html",
+     "company": "Beispiel GmbH", "title": "Senior Data Scientist (m/w/d)", "location": "München, Home Office",
+     "contract_type": "Feste Anstellung", "work_type": "Vollzeit, Home Office möglich",
+     "content": "Deine Aufgaben: Entwicklung von Machine Learning Modellen mit Python, SQL und PyTorch. Dein Profil: "
+                "abgeschlossenes Studium der Informatik oder Mathematik, mindestens 5 Jahre Berufserfahrung, "
+                "Erfahrung mit AWS, Docker und Spark, analytisches Denken und Kommunikationsstärke.",
+     "company_link": np.nan, "release_date": "2024-05-02", "company_size": "10,001+",
+     "industry": "IT & Internet|Beratung", "rating": 4.1, "num_ratings": 120},
+    {"link": "https://www.stepstone.de/stellenangebote--Junior-Data-Analyst-Berlin--2.html",
+     "company": "Muster AG", "title": "Junior Data Analyst", "location": "Berlin / Hamburg",
+     "contract_type": "Feste Anstellung", "work_type": "Vollzeit",
+     "content": "Your tasks: reporting with Tableau and Power BI, data preparation with Excel and SQL. Your profile: "
+                "Bachelor degree in business or statistics, first professional experience, teamwork and curiosity.",
+     "company_link": np.nan, "release_date": "2024-05-10", "company_size": "251-500",
+     "industry": "Banken", "rating": np.nan, "num_ratings": np.nan},
+    {"link": "https://www.stepstone.de/stellenangebote--Data-Engineer-Frankfurt--3.html",
+     "company": "Daten KG", "title": "Data Engineer Cloud (w/m/d)", "location": "Frankfurt am Main",
+     "contract_type": "Feste Anstellung, Trainee", "work_type": "Vollzeit, Teilzeit, Home Office möglich",
+     "content": "Aufbau von Datenpipelines mit Airflow, Kafka und Databricks auf Azure. Kenntnisse in Scala oder Java "
+                "sowie Terraform und Kubernetes. Mehrjährige Berufserfahrung im Data Engineering, Master oder "
+                "Promotion in Informatik, selbstständige und strukturierte Arbeitsweise.",
+     "company_link": np.nan, "release_date": "2024-04-22", "company_size": "1001-2500",
+     "industry": np.nan, "rating": 3.8, "num_ratings": 15},
+]
+
+
+def main():
+    """Runs the benchmark and prints the latencies of both feature extraction paths."""
+
+    warnings.filterwarnings("ignore")
+    args = parse_feature_benchmark()
+    model = joblib.load("models/model.joblib")
+    columns = model["imputer"].feature_names_in_
+    try:
+        records = pd.read_csv(os.path.join(args.directory, "data_raw.csv")).drop("salary", axis=1, errors="ignore")
+        records = records.head(args.num_records).to_dict("records")
+    except FileNotFoundError:
+        print("No raw data found in directory, the built-in sample job ads are used.")
+        records = (SAMPLE_RECORDS * args.num_records)[:args.num_records]
+
+    timings = {"preprocess_data": [], "extract_features": []}
+    mismatches = 0
+    for record in records:
+        # the messages about unsupported contract types are not relevant for the benchmark
+        with contextlib.redirect_stdout(io.StringIO()):
+            reference, reference_time = measure(preprocess_data, record, args.repeat)
+            (features, _), features_time = measure(extract_features, record, args.repeat)
+        if reference is None:
+            continue
+        timings["preprocess_data"].append(reference_time)
+        timings["extract_features"].append(features_time)
+        reference = reference[columns]
+        features = pd.DataFrame([features])[columns]
+        if not (reference.astype("object").equals(features.astype("object"))
+                and np.allclose(model.predict(reference), model.predict(features))):
+            mismatches += 1
+
+    print(f"{len(timings['preprocess_data'])} job ads, {args.repeat} repetitions each")
+    for name, values in timings.items():
+        values = np.array(values) * 1000
+        print(f"{name:<20} median {np.median(values):8.3f} ms   p95 {np.percentile(values, 95):8.3f} ms")
+    speedup = np.median(timings["preprocess_data"]) / np.median(timings["extract_features"])
+    print(f"speedup (median): {speedup:.1f}x")
+    print(f"job ads with different features or predictions: {mismatches}")
+    return None
+
+
+def measure(function, record, repeat):
+    """Measures the fastest execution time of a feature extraction function.
+
+    Parameters
+    ----------
+    function: callable
+        feature extraction function
+    record: dict
+        scraped information of a job ad
+    repeat: int
+        number of repetitions
+
+    Returns
+    -------
+    result: pandas.DataFrame or dict
+        result of the last execution
+    seconds: float
+        fastest execution time in seconds
+    """
+
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(dict(record))
+        seconds.append(time.perf_counter() - start)
+    return result, min(seconds)
+
+
+if __name__ == "__main__":
+    main()
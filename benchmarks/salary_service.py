@@ -0,0 +1,93 @@
+"""
+Load test of the salary service.
+
+Starts the service on a free local port, sends already scraped job ads from several concurrent clients and reports the
+latency and throughput measured by the clients as well as the metrics of the service (including the mean size of the
+micro-batches). No requests leave the local machine. Has to be executed from the root directory of the repository:
+
+    python benchmarks/salary_service.py --directory data --num_requests 2000 --concurrency 16
+"""
+
+import concurrent.futures
+import json
+import os
+import sys
+import threading
+import time
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from arguments import parse_service_load_test
+from salary_features import SAMPLE_RECORDS
+from salary_service import create_server
+
+
+def main():
+    """Runs the load test and prints the results."""
+
+    args = parse_service_load_test()
+    try:
+        records = pd.read_csv(os.path.join(args.directory, "data_raw.csv")).drop("salary", axis=1, errors="ignore")
+        # missing values are sent as null
+        records = records.astype(object).where(records.notna(), None).to_dict("records")
+    except FileNotFoundError:
+        print("No raw data found in directory, the built-in sample job ads are used.")
+        records = SAMPLE_RECORDS
+    bodies = [json.dumps({"records": [records[(i * args.records + j) % len(records)] for j in range(args.records)]},
+                         default=str).encode() for i in range(args.num_requests)]
+
+    server = create_server("models/model.joblib", "models/predictor.json", 0, args.directory, args.batch_size,
+                           args.wait / 1000)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://localhost:{server.server_address[1]}"
+    # the first request loads the geographic data, which should not be part of the measurement
+    send_request(url + "/estimate", bodies[0])
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        latencies = list(executor.map(lambda body: send_request(url + "/estimate", body), bodies))
+    seconds = time.perf_counter() - start
+    with urllib.request.urlopen(url + "/metrics") as response:
+        metrics = json.loads(response.read())
+    server.shutdown()
+    server.server_close()
+
+    latencies = np.array(latencies) * 1000
+    print(f"{args.num_requests} requests with {args.records} job ads each, {args.concurrency} concurrent clients")
+    print(f"client   p50 {np.percentile(latencies, 50):8.2f} ms   p99 {np.percentile(latencies, 99):8.2f} ms   "
+          f"{args.num_requests / seconds:8.1f} requests/s   "
+          f"{args.num_requests * args.records / seconds:8.1f} job ads/s")
+    print(f"service  p50 {metrics['p50_ms']:8.2f} ms   p99 {metrics['p99_ms']:8.2f} ms   "
+          f"mean batch size {metrics['mean_batch_size']:.1f}   job ads without estimate {metrics['errors']}")
+    return None
+
+
+def send_request(url, body):
+    """Sends a request to the service and measures its latency.
+
+    Parameters
+    ----------
+    url: str
+        URL of the endpoint
+    body: bytes
+        JSON body of the request
+
+    Returns
+    -------
+    seconds: float
+        time until the complete answer was received
+    """
+
+    start = time.perf_counter()
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
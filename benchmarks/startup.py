@@ -0,0 +1,154 @@
+"""
+Benchmark of the start of the web app.
+
+Measures the time needed to import 'webapp' and the time until the first page is rendered, as well as the time until
+each of the other pages is rendered for the first time. Every measurement runs in a fresh Python process, so that no
+module is imported before and the caches of Streamlit are empty (as after a cold start of a container). The pages are
+rendered with Streamlit's testing framework, so no browser is needed. The heavy dependencies that are loaded by the
+import are reported, except for the ones that Streamlit loads itself.
+
+The web app loads 'data/' and 'models/' relative to the working directory. By default, synthetic job ads (see
+synthetic_jobs.py) are preprocessed into 'data/' of a temporary folder (with the geographic data of the repository), so
+that the pages are rendered with data, and the models of the repository are copied next to it. Has to be executed
+from the root directory of the repository:
+
+    python benchmarks/startup.py --repeat 5 --num_jobs 2000
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from arguments import parse_startup_benchmark
+from location_counts import create_location_counts, save_location_counts
+from preprocessing import integrate_geo_data, preprocess_in_memory
+from synthetic_jobs import generate_jobs
+
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+PAGES = ["Requirements Analysis", "Geographical Analysis", "Salary Estimation", "Job Recommendation"]
+# heavy dependencies that should only be imported by the pages that need them
+HEAVY_MODULES = ["sklearn", "scipy", "selenium", "webdriver_manager", "joblib", "plotly"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import webapp
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "modules": [name for name in {modules!r} if name in sys.modules]}}))
+"""
+
+STREAMLIT_SCRIPT = """
+import json, sys
+import streamlit
+print(json.dumps({{"modules": [name for name in {modules!r} if name in sys.modules]}}))
+"""
+
+RENDER_SCRIPT = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+sys.path.insert(0, {src!r})
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({webapp!r}, default_timeout=300)
+app.run()
+seconds = {{"first render": time.perf_counter() - start}}
+for page in {pages!r}[1:]:
+    start = time.perf_counter()
+    app.sidebar.selectbox[0].select(page).run()
+    seconds[page] = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "exceptions": [exception.message for exception in app.exception]}}))
+"""
+
+
+def main():
+    """Runs the benchmark and prints the median times of all measurements."""
+
+    args = parse_startup_benchmark()
+    with tempfile.TemporaryDirectory(prefix="startup_") as directory:
+        if args.repository_data:
+            directory = os.getcwd()
+        else:
+            print(f"preprocessing {args.num_jobs} synthetic job ads")
+            create_data(directory, args.num_jobs, args.seed)
+        imports = [run_script(IMPORT_SCRIPT.format(src=SRC, modules=HEAVY_MODULES), directory)
+                   for _ in range(args.repeat)]
+        renders = [run_script(RENDER_SCRIPT.format(src=SRC, webapp=os.path.join(SRC, "webapp.py"), pages=PAGES),
+                              directory) for _ in range(args.repeat)]
+        streamlit_modules = run_script(STREAMLIT_SCRIPT.format(modules=HEAVY_MODULES), directory)["modules"]
+
+    print(f"{args.repeat} fresh processes per measurement")
+    print(f"{'import webapp':<40} median {np.median([result['seconds'] for result in imports]) * 1000:8.1f} ms")
+    for name in renders[0]["seconds"]:
+        label = f"{PAGES[0]} (first render)" if name == "first render" else f"{name} (first visit)"
+        print(f"{label:<40} median {np.median([result['seconds'][name] for result in renders]) * 1000:8.1f} ms")
+    modules = [name for name in imports[0]["modules"] if name not in streamlit_modules]
+    print(f"heavy modules loaded by the import (besides the ones of streamlit): {', '.join(modules) or 'none'}")
+    exceptions = sorted({exception for result in renders for exception in result["exceptions"]})
+    if exceptions:
+        print(f"exceptions while rendering: {'; '.join(exceptions)}")
+    return None
+
+
+def create_data(directory, num_jobs, seed):
+    """Creates the data and the models of the web app from synthetic job ads in a folder.
+
+    The geographic information is taken from 'data/geo_data.csv' of the repository instead of the Positionstack API.
+
+    Parameters
+    ----------
+    directory: str
+        folder in which 'data/' and 'models/' are created
+    num_jobs: int
+        number of synthetic job ads
+    seed: int
+        seed of the generator of the synthetic job ads
+    """
+
+    data_directory = os.path.join(directory, "data")
+    os.makedirs(data_directory)
+    shutil.copy(os.path.join("data", "geo_data.csv"), data_directory)
+    if os.path.isdir("models"):
+        shutil.copytree("models", os.path.join(directory, "models"))
+    warnings.filterwarnings("ignore")
+    preprocess_in_memory(generate_jobs(num_jobs, seed), data_directory, False)
+    data_long = integrate_geo_data(pd.read_csv(os.path.join(data_directory, "data_long.csv")), data_directory)
+    data_long.to_csv(os.path.join(data_directory, "data_long.csv"), index=False)
+    save_location_counts(create_location_counts(data_long), os.path.join(data_directory, "location_counts.csv"))
+    return None
+
+
+def run_script(script, directory):
+    """Runs a measurement in a fresh Python process.
+
+    Parameters
+    ----------
+    script: str
+        Python code that prints the results as JSON in its last line
+    directory: str
+        working directory of the process (contains 'data/' and 'models/')
+
+    Returns
+    -------
+    result: dict
+        results of the measurement
+    """
+
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=directory).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result
+
+
+if __name__ == "__main__":
+    main()
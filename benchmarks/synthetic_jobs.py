@@ -0,0 +1,405 @@
+"""
+Generator of synthetic job ads in the format of 'data_raw.csv' (the output of the webscraper).
+
+The job ads mimic the scraped data of Stepstone: German or English texts with tasks, requirements (skills, degrees,
+knowledge, soft skills and professional experience in the phrasings of patterns.py) and benefits, titles with
+experience levels, lists of locations in the different notations of the website, contract and work types, salary
+ranges for a part of the job ads and companies with consistent size, industry and rating. A small share of the job ads
+are reposts of other job ads, so that the removal of duplicates has work to do. The same seed always produces the same
+job ads. Has to be executed from the root directory of the repository:
+
+    python benchmarks/synthetic_jobs.py --num_jobs 100000 --output data_synthetic/data_raw.csv
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from arguments import parse_synthetic_jobs
+
+
+TITLES = ["Data Scientist", "Data Analyst", "Data Engineer", "Machine Learning Engineer", "Software Developer Python",
+          "Business Intelligence Analyst", "Data Science Consultant", "Head of Data", "Cloud Data Architect",
+          "AI Engineer", "Research Scientist", "Reporting Specialist", "Team Lead Analytics", "MLOps Engineer",
+          "Werkstudent Data Science", "Datenbankentwickler", "Projektmanager", "IT-Berater Data Warehouse",
+          "Sachbearbeiter Controlling", "IT-Systemadministrator"]
+LEVELS = ["", "", "", "Junior ", "Senior ", "Sr. ", "Jr. "]
+TITLE_SUFFIXES = [" (m/w/d)", " (w/m/d)", " (all genders)", " (m/f/d)", ""]
+CITIES = ["Berlin", "München", "Hamburg", "Frankfurt am Main", "Köln", "Stuttgart", "Düsseldorf", "Leipzig", "Dresden",
+          "Hannover", "Nürnberg", "Bremen", "Essen", "Dortmund", "Mannheim", "Karlsruhe", "Bonn", "Münster", "Aachen",
+          "Heidelberg", "Walldorf", "Darmstadt", "Wiesbaden", "Mainz", "Freiburg im Breisgau", "Ulm", "Augsburg",
+          "Regensburg", "Ingolstadt", "Wolfsburg", "Braunschweig", "Kiel", "Rostock", "Potsdam", "Erlangen",
+          "Bad Homburg", "Sankt Augustin", "Jena", "Kassel", "Paderborn"]
+REMOTE = ["Home Office", "Bundesweit", "Remote", "Deutschlandweit"]
+LOCATION_SEPARATORS = [", ", " / ", " oder ", " und ", ", "]
+CONTRACT_TYPES = ["Feste Anstellung"] * 14 + ["Feste Anstellung, Trainee", "Trainee", "Befristeter Vertrag",
+                                               "Praktikum", "Studentenjobs, Werkstudent", "Freie Mitarbeit"]
+WORK_TYPES = ["Vollzeit"] * 4 + ["Vollzeit, Home Office möglich"] * 4 + ["Teilzeit", "Vollzeit, Teilzeit",
+                                                                         "Vollzeit, Teilzeit, Home Office möglich"]
+COMPANY_SIZES = ["0-50", "51-250", "251-500", "501-1000", "1001-2500", "2501-5000", "5001-10,000", "10,001+",
+                 "11-50", "1000+", "201-500 Mitarbeiter", np.nan]
+INDUSTRIES = ["IT & Internet", "Beratung", "Banken", "Versicherungen", "Automobil", "Pharma", "Handel",
+              "Energiewirtschaft", "Telekommunikation", "Öffentlicher Dienst", "Maschinenbau", "Medien"]
+COMPANY_PREFIXES = ["Nord", "Süd", "Rhein", "Alpen", "Data", "Info", "Tech", "Euro", "Main", "Elb", "Isar", "Spree"]
+COMPANY_SUFFIXES = ["Analytics", "Systems", "Solutions", "Consulting", "Software", "Bank", "Versicherung", "Digital",
+                    "Logistik", "Energie", "Mobility", "Health"]
+LEGAL_FORMS = ["GmbH", "AG", "SE", "GmbH & Co. KG", "KGaA"]
+# mentions of requirements in the phrasings of patterns.REQUIREMENT_PATTERNS (the popular skills are mentioned in the
+# given share of the job ads, the other skills are picked uniformly)
+POPULAR_SKILLS = {"Python": 0.6, "SQL": 0.5, "Excel": 0.2, "Power BI": 0.15, "AWS": 0.2, "Azure": 0.2, "Docker": 0.15,
+                  "Spark": 0.15, "Git": 0.15, "Tableau": 0.1}
+SKILLS = ["R", "Java ", "Javascript", "C++", "C#", "Scala ", "Julia", "Matlab", "Go ", "Perl", "HTML", "CSS", "Rust",
+          "Hadoop", "Hive", "Kafka", "Google Cloud", "Linux", "Kubernetes", "Jenkins", "Airflow", "Databricks", "SAS",
+          "Spss", "Terraform", "MLflow", "Kubeflow", "Looker", "MySQL", "PostgreSQL", "Oracle", "SQL Server", "SQLite",
+          "DB2", "Redshift", "BigQuery", "Synapse", "Snowflake", "Redis", "MongoDB", "Cassandra", "HBase", "Neo4j",
+          "Elasticsearch", "Pandas", "NumPy", "TensorFlow", "Keras", "PyTorch", "Matplotlib", "Seaborn",
+          "scikit-learn", "Plotly", "spaCy", "NLTK", "SciPy", "statsmodels", "Flask", "FastAPI", "Dask", "XGBoost",
+          "PySpark", "NoSQL"]
+KNOWLEDGE_DE = ["Machine Learning", "Deep Learning", "neuronalen Netzen", "Computer Vision", "NLP", "autonomes Fahren",
+                "Robotik", "Reinforcement Learning", "Regression", "Klassifikation", "Clustering", "Zeitreihen",
+                "Empfehlungssystemen", "Anomalie-Erkennung", "Bildverarbeitung"]
+KNOWLEDGE_EN = ["machine learning", "deep learning", "neural networks", "computer vision",
+                "natural language processing", "autonomous driving", "robotics", "reinforcement learning",
+                "regression", "classification", "clustering", "forecasting", "recommender systems",
+                "anomaly detection", "time series"]
+DEGREES_DE = ["ein abgeschlossenes Studium der {major}", "einen Master in {major}", "eine Promotion in {major}",
+              "ein Bachelor- oder Masterstudium der {major}", "einen Hochschulabschluss in {major}",
+              "eine vergleichbare Ausbildung"]
+DEGREES_EN = ["a degree in {major}", "a master's degree in {major}", "a PhD in {major}",
+              "a bachelor's degree in {major} or a related field", "comparable practical experience"]
+MAJORS_DE = ["Informatik", "Mathematik", "Statistik", "Physik", "Wirtschaftsinformatik", "Ingenieurwissenschaften",
+             "Betriebswirtschaft", "Naturwissenschaften", "Volkswirtschaftslehre"]
+MAJORS_EN = ["computer science", "mathematics", "statistics", "physics", "engineering", "economics",
+             "natural sciences", "informatics"]
+NUMBERS_DE = ["1", "2", "3", "4", "5", "7", "10", "zwei", "drei", "fünf", "mehrere", "mehrjährige", "erste"]
+NUMBERS_EN = ["1", "2", "3", "5", "7", "two", "three", "five", "several", "multiple", "first"]
+EXPERIENCE_DE = ["{number} Jahre Berufserfahrung", "mindestens {number} Jahre relevante Erfahrung",
+                 "{number} Jahre einschlägige Erfahrung", "{number}jährige Berufserfahrung", "{number} Berufserfahrung",
+                 "Berufseinsteiger sind willkommen", "{number} Jahre praktische Erfahrung"]
+EXPERIENCE_EN = ["{number} years of experience", "at least {number} years of professional experience",
+                 "{number}+ years relevant experience", "{number} professional experience",
+                 "{number} years work experience"]
+SOFT_SKILLS_DE = ["Teamfähigkeit", "Kommunikationsstärke", "analytisches Denkvermögen", "Neugier und Lernbereitschaft",
+                  "Kreativität", "Führungskompetenz", "Belastbarkeit", "unternehmerisches Denken",
+                  "selbstständige Arbeitsweise", "sorgfältige Arbeitsweise", "strukturiertes Arbeiten"]
+SOFT_SKILLS_EN = ["teamwork", "communication skills", "analytical thinking", "curiosity and willingness to learn",
+                  "creativity", "leadership skills", "flexibility", "problem solving skills", "strong ownership",
+                  "storytelling"]
+TASKS_DE = ["Du entwickelst Modelle zur Vorhersage von {topic} und bringst sie in Produktion.",
+            "Du analysierst große Datenmengen und leitest Handlungsempfehlungen für {topic} ab.",
+            "Du baust skalierbare Datenpipelines für {topic} auf und betreust sie.",
+            "Du arbeitest eng mit den Fachbereichen zusammen und berätst sie zu {topic}.",
+            "Du visualisierst Ergebnisse in Dashboards und präsentierst sie dem Management.",
+            "Du verantwortest die Weiterentwicklung unserer Datenplattform."]
+TASKS_EN = ["You develop models to predict {topic} and bring them into production.",
+            "You analyse large amounts of data and derive recommendations for {topic}.",
+            "You build and maintain scalable data pipelines for {topic}.",
+            "You work closely with the business units and advise them on {topic}.",
+            "You visualise results in dashboards and present them to the management.",
+            "You are responsible for the further development of our data platform."]
+TOPICS_DE = ["Kundenverhalten", "Absatzmengen", "Preisen", "Risiken", "Wartungsbedarf", "Energieverbrauch"]
+TOPICS_EN = ["customer behaviour", "sales", "prices", "risks", "maintenance needs", "energy consumption"]
+ABOUT_DE = ["Die {company} gestaltet seit über 20 Jahren die digitale Zukunft ihrer Kunden.",
+            "Als einer der führenden Anbieter der Branche beschäftigen wir Mitarbeitende an mehreren Standorten.",
+            "Unsere Produkte werden täglich von Millionen Menschen genutzt.",
+            "Daten sind die Grundlage all unserer Entscheidungen, deshalb bauen wir unser Data-Team weiter aus.",
+            "Wir setzen auf moderne Technologien, agile Methoden und eine offene Feedbackkultur.",
+            "Nachhaltigkeit und gesellschaftliche Verantwortung sind fester Bestandteil unserer Unternehmensstrategie.",
+            "Für unseren Bereich Digitalisierung suchen wir zum nächstmöglichen Zeitpunkt Verstärkung."]
+ABOUT_EN = ["{company} has been shaping the digital future of its customers for more than 20 years.",
+            "As one of the leading providers in the industry, we employ people at several locations.",
+            "Our products are used by millions of people every day.",
+            "Data is the foundation of all our decisions, which is why we keep growing our data team.",
+            "We rely on modern technologies, agile methods and an open feedback culture.",
+            "Sustainability and social responsibility are an integral part of our corporate strategy.",
+            "For our digitalisation unit we are looking for support as soon as possible."]
+BENEFITS_DE = ["Wir bieten flexible Arbeitszeiten, 30 Tage Urlaub und die Möglichkeit zum mobilen Arbeiten.",
+               "Dich erwarten ein modernes Arbeitsumfeld, betriebliche Altersvorsorge und ein Jobticket.",
+               "Bei uns erwarten dich ein motiviertes Team, flache Hierarchien und Weiterbildungsbudget.",
+               "Wir freuen uns auf deine Bewerbung unter Angabe deines frühestmöglichen Eintrittstermins.",
+               "Ein strukturiertes Onboarding und ein persönlicher Mentor erleichtern dir den Einstieg.",
+               "Zusätzlich bieten wir Sportangebote, Firmenevents und ein kostenloses Mittagessen.",
+               "Wir fördern Vielfalt und freuen uns über Bewerbungen von Menschen mit unterschiedlichen Hintergründen."]
+BENEFITS_EN = ["We offer flexible working hours, 30 days of vacation and the option to work remotely.",
+               "You can expect a modern working environment, a company pension scheme and a public transport ticket.",
+               "We look forward to receiving your application including your earliest possible starting date.",
+               "Join a motivated team with flat hierarchies and an individual training budget.",
+               "A structured onboarding and a personal mentor make it easy for you to get started.",
+               "In addition, we offer sports activities, company events and free lunch.",
+               "We value diversity and welcome applications from people with different backgrounds."]
+TEXTS = {
+    "de": {"about": ABOUT_DE, "tasks": TASKS_DE, "topics": TOPICS_DE, "degrees": DEGREES_DE, "majors": MAJORS_DE,
+           "experience": EXPERIENCE_DE, "numbers": NUMBERS_DE, "knowledge": KNOWLEDGE_DE, "soft_skills": SOFT_SKILLS_DE,
+           "benefits": BENEFITS_DE,
+           "templates": {"about": "Über uns:", "tasks": "Deine Aufgaben:", "profile": "Dein Profil: Du hast {degree}.",
+                         "experience": "Du bringst {experience} mit.",
+                         "skills": "Sehr gute Kenntnisse in {skills} sind wünschenswert.",
+                         "knowledge": "Idealerweise hast du Erfahrung mit {knowledge}.",
+                         "soft_skills": "Du überzeugst durch {soft_skills}.", "and": " und ",
+                         "benefits": "Was wir bieten:"}},
+    "en": {"about": ABOUT_EN, "tasks": TASKS_EN, "topics": TOPICS_EN, "degrees": DEGREES_EN, "majors": MAJORS_EN,
+           "experience": EXPERIENCE_EN, "numbers": NUMBERS_EN, "knowledge": KNOWLEDGE_EN, "soft_skills": SOFT_SKILLS_EN,
+           "benefits": BENEFITS_EN,
+           "templates": {"about": "About us:", "tasks": "Your tasks:", "profile": "Your profile: You have {degree}.",
+                         "experience": "You bring {experience}.",
+                         "skills": "Very good knowledge of {skills} is desirable.",
+                         "knowledge": "Ideally, you have experience with {knowledge}.",
+                         "soft_skills": "You convince with {soft_skills}.", "and": " and ",
+                         "benefits": "What we offer:"}}
+}
+# share of German job ads, of job ads with salary information and of reposted job ads
+GERMAN_SHARE = 0.7
+SALARY_SHARE = 0.4
+REPOST_SHARE = 0.03
+COMPANY_EXPONENT = 0.8
+START_DATE = np.datetime64("2024-01-01")
+
+
+def main():
+    """Generates the job ads and saves them as .csv file."""
+
+    args = parse_synthetic_jobs()
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    generate_jobs(args.num_jobs, args.seed).to_csv(args.output, index=False)
+    print(f"{args.num_jobs} synthetic job ads saved to {args.output}")
+    return None
+
+
+def generate_jobs(num_jobs, seed=0):
+    """Generates synthetic job ads.
+
+    Parameters
+    ----------
+    num_jobs: int
+        number of job ads
+    seed: int
+        seed of the random number generator
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        job ads with the columns of 'data_raw.csv'
+    """
+
+    rng = np.random.default_rng(seed)
+    companies = generate_companies(rng, max(num_jobs // 10, 20))
+    # few companies publish many job ads (the frequency decreases with a power of the rank of the company)
+    weights = 1 / np.arange(1, len(companies) + 1) ** COMPANY_EXPONENT
+    company_ids = rng.choice(len(companies), num_jobs, p=weights / weights.sum())
+    rows = []
+    for i in range(num_jobs):
+        if rows and rng.random() < REPOST_SHARE:
+            row = dict(rows[rng.integers(len(rows))])
+            row["link"] = f"https://www.stepstone.de/stellenangebote--repost--{i}-inline.html"
+            rows.append(row)
+            continue
+        company = companies[company_ids[i]]
+        title = pick(rng, LEVELS) + pick(rng, TITLES) + pick(rng, TITLE_SUFFIXES)
+        slug = title.split(" (")[0].strip().replace(" ", "-")
+        rows.append({
+            "link": f"https://www.stepstone.de/stellenangebote--{slug}--{i}-inline.html",
+            "company": company["company"],
+            "title": title,
+            "location": generate_location(rng),
+            "contract_type": pick(rng, CONTRACT_TYPES),
+            "work_type": pick(rng, WORK_TYPES),
+            "content": generate_content(rng, company["company"]),
+            "company_link": company["company_link"],
+            "release_date": str(START_DATE + rng.integers(365)),
+            "salary": generate_salary(rng, title) if rng.random() < SALARY_SHARE else np.nan,
+            "company_size": company["company_size"],
+            "industry": company["industry"],
+            "rating": company["rating"],
+            "num_ratings": company["num_ratings"]
+        })
+    df = pd.DataFrame(rows, columns=["link", "company", "title", "location", "contract_type", "work_type", "content",
+                                     "company_link", "release_date", "salary", "company_size", "industry", "rating",
+                                     "num_ratings"])
+    return df
+
+
+def generate_companies(rng, num_companies):
+    """Generates the companies with their size, industries and rating.
+
+    Parameters
+    ----------
+    rng: numpy.random.Generator
+        random number generator
+    num_companies: int
+        number of companies
+
+    Returns
+    -------
+    companies: list
+        company information as dictionaries
+    """
+
+    companies = []
+    combinations = len(COMPANY_PREFIXES) * len(COMPANY_SUFFIXES) * len(LEGAL_FORMS)
+    for i in range(num_companies):
+        # every company has a unique name
+        name = (f"{COMPANY_PREFIXES[i % len(COMPANY_PREFIXES)]}"
+                f"{COMPANY_SUFFIXES[i // len(COMPANY_PREFIXES) % len(COMPANY_SUFFIXES)].lower()} "
+                f"{LEGAL_FORMS[i // (len(COMPANY_PREFIXES) * len(COMPANY_SUFFIXES)) % len(LEGAL_FORMS)]}")
+        if i >= combinations:
+            name += f" {i // combinations + 1}"
+        # some companies have no page on Stepstone
+        has_page = rng.random() < 0.8
+        num_ratings = int(rng.integers(1, 500))
+        companies.append({
+            "company": name,
+            "company_link": f"https://www.stepstone.de/cmp/de/company-{i}/jobs" if has_page else np.nan,
+            "company_size": pick(rng, COMPANY_SIZES) if has_page else np.nan,
+            "industry": "|".join(sample(rng, INDUSTRIES, 1, 4)) if has_page else np.nan,
+            "rating": round(float(rng.uniform(2.5, 5)), 1) if has_page else np.nan,
+            "num_ratings": num_ratings if has_page else np.nan
+        })
+    return companies
+
+
+def generate_location(rng):
+    """Generates the list of locations of a job ad in one of the notations of the website.
+
+    Parameters
+    ----------
+    rng: numpy.random.Generator
+        random number generator
+
+    Returns
+    -------
+    location: str
+        locations of the job ad
+    """
+
+    num_locations = pick(rng, [1, 1, 1, 1, 2, 2, 3, 5])
+    locations = sample(rng, CITIES, num_locations, num_locations + 1)
+    for i, location in enumerate(locations):
+        notation = rng.random()
+        if notation < 0.05:
+            locations[i] = f"Raum {location}"
+        elif notation < 0.1:
+            locations[i] = f"{rng.integers(10000, 99999)} {location}"
+        elif notation < 0.13:
+            locations[i] = f"{location} (bei {pick(rng, CITIES)})"
+    if rng.random() < 0.15:
+        locations.append(pick(rng, REMOTE))
+    location = locations[0]
+    for other in locations[1:]:
+        location += pick(rng, LOCATION_SEPARATORS) + other
+    return location
+
+
+def generate_salary(rng, title):
+    """Generates the salary range of a job ad in the notation of the website.
+
+    Parameters
+    ----------
+    rng: numpy.random.Generator
+        random number generator
+    title: str
+        title of the job ad (the level changes the salary)
+
+    Returns
+    -------
+    salary: str
+        salary range (e.g. "55.000 - 65.000 €")
+    """
+
+    base = rng.lognormal(np.log(60000), 0.2)
+    if "Senior" in title or "Sr." in title or "Head" in title or "Lead" in title:
+        base *= 1.3
+    elif "Junior" in title or "Jr." in title or "Werkstudent" in title:
+        base *= 0.75
+    low = int(round(base * 0.9, -3))
+    high = int(round(base * 1.1, -3))
+    return f"{low:,} - {high:,} €".replace(",", ".")
+
+
+def generate_content(rng, company):
+    """Generates the text of a job ad in German or English.
+
+    Parameters
+    ----------
+    rng: numpy.random.Generator
+        random number generator
+    company: str
+        name of the company
+
+    Returns
+    -------
+    content: str
+        text of the job ad
+    """
+
+    texts = TEXTS["de"] if rng.random() < GERMAN_SHARE else TEXTS["en"]
+    templates = texts["templates"]
+    parts = [templates["about"]] + [sentence.format(company=company) for sentence in sample(rng, texts["about"], 3, 8)]
+    parts.append(templates["tasks"])
+    parts.extend(task.format(topic=pick(rng, texts["topics"])) for task in sample(rng, texts["tasks"], 3, 7))
+    degree = pick(rng, texts["degrees"]).format(major=pick(rng, texts["majors"]))
+    parts.append(templates["profile"].format(degree=degree))
+    if rng.random() < 0.8:
+        experience = pick(rng, texts["experience"]).format(number=pick(rng, texts["numbers"]))
+        parts.append(templates["experience"].format(experience=experience))
+    skills = [skill for skill, share in POPULAR_SKILLS.items() if rng.random() < share] + sample(rng, SKILLS, 0, 8)
+    if skills:
+        parts.append(templates["skills"].format(skills=", ".join(skills)))
+    knowledge = sample(rng, texts["knowledge"], 0, 4)
+    if knowledge:
+        parts.append(templates["knowledge"].format(knowledge=", ".join(knowledge)))
+    parts.append(templates["soft_skills"].format(soft_skills=templates["and"].join(sample(rng, texts["soft_skills"],
+                                                                                         2, 3))))
+    parts.append(templates["benefits"])
+    parts.extend(sample(rng, texts["benefits"], 3, 8))
+    return " ".join(parts)
+
+
+def pick(rng, options):
+    """Picks a random element of a list (faster than numpy.random.Generator.choice for single elements).
+
+    Parameters
+    ----------
+    rng: numpy.random.Generator
+        random number generator
+    options: list
+        elements to choose from
+
+    Returns
+    -------
+    element: object
+        random element
+    """
+
+    return options[rng.integers(len(options))]
+
+
+def sample(rng, options, low, high):
+    """Picks a random number of distinct elements of a list.
+
+    Parameters
+    ----------
+    rng: numpy.random.Generator
+        random number generator
+    options: list
+        elements to choose from
+    low: int
+        minimum number of elements
+    high: int
+        maximum number of elements (exclusive)
+
+    Returns
+    -------
+    elements: list
+        random elements in random order
+    """
+
+    positions = rng.permutation(len(options))[:rng.integers(low, high)]
+    return [options[position] for position in positions]
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,30 @@ def parse_preprocessing():
                         action="store_true",
                         help="whether additional geographic information should be requested from the Positionstack API"
                              " (requires a Positionstack account)")
+    parser.add_argument("-c", "--chunksize",
+                        type=int,
+                        default=None,
+                        help="number of job ads to be processed at once (if specified, the raw data is read and"
+                             " processed in chunks to limit the memory usage)")
+    parser.add_argument("-n", "--near_duplicates",
+                        type=float,
+                        nargs="?",
+                        const=0.8,
+                        default=None,
+                        help="whether job ads with nearly identical text descriptions should be removed as well"
+                             " (optionally followed by the minimum similarity between 0 and 1, default: 0.8)")
+    parser.add_argument("--previous_crawls",
+                        action="store_true",
+                        help="whether job ads that are nearly identical to a job ad of a previous crawl should be"
+                             " removed even if that job ad is no longer part of the raw data (with --near_duplicates)")
+    parser.add_argument("-p", "--profile",
+                        action="store_true",
+                        help="whether every step should additionally be profiled with cProfile (the statistics are"
+                             " saved to the folder 'profiles' inside the directory)")
+    parser.add_argument("-m", "--memory",
+                        action="store_true",
+                        help="whether the peak memory of every step should be measured with tracemalloc (slows down"
+                             " the preprocessing considerably)")
     args = parser.parse_args()
     return args
 
@@ -47,5 +71,336 @@ def parse_positionstack():
                         type=str,
                         default="data",
                         help="path to directory with scraped data inside")
+    parser.add_argument("-u", "--url",
+                        type=str,
+                        default=None,
+                        help="URL of the forward geocoding endpoint, e.g. of the local stub server (default:"
+                             " 'positionstack_url' of the config or the official API)")
+    args = parser.parse_args()
+    return args
+
+
+def parse_positionstack_stub():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-g", "--geo_data",
+                        type=str,
+                        default="data/geo_data.csv",
+                        help="path to previously retrieved geographic data that is returned by the stub server")
+    parser.add_argument("-p", "--port",
+                        type=int,
+                        default=8000,
+                        help="port of the stub server")
+    parser.add_argument("-b", "--no_batch",
+                        action="store_true",
+                        help="whether batch requests should be rejected (as for accounts without batch access)")
+    parser.add_argument("-e", "--error_rate",
+                        type=float,
+                        default=0,
+                        help="fraction of the requests that are answered with an error to test the retries")
+    args = parser.parse_args()
+    return args
+
+
+def parse_feature_benchmark():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--directory",
+                        type=str,
+                        default="data",
+                        help="path to directory with scraped data inside (built-in sample job ads are used if it"
+                             " contains no 'data_raw.csv')")
+    parser.add_argument("-n", "--num_records",
+                        type=int,
+                        default=200,
+                        help="number of job ads to benchmark")
+    parser.add_argument("-r", "--repeat",
+                        type=int,
+                        default=5,
+                        help="number of repetitions per job ad")
+    args = parser.parse_args()
+    return args
+
+
+def parse_startup_benchmark():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--repeat",
+                        type=int,
+                        default=5,
+                        help="number of fresh Python processes per measurement")
+    parser.add_argument("-n", "--num_jobs",
+                        type=int,
+                        default=2000,
+                        help="number of synthetic job ads that the pages are rendered with")
+    parser.add_argument("--seed",
+                        type=int,
+                        default=0,
+                        help="seed of the generator of the synthetic job ads")
+    parser.add_argument("--repository_data",
+                        action="store_true",
+                        help="render the pages with the data of the repository instead of synthetic job ads")
+    args = parser.parse_args()
+    return args
+
+
+def parse_salary_predictor():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-m", "--model",
+                        type=str,
+                        default="models/model.joblib",
+                        help="path to the trained pipeline")
+    parser.add_argument("-o", "--output",
+                        type=str,
+                        default="models/predictor.json",
+                        help="path where the compiled predictor is saved")
+    args = parser.parse_args()
+    return args
+
+
+def parse_batch_estimation():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--input",
+                        type=str,
+                        required=True,
+                        help="path to a file with the links to the job ads (e.g. one link per line or a .csv file)")
+    parser.add_argument("-o", "--output",
+                        type=str,
+                        default="salaries.csv",
+                        help="path where the estimated salaries are saved as .csv file")
+    parser.add_argument("-m", "--model",
+                        type=str,
+                        default="models/model.joblib",
+                        help="path to the trained pipeline (used if the compiled predictor is missing or outdated)")
+    parser.add_argument("-p", "--predictor",
+                        type=str,
+                        default="models/predictor.json",
+                        help="path to the compiled predictor (see salary_predictor.py)")
+    parser.add_argument("-d", "--directory",
+                        type=str,
+                        default="data",
+                        help="path to directory with the data of the Positionstack API inside")
+    parser.add_argument("-w", "--workers",
+                        type=int,
+                        default=8,
+                        help="number of job ads that are scraped at the same time")
+    args = parser.parse_args()
+    return args
+
+
+def parse_salary_service():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--port",
+                        type=int,
+                        default=8080,
+                        help="port of the service")
+    parser.add_argument("-m", "--predictor",
+                        type=str,
+                        default="models/predictor.json",
+                        help="path to the compiled predictor (see salary_predictor.py)")
+    parser.add_argument("--model",
+                        type=str,
+                        default="models/model.joblib",
+                        help="path to the trained pipeline (used if the compiled predictor is missing or outdated)")
+    parser.add_argument("-d", "--directory",
+                        type=str,
+                        default="data",
+                        help="path to directory with the data of the Positionstack API inside")
+    parser.add_argument("-b", "--batch_size",
+                        type=int,
+                        default=64,
+                        help="maximum number of job ads that are estimated together")
+    parser.add_argument("-w", "--wait",
+                        type=float,
+                        default=5,
+                        help="maximum number of milliseconds that a job ad waits for further job ads of its batch")
+    args = parser.parse_args()
+    return args
+
+
+def parse_service_load_test():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--directory",
+                        type=str,
+                        default="data",
+                        help="path to directory with scraped data inside (built-in sample job ads are used if it"
+                             " contains no 'data_raw.csv')")
+    parser.add_argument("-n", "--num_requests",
+                        type=int,
+                        default=2000,
+                        help="number of requests")
+    parser.add_argument("-c", "--concurrency",
+                        type=int,
+                        default=16,
+                        help="number of clients that send requests at the same time")
+    parser.add_argument("-r", "--records",
+                        type=int,
+                        default=1,
+                        help="number of job ads per request")
+    parser.add_argument("-b", "--batch_size",
+                        type=int,
+                        default=64,
+                        help="maximum number of job ads that are estimated together by the service")
+    parser.add_argument("-w", "--wait",
+                        type=float,
+                        default=5,
+                        help="maximum number of milliseconds that a job ad waits for further job ads of its batch")
+    args = parser.parse_args()
+    return args
+
+
+def parse_training():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--directory",
+                        type=str,
+                        default="data",
+                        help="path to directory with the preprocessed data inside")
+    parser.add_argument("-c", "--candidates",
+                        type=str,
+                        nargs="*",
+                        default=["lasso", "ridge", "elastic_net", "svr", "random_forest", "xgboost", "lightgbm"],
+                        help="model families that are searched")
+    parser.add_argument("-f", "--final",
+                        type=str,
+                        default="lasso",
+                        help="model family that is trained with its best parameters and saved (default: lasso, as"
+                             " chosen in the notebook)")
+    parser.add_argument("-n", "--iterations",
+                        type=int,
+                        default=200,
+                        help="number of sampled candidates per model family")
+    parser.add_argument("-j", "--jobs",
+                        type=int,
+                        default=-1,
+                        help="number of candidates that are evaluated in parallel (-1 for all cores)")
+    parser.add_argument("--cache",
+                        type=str,
+                        default=None,
+                        help="directory where the fitted encoders are cached, so that they can be reused by later"
+                             " runs (default: temporary directory that is removed afterwards)")
+    parser.add_argument("-m", "--model",
+                        type=str,
+                        default="models/model.joblib",
+                        help="path where the final model is saved")
+    parser.add_argument("-p", "--predictor",
+                        type=str,
+                        default="models/predictor.json",
+                        help="path where the compiled predictor is saved (only for linear models with one-hot"
+                             " encoding)")
+    parser.add_argument("-r", "--report",
+                        type=str,
+                        default="models/training_report.json",
+                        help="path where the report with the scores and durations of the searches is saved")
+    args = parser.parse_args()
+    return args
+
+
+def parse_model_refresh():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-d", "--directory",
+                        type=str,
+                        default="data",
+                        help="path to directory with the preprocessed data inside")
+    parser.add_argument("-m", "--model",
+                        type=str,
+                        default="models/model.joblib",
+                        help="path to the saved model, which is replaced by the refreshed model")
+    parser.add_argument("-p", "--predictor",
+                        type=str,
+                        default="models/predictor.json",
+                        help="path where the compiled predictor of the refreshed model is saved")
+    parser.add_argument("-r", "--report",
+                        type=str,
+                        default="models/training_report.json",
+                        help="path to the report of the training, to which the result of the refresh is added")
+    parser.add_argument("-s", "--since",
+                        type=str,
+                        default=None,
+                        help="job ads released after this date (YYYY-MM-DD) are new (default: latest release date in "
+                             "the report)")
+    parser.add_argument("-n", "--rounds",
+                        type=int,
+                        default=100,
+                        help="number of additional trees of boosted models")
+    args = parser.parse_args()
+    return args
+
+
+def parse_synthetic_jobs():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", "--num_jobs",
+                        type=int,
+                        default=10000,
+                        help="number of generated job ads")
+    parser.add_argument("-s", "--seed",
+                        type=int,
+                        default=0,
+                        help="seed of the random number generator")
+    parser.add_argument("-o", "--output",
+                        type=str,
+                        default="data_synthetic/data_raw.csv",
+                        help="path where the job ads are saved")
+    args = parser.parse_args()
+    return args
+
+
+def parse_pipeline_benchmark():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-s", "--scales",
+                        type=int,
+                        nargs="+",
+                        default=[1000, 10000],
+                        help="numbers of synthetic job ads that are processed")
+    parser.add_argument("--seed",
+                        type=int,
+                        default=0,
+                        help="seed of the generator of the synthetic job ads")
+    parser.add_argument("-b", "--baseline",
+                        type=str,
+                        default="benchmarks/pipeline_baseline.json",
+                        help="path to the stored results that the current results are compared with")
+    parser.add_argument("--save_baseline",
+                        action="store_true",
+                        help="save the current results as new baseline instead of comparing them")
+    parser.add_argument("-t", "--tolerance",
+                        type=float,
+                        default=0.25,
+                        help="relative increase of the time or the peak memory of a stage that counts as regression")
+    parser.add_argument("-r", "--repeat",
+                        type=int,
+                        default=5,
+                        help="number of timed runs of every stage (the fastest run is compared with the baseline)")
+    args = parser.parse_args()
+    return args
+
+
+def parse_parity_harness():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-e", "--engines",
+                        type=str,
+                        nargs="+",
+                        default=["records"],
+                        help="alternative engines that are compared with preprocessing.py ('records' for "
+                             "record_features.py or the name of a module that defines some of the compared functions)")
+    parser.add_argument("-f", "--functions",
+                        type=str,
+                        nargs="+",
+                        choices=["convert_title", "extract_locations", "extract_requirements", "extract_experience"],
+                        default=["convert_title", "extract_locations", "extract_requirements", "extract_experience"],
+                        help="compared functions")
+    parser.add_argument("-c", "--corpus",
+                        type=str,
+                        default=None,
+                        help="path to raw data (e.g. 'data/data_raw.csv') that replaces the built-in job ads of the "
+                             "fixed corpus")
+    parser.add_argument("-n", "--num_jobs",
+                        type=int,
+                        default=2000,
+                        help="number of job ads of the synthetic corpus")
+    parser.add_argument("-s", "--seed",
+                        type=int,
+                        default=0,
+                        help="seed of the generator of the synthetic job ads")
+    parser.add_argument("-x", "--examples",
+                        type=int,
+                        default=5,
+                        help="maximum number of differing cells that are shown per function and engine")
     args = parser.parse_args()
     return args
@@ -0,0 +1,148 @@
+"""
+This script estimates the salaries of many job ads at once.
+
+Job ads of the feature store are not scraped again. All other job ads are scraped concurrently (through the cache of
+job_cache, so that recently scraped job ads are not requested again), their features are combined and the salaries of
+all job ads are estimated with a single call of the predictor. Job ads that cannot be estimated are reported with the
+reason instead of a salary. Example:
+
+    python src/batch_estimation.py --input links.txt --output salaries.csv
+"""
+
+import concurrent.futures
+import re
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from arguments import parse_batch_estimation
+from feature_store import update_feature_store
+from job_cache import create_cache, get_job_features
+from record_features import ERROR_CONTRACT_TYPE
+from salary_predictor import load_estimator, model_features, predict_salaries
+
+
+MAX_WORKERS = 8
+LINK_PATTERN = re.compile(r"https?://[^\s,;\"']+")
+ERROR_SCRAPING = "the data could not be extracted from the job ad"
+
+
+def main():
+    """Reads the links, estimates the salaries and saves the results as .csv file."""
+
+    args = parse_batch_estimation()
+    with open(args.input, encoding="utf-8") as file:
+        links = read_links(file.read())
+    try:
+        predictor = load_estimator(args.model, args.predictor)
+    except FileNotFoundError:
+        print("Neither a trained model nor a compiled predictor was found.")
+        return None
+    try:
+        store = update_feature_store(args.directory, model_features(predictor))
+    except ValueError as error:
+        print(f"{error} The feature store is not used.")
+        store = None
+    results = estimate_salaries(predictor, links, create_cache(), args.directory, args.workers, progress=True,
+                                store=store)
+    results.to_csv(args.output, index=False)
+    print(f"{results['error'].isna().sum()} of {len(results)} job ads estimated, results saved to {args.output}")
+    return None
+
+
+def read_links(text):
+    """Extracts the links of job ads from pasted text or the content of a file (e.g. one link per line or a .csv file).
+
+    Parameters
+    ----------
+    text: str
+        text that contains the links
+
+    Returns
+    -------
+    links: list
+        unique links in the order of their first occurrence
+    """
+
+    links = list(dict.fromkeys(LINK_PATTERN.findall(text)))
+    return links
+
+
+def scrape_link(cache, link, directory, store=None):
+    """Scrapes a job ad and extracts its features without raising errors.
+
+    Parameters
+    ----------
+    cache: dict
+        cache of scraped job ads
+    link: str
+        link to the job ad
+    directory: str
+        needed to find the stored data of the Positionstack API
+    store: dict
+        feature store of the preprocessed job ads (None to always scrape the job ad)
+
+    Returns
+    -------
+    features: dict
+        features of the prediction model (None if the job ad cannot be estimated)
+    error: str
+        reason why the job ad cannot be estimated (None if there is no error)
+    """
+
+    try:
+        data, features = get_job_features(cache, link, directory, store)
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
+    if data is None:
+        return None, ERROR_SCRAPING
+    if features is None:
+        return None, ERROR_CONTRACT_TYPE
+    return features, None
+
+
+def estimate_salaries(predictor, links, cache, directory="data", max_workers=MAX_WORKERS, progress=False, store=None):
+    """Estimates the salaries of several job ads.
+
+    Parameters
+    ----------
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline
+    links: list
+        links to the job ads
+    cache: dict
+        cache of scraped job ads
+    directory: str
+        needed to find the stored data of the Positionstack API
+    max_workers: int
+        number of job ads that are scraped at the same time
+    progress: bool
+        whether a progress bar should be displayed
+    store: dict
+        feature store of the preprocessed job ads (None to always scrape the job ads)
+
+    Returns
+    -------
+    results: pandas.DataFrame
+        link, title, company, location, estimated salary and error of each job ad
+    """
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        scraped = executor.map(lambda link: scrape_link(cache, link, directory, store), links)
+        scraped = list(tqdm(scraped, total=len(links)) if progress else scraped)
+    estimated = [features for features, _ in scraped if features is not None]
+    salaries = iter(np.round(predict_salaries(predictor, estimated)))
+    results = pd.DataFrame({
+        "link": links,
+        "title": [np.nan if features is None else features["title"] for features, _ in scraped],
+        "company": [np.nan if features is None else features["company"] for features, _ in scraped],
+        "location": [np.nan if features is None else features["main_location"] for features, _ in scraped],
+        "estimated_salary": [np.nan if features is None else next(salaries) for features, _ in scraped],
+        "error": [error for _, error in scraped]
+    })
+    return results
+
+
+if __name__ == "__main__":
+    main()
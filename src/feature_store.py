@@ -0,0 +1,474 @@
+"""
+This script contains the feature store of the salary estimation, which is shared by the training, the web app and the
+batch estimation.
+
+The store contains the features of the prediction model of every preprocessed job ad, keyed by its link, together with
+the title, the release date and the salary. The columns are saved separately (values and missing values) in a
+compressed .npz file, so that loading the store does not need to parse the text data. A recorded schema lists the
+features in the order of 'feature_names_in_' of the model and the type of every column, so that a model can only be
+trained or applied with the features it expects. Every update is saved as a new version ('feature_store/v<n>.npz'),
+older versions are kept, so that a trained model can be traced back to its features.
+"""
+
+import json
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from geo_index import geocode_location
+from links import normalize_link
+
+
+SCHEMA_VERSION = 1
+TARGET = "average_salary"
+# features selected by the drop column feature selection of 'notebooks/Modeling.ipynb'
+FEATURES = ["company", "company_size", "home_office_possible", "title_category", "experience_level", "main_location",
+            "multiple_locations", "main_region", "main_industry", "java", "julia", "matlab", "perl", "html", "tableau",
+            "hadoop", "aws", "docker", "sas", "kubeflow", "sql_server", "sqlite", "ibm_db2", "azure_synapse",
+            "snowflake", "hbase", "tensorflow/keras", "spacy", "flask", "no_degree_info", "computer_science",
+            "deep_learning", "autonomous_driving", "clustering", "teamwork", "critical_thinking", "business_focus",
+            "3-4_years_experience", ">=5_years_experience"]
+# columns that are stored besides the features (needed to display, filter and train)
+METADATA = ["title", "release_date", TARGET]
+COLUMNS = ["link"] + METADATA + FEATURES
+STORE_DIRECTORY = "feature_store"
+VERSION_PATTERN = re.compile(r"^v(\d+)\.npz$")
+
+
+def create_feature_store(df, features=FEATURES, directory=None):
+    """Creates the feature store from the preprocessed data.
+
+    If the preprocessing did not retrieve geographic information, main_region is geocoded offline from main_location,
+    as for scraped job ads (see record_features.extract_features).
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data (contains one entry per job)
+    features: list
+        features of the prediction model
+    directory: str
+        needed to find the stored data of the Positionstack API (None to keep main_region as it is)
+
+    Returns
+    -------
+    store: dict
+        schema, data of the job ads (with the link as first column) and position of every normalized link
+    """
+
+    # columns that were not created only contain missing values
+    frame = df.reindex(columns=["link"] + METADATA + list(features)).reset_index(drop=True)
+    geocode = directory is not None and {"main_location", "main_region"} <= set(frame.columns)
+    if geocode and frame["main_region"].isna().all():
+        frame["main_region"] = geocode_regions(frame["main_location"], directory)
+    types = {column: column_type(values) for column, values in frame.items()}
+    schema = {"version": SCHEMA_VERSION, "key": "link", "metadata": METADATA, "features": list(features),
+              "types": types}
+    store = {"schema": schema, "frame": frame, "positions": create_positions(frame["link"]), "version": None}
+    return store
+
+
+def column_type(values):
+    """Determines the type under which a column of the feature store is saved.
+
+    Parameters
+    ----------
+    values: pandas.Series
+        values of the column
+
+    Returns
+    -------
+    kind: str
+        'bool', 'float' or 'str'
+    """
+
+    # flags with missing values have the data type object
+    kind = pd.api.types.infer_dtype(values, skipna=True) if values.notna().any() else "empty"
+    return {"boolean": "bool", "floating": "float", "integer": "float"}.get(kind, "str")
+
+
+def geocode_regions(locations, directory):
+    """Geocodes the regions of the main locations offline.
+
+    Parameters
+    ----------
+    locations: pandas.Series
+        main locations of the job ads
+    directory: str
+        needed to find the stored data of the Positionstack API
+
+    Returns
+    -------
+    regions: pandas.Series
+        regions of the main locations (missing if a location was not found)
+    """
+
+    entries = {location: geocode_location(location, directory) for location in locations.dropna().unique()}
+    return locations.map({location: entry.region for location, entry in entries.items() if entry is not None})
+
+
+def create_positions(links):
+    """Maps the normalized links to the rows of the store.
+
+    Parameters
+    ----------
+    links: pandas.Series
+        links of the job ads
+
+    Returns
+    -------
+    positions: dict
+        row of every normalized link
+    """
+
+    positions = {normalize_link(link): position for position, link in enumerate(links)}
+    return positions
+
+
+def list_versions(directory):
+    """Lists the saved versions of the feature store.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+
+    Returns
+    -------
+    versions: list
+        saved versions in ascending order
+    """
+
+    try:
+        names = os.listdir(os.path.join(directory, STORE_DIRECTORY))
+    except FileNotFoundError:
+        return []
+    versions = sorted(int(match.group(1)) for match in map(VERSION_PATTERN.match, names) if match is not None)
+    return versions
+
+
+def store_path(directory, version):
+    """Returns the path of a version of the feature store.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+    version: int
+        version of the store
+
+    Returns
+    -------
+    path: str
+        path of the saved version
+    """
+
+    return os.path.join(directory, STORE_DIRECTORY, f"v{version}.npz")
+
+
+def save_feature_store(store, directory):
+    """Saves the feature store as new version.
+
+    Parameters
+    ----------
+    store: dict
+        feature store
+    directory: str
+        path to the folder with the preprocessed data
+
+    Returns
+    -------
+    version: int
+        version of the saved store (the version is also set in the store)
+    """
+
+    store["version"] = next_version(directory)
+    columns = ((column, store["schema"]["types"][column], values) for column, values in store["frame"].items())
+    write_version(directory, store["version"], store["schema"], columns)
+    return store["version"]
+
+
+def next_version(directory):
+    """Returns the version under which the next update of the feature store is saved.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+
+    Returns
+    -------
+    version: int
+        next version of the store
+    """
+
+    versions = list_versions(directory)
+    return versions[-1] + 1 if versions else 1
+
+
+def write_version(directory, version, schema, columns):
+    """Writes a version of the feature store column by column in the format of numpy.savez_compressed, so that only
+    one column has to be converted at a time.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+    version: int
+        version of the store
+    schema: dict
+        schema of the store (saved after the columns, since their types are only known when they were written)
+    columns: iterable
+        name, type and values (pandas.Series) of every column in the order of the schema
+    """
+
+    os.makedirs(os.path.join(directory, STORE_DIRECTORY), exist_ok=True)
+    with zipfile.ZipFile(store_path(directory, version), "w", compression=zipfile.ZIP_DEFLATED) as file:
+        for i, (column, kind, values) in enumerate(columns):
+            schema["types"][column] = kind
+            missing = values.isna().to_numpy()
+            if kind == "bool":
+                array = values.fillna(False).to_numpy(dtype=bool)
+            elif kind == "float":
+                array = values.to_numpy(dtype=np.float64)
+            else:
+                array = values.where(~missing, "").to_numpy(dtype=str)
+            write_array(file, f"values_{i}", array)
+            write_array(file, f"missing_{i}", missing)
+        write_array(file, "schema", np.array(json.dumps(schema)))
+
+
+def write_array(file, name, array):
+    """Writes an array into an .npz file that is open for writing.
+
+    Parameters
+    ----------
+    file: zipfile.ZipFile
+        .npz file
+    name: str
+        key of the array
+    array: numpy.ndarray
+        array to write
+    """
+
+    with file.open(f"{name}.npy", "w", force_zip64=True) as member:
+        np.lib.format.write_array(member, array, allow_pickle=False)
+
+
+def create_store_parts(directory):
+    """Creates a temporary folder for a new version of the feature store that is written chunk by chunk.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+
+    Returns
+    -------
+    parts: dict
+        path of the temporary folder and paths of the saved parts
+    """
+
+    os.makedirs(os.path.join(directory, STORE_DIRECTORY), exist_ok=True)
+    return {"path": tempfile.mkdtemp(prefix="parts_", dir=os.path.join(directory, STORE_DIRECTORY)), "files": []}
+
+
+def append_store_part(df, parts, features=FEATURES):
+    """Saves the job ads of a chunk of the preprocessed data as part of the new version of the feature store.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data of the chunk
+    parts: dict
+        temporary folder of the new version (see create_store_parts)
+    features: list
+        features of the prediction model
+    """
+
+    # columns that were not created only contain missing values
+    frame = df.reindex(columns=["link"] + METADATA + list(features))
+    path = os.path.join(parts["path"], f"part_{len(parts['files'])}.npz")
+    # the types of the columns are only determined when the parts are merged, so the values are kept as objects
+    np.savez(path, **{f"column_{i}": values.to_numpy(dtype=object) for i, (_, values) in enumerate(frame.items())})
+    parts["files"].append(path)
+
+
+def load_store_column(parts, i):
+    """Loads a column of all parts of the new version of the feature store.
+
+    Parameters
+    ----------
+    parts: dict
+        temporary folder of the new version (see create_store_parts)
+    i: int
+        position of the column
+
+    Returns
+    -------
+    values: pandas.Series
+        values of the column of all job ads
+    """
+
+    arrays = []
+    for path in parts["files"]:
+        with np.load(path, allow_pickle=True) as part:
+            arrays.append(part[f"column_{i}"])
+    # e.g. integers and floats of different chunks become floats as with pandas.concat
+    return pd.Series(np.concatenate(arrays), dtype=object).infer_objects()
+
+
+def save_store_parts(parts, directory, features=FEATURES):
+    """Merges the parts into a new version of the feature store and removes the temporary folder.
+
+    The parts are merged column by column, so that only one column of all job ads is held in memory. As in
+    create_feature_store, main_region is geocoded offline from main_location if the preprocessing did not retrieve
+    geographic information.
+
+    Parameters
+    ----------
+    parts: dict
+        temporary folder of the new version (see create_store_parts)
+    directory: str
+        path to the folder with the preprocessed data
+    features: list
+        features of the prediction model
+
+    Returns
+    -------
+    version: int
+        version of the saved store
+    """
+
+    names = ["link"] + METADATA + list(features)
+    schema = {"version": SCHEMA_VERSION, "key": "link", "metadata": METADATA, "features": list(features),
+              "types": {}}
+
+    def merge_columns():
+        for i, column in enumerate(names):
+            values = load_store_column(parts, i)
+            if column == "main_region" and "main_location" in names and values.isna().all():
+                values = geocode_regions(load_store_column(parts, names.index("main_location")), directory)
+            yield column, column_type(values), values
+
+    version = next_version(directory)
+    write_version(directory, version, schema, merge_columns())
+    shutil.rmtree(parts["path"])
+    return version
+
+
+def load_feature_store(directory, version=None, features=None):
+    """Loads a saved version of the feature store.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+    version: int
+        version of the store (None for the latest version)
+    features: list
+        features expected by the model (e.g. 'feature_names_in_'), which must match the schema of the store (None to
+        skip the check)
+
+    Returns
+    -------
+    store: dict
+        feature store (None if no version was saved)
+    """
+
+    if version is None:
+        versions = list_versions(directory)
+        if not versions:
+            return None
+        version = versions[-1]
+    saved = np.load(store_path(directory, version))
+    schema = json.loads(str(saved["schema"]))
+    columns = {}
+    for i, column in enumerate(["link"] + schema["metadata"] + schema["features"]):
+        values, missing = saved[f"values_{i}"], saved[f"missing_{i}"]
+        # missing values of floats are already stored as NaN
+        if schema["types"][column] == "str" or (schema["types"][column] == "bool" and missing.any()):
+            values = values.astype(object)
+            values[missing] = np.nan
+        columns[column] = values
+    frame = pd.DataFrame(columns)
+    store = {"schema": schema, "frame": frame, "positions": create_positions(frame["link"]), "version": version}
+    if features is not None:
+        check_schema(store, features)
+    return store
+
+
+def check_schema(store, features):
+    """Checks if the features of the store are the features expected by a model.
+
+    Parameters
+    ----------
+    store: dict
+        feature store
+    features: list
+        features expected by the model (e.g. 'feature_names_in_')
+    """
+
+    if store["schema"]["version"] != SCHEMA_VERSION or store["schema"]["features"] != [str(f) for f in features]:
+        raise ValueError(f"The schema of version {store['version']} of the feature store does not match the features "
+                         f"of the model.")
+    return None
+
+
+def update_feature_store(directory, features=None):
+    """Loads the latest version of the feature store and saves a new version if the preprocessed data is newer.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder with the preprocessed data
+    features: list
+        features expected by the model, which must match the schema of the store (None to skip the check)
+
+    Returns
+    -------
+    store: dict
+        feature store (None if neither a saved store nor preprocessed data exists)
+    """
+
+    data_path = os.path.join(directory, "data_wide.csv")
+    versions = list_versions(directory)
+    if versions and (not os.path.exists(data_path)
+                     or os.path.getmtime(store_path(directory, versions[-1])) >= os.path.getmtime(data_path)):
+        return load_feature_store(directory, versions[-1], features)
+    if not os.path.exists(data_path):
+        return None
+    store = create_feature_store(pd.read_csv(data_path), directory=directory)
+    save_feature_store(store, directory)
+    if features is not None:
+        check_schema(store, features)
+    return store
+
+
+def lookup_features(store, link):
+    """Returns the stored features of a job ad.
+
+    Parameters
+    ----------
+    store: dict
+        feature store (or None)
+    link: str
+        link to the job ad
+
+    Returns
+    -------
+    record: dict
+        link, metadata and features of the job ad (None if the job ad is not in the store)
+    """
+
+    if store is None:
+        return None
+    position = store["positions"].get(normalize_link(link))
+    if position is None:
+        return None
+    return store["frame"].iloc[position].to_dict()
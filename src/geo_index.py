@@ -0,0 +1,300 @@
+"""
+This script contains an in-memory index of the geographic data retrieved from the Positionstack API.
+
+The file 'geo_data.csv' is read only once per directory and process. All lookups (batch preprocessing, salary
+estimation in the web app) share the same index, which maps normalized location names to region and coordinates.
+
+In addition, a gazetteer of all reliable localities with a character trigram index allows to geocode spelling variants
+of known locations (e.g. 'Muenchen' or 'Frankfurt am Main' instead of 'München' or 'Frankfurt') without network access.
+"""
+
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+GeoEntry = namedtuple("GeoEntry", ["location", "region", "latitude", "longitude", "locality"])
+# columns of the answers of the API (locations without a result are cached with the location only)
+API_COLUMNS = ["location", "name", "type", "confidence", "region", "latitude", "longitude"]
+TRANSLITERATION = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss"})
+# minimum Dice similarity of the trigrams of a location and a gazetteer entry
+FUZZY_THRESHOLD = 0.7
+# minimum difference to the similarity of the best gazetteer entry in another region
+FUZZY_MARGIN = 0.1
+
+
+def normalize_location(location):
+    """Normalizes a location name so that it can be used as key of the geo index.
+
+    Parameters
+    ----------
+    location: str
+        location name
+
+    Returns
+    -------
+    key: str
+        lowercase location name with collapsed whitespace (None if no name was given)
+    """
+
+    if not isinstance(location, str):
+        return None
+    return " ".join(location.split()).casefold()
+
+
+@lru_cache(maxsize=None)
+def load_geo_index(directory):
+    """Loads the geographic data of the Positionstack API into a dictionary.
+
+    Entries are keyed by the normalized location that was sent to the API. For reliable results (type 'locality' and
+    confidence 1) the name returned by the API is added as an alias, e.g. 'Munich' for the query 'München'. Columns of
+    the API that are missing (e.g. if the API did not find any of the locations) are treated as missing values.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder where 'geo_data.csv' is stored
+
+    Returns
+    -------
+    geo_index: dict
+        maps normalized location names to GeoEntry tuples
+    """
+
+    geo_df = pd.read_csv(os.path.join(directory, "geo_data.csv")).reindex(columns=API_COLUMNS)
+    geo_df["locality"] = (geo_df["type"] == "locality") & (geo_df["confidence"] == 1)
+    geo_index = {}
+    aliases = {}
+    for row in geo_df.itertuples(index=False):
+        entry = GeoEntry(row.location, row.region, row.latitude, row.longitude, row.locality)
+        geo_index.setdefault(normalize_location(row.location), entry)
+        if row.locality:
+            aliases.setdefault(normalize_location(row.name), entry)
+    for key, entry in aliases.items():
+        geo_index.setdefault(key, entry)
+    geo_index.pop(None, None)
+    return geo_index
+
+
+@lru_cache(maxsize=None)
+def load_geo_table(directory):
+    """Provides the geo index as dataframe for vectorized lookups of many locations at once.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder where 'geo_data.csv' is stored
+
+    Returns
+    -------
+    geo_table: pandas.DataFrame
+        one row per key of the geo index (index = normalized location name)
+    """
+
+    geo_index = load_geo_index(directory)
+    geo_table = pd.DataFrame.from_records(list(geo_index.values()), columns=GeoEntry._fields,
+                                          index=pd.Index(list(geo_index.keys())))
+    return geo_table
+
+
+@lru_cache(maxsize=None)
+def load_gazetteer(directory):
+    """Builds a gazetteer of all reliable localities with a trigram index for fuzzy lookups.
+
+    The gazetteer contains all localities of the geo index. If the directory contains a file 'localities.csv' (e.g. an
+    open list of all German municipalities with the columns 'location', 'region', 'latitude' and 'longitude'), its
+    entries are added as well, with lower priority than the results of the Positionstack API.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder where 'geo_data.csv' is stored
+
+    Returns
+    -------
+    gazetteer: dict
+        folded location names with their positions, their GeoEntry tuples and regions, the number of trigrams per name
+        and the positions of all names per trigram
+    """
+
+    entries = {}
+    for key, entry in load_geo_index(directory).items():
+        if entry.locality:
+            entries.setdefault(fold_location(key), entry)
+    path = os.path.join(directory, "localities.csv")
+    if os.path.exists(path):
+        localities = pd.read_csv(path, usecols=["location", "region", "latitude", "longitude"])
+        for row in localities.itertuples(index=False):
+            entries.setdefault(fold_location(row.location), GeoEntry(row.location, row.region, row.latitude,
+                                                                     row.longitude, True))
+    entries.pop(None, None)
+    postings = {}
+    sizes = []
+    for position, key in enumerate(entries):
+        key_trigrams = trigrams(key)
+        sizes.append(len(key_trigrams))
+        for trigram in key_trigrams:
+            postings.setdefault(trigram, []).append(position)
+    gazetteer = {"keys": list(entries), "ids": {key: position for position, key in enumerate(entries)},
+                 "entries": list(entries.values()), "sizes": np.array(sizes),
+                 "regions": np.array([entry.region for entry in entries.values()], dtype=object),
+                 "postings": {trigram: np.array(positions) for trigram, positions in postings.items()}}
+    return gazetteer
+
+
+def clear_geo_index():
+    """Discards the cached index, e.g. after 'geo_data.csv' was updated."""
+
+    load_geo_index.cache_clear()
+    load_geo_table.cache_clear()
+    load_gazetteer.cache_clear()
+
+
+def lookup_location(location, directory, locality_only=True):
+    """Looks up the geographic information of a single location.
+
+    Parameters
+    ----------
+    location: str
+        location name
+    directory: str
+        path to the folder where 'geo_data.csv' is stored
+    locality_only: bool
+        if only reliable results (type 'locality' and confidence 1) should be returned
+
+    Returns
+    -------
+    entry: GeoEntry
+        geographic information of the location (None if the location is unknown)
+    """
+
+    entry = load_geo_index(directory).get(normalize_location(location))
+    if entry is None or (locality_only and not entry.locality):
+        return None
+    return entry
+
+
+def lookup_locations(locations, directory, locality_only=True):
+    """Looks up the geographic information of many locations at once.
+
+    Parameters
+    ----------
+    locations: pandas.Series
+        location names
+    directory: str
+        path to the folder where 'geo_data.csv' is stored
+    locality_only: bool
+        if only reliable results (type 'locality' and confidence 1) should be returned
+
+    Returns
+    -------
+    results: pandas.DataFrame
+        columns 'region', 'latitude', 'longitude' and 'locality' aligned with the index of the locations (missing
+        values for unknown locations)
+    """
+
+    geo_table = load_geo_table(directory)
+    if locality_only:
+        geo_table = geo_table.loc[geo_table["locality"]]
+    keys = locations.astype("object").str.split().str.join(" ").str.casefold()
+    results = geo_table.reindex(keys)[["region", "latitude", "longitude", "locality"]]
+    results.index = locations.index
+    return results
+
+
+def fold_location(location):
+    """Normalizes a location name for the gazetteer (additionally replaces umlauts and 'ß').
+
+    Parameters
+    ----------
+    location: str
+        location name
+
+    Returns
+    -------
+    key: str
+        folded location name (None if no name was given)
+    """
+
+    key = normalize_location(location)
+    if key is None:
+        return None
+    return key.translate(TRANSLITERATION)
+
+
+def trigrams(key):
+    """Splits a folded location name into its character trigrams.
+
+    Parameters
+    ----------
+    key: str
+        folded location name
+
+    Returns
+    -------
+    trigrams: set
+        trigrams of the name padded with two leading and one trailing space
+    """
+
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def geocode_location(location, directory, threshold=FUZZY_THRESHOLD, margin=FUZZY_MARGIN):
+    """Geocodes a single location offline, also if its spelling differs from the known locations.
+
+    At first, the location is looked up exactly in the geo index and the gazetteer. A suffix after a hyphen usually
+    names a district (e.g. 'Hamburg-Altona'), so it is removed before the name is looked up again. A qualifier in
+    brackets, however, distinguishes towns of the same name (e.g. 'Frankfurt (Oder)'), so such locations are only
+    geocoded if they are known exactly. Otherwise, the gazetteer entry with the most similar trigrams (Dice coefficient)
+    is returned if its similarity reaches the threshold and clearly exceeds the similarity of all entries in other
+    regions (e.g. 'Hessen' is not geocoded as Essen).
+
+    Parameters
+    ----------
+    location: str
+        location name
+    directory: str
+        path to the folder where 'geo_data.csv' is stored
+    threshold: float
+        minimum similarity of a gazetteer entry
+    margin: float
+        minimum difference to the similarity of the best gazetteer entry in another region
+
+    Returns
+    -------
+    entry: GeoEntry
+        geographic information of the location (None if no reliable locality was found or 'geo_data.csv' does not exist)
+    """
+
+    try:
+        entry = lookup_location(location, directory)
+    except FileNotFoundError:
+        return None
+    if entry is not None:
+        return entry
+    key = fold_location(location)
+    if key is None:
+        return None
+    gazetteer = load_gazetteer(directory)
+    if key in gazetteer["ids"]:
+        return gazetteer["entries"][gazetteer["ids"][key]]
+    if "(" in key:
+        return None
+    key = key.split("-")[0].strip()
+    if key in gazetteer["ids"]:
+        return gazetteer["entries"][gazetteer["ids"][key]]
+    key_trigrams = trigrams(key)
+    positions = [gazetteer["postings"][trigram] for trigram in key_trigrams if trigram in gazetteer["postings"]]
+    if not positions:
+        return None
+    shared = np.bincount(np.concatenate(positions), minlength=len(gazetteer["keys"]))
+    scores = 2 * shared / (len(key_trigrams) + gazetteer["sizes"])
+    best = scores.argmax()
+    rivals = scores[gazetteer["regions"] != gazetteer["regions"][best]]
+    if scores[best] < threshold or (len(rivals) > 0 and scores[best] - rivals.max() < margin):
+        return None
+    return gazetteer["entries"][best]
@@ -6,16 +6,19 @@ import numpy as np
 import streamlit as st
 import plotly.express as px
 
+from location_counts import CLUSTER_LEVELS, select_title_categories, cluster_locations
 
-def geographical_analysis(df):
+
+def geographical_analysis(counts):
     """Realizes the geographical analysis of the web app.
 
-    Filters the data by the specified job titles and displays the distribution of jobs in Germany on a scatter map.
+    Sums the number of jobs of the specified job titles per location and displays the distribution of jobs in Germany
+    on a scatter map.
 
     Parameters
     ----------
-    df: pandas.DatFrame
-        long format data (contains one entry per location)
+    counts: pandas.DataFrame
+        number of jobs per location and title category (None if no geographic information is available)
     """
 
     st.header("Regional Distribution of Data Science Jobs")
@@ -23,7 +26,7 @@ def geographical_analysis(df):
             " The data can be filtered by job title.")
     st.write("")   
 
-    if "latitude" in df.columns:
+    if counts is not None:
         options = ["Data Scientist", "Data Analyst", "Data Engineer", "Machine Learning Engineer", "Software Engineer",
                    "Data Science Consultant", "Data Science Manager"]
 
@@ -42,9 +45,10 @@ def geographical_analysis(df):
 
         selection = [check_ds, check_da, check_de, check_mle, check_se, check_dsc, check_m]
         choices_selected = [choice for (choice, value) in zip(options, selection) if value]
-        df_choice = df.loc[df["title_category"].isin(choices_selected)]
-
-        df_map = df_choice.groupby(["location", "latitude", "longitude"], as_index=False)["link"].agg({"number of jobs": "count"})
+        grouping = st.radio("Grouping of Nearby Locations", list(CLUSTER_LEVELS), horizontal=True)
+        df_map = select_title_categories(counts, choices_selected)
+        if CLUSTER_LEVELS[grouping] is not None:
+            df_map = cluster_locations(df_map, CLUSTER_LEVELS[grouping])
 
         df_map["size"] = np.log(df_map["number of jobs"] + 1)
 
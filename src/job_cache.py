@@ -0,0 +1,138 @@
+"""
+This script contains a cache of scraped job ads for the salary estimation.
+
+Popular job ads are estimated repeatedly, and every estimate requires two requests to Stepstone and the extraction of
+the features. The cache keeps the scraped information and the features of the most recently used job ads, keyed by
+their normalized link. Entries expire after a fixed time, so that changes of the job ads are taken into account, and
+the least recently used entries are removed if the cache is full. The cache is protected by a lock, so that it can be
+shared by all sessions of the web app.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from links import normalize_link
+
+
+MAX_ENTRIES = 1000
+TIME_TO_LIVE = 6 * 60 * 60
+
+
+def create_cache(max_entries=MAX_ENTRIES, time_to_live=TIME_TO_LIVE):
+    """Creates an empty cache.
+
+    Parameters
+    ----------
+    max_entries: int
+        maximum number of entries
+    time_to_live: float
+        number of seconds after which an entry expires
+
+    Returns
+    -------
+    cache: dict
+        entries (key -> time of insertion and value) in the order of their last use, limits, lock and counters of hits
+        and misses
+    """
+
+    cache = {"entries": OrderedDict(), "max_entries": max_entries, "time_to_live": time_to_live,
+             "lock": threading.Lock(), "hits": 0, "misses": 0}
+    return cache
+
+
+def get_cached(cache, key):
+    """Looks up an entry of the cache.
+
+    Parameters
+    ----------
+    cache: dict
+        cache
+    key: str
+        key of the entry
+
+    Returns
+    -------
+    value: object
+        cached value (None if the key is not contained or the entry has expired)
+    """
+
+    with cache["lock"]:
+        entry = cache["entries"].get(key)
+        if entry is not None and time.monotonic() - entry[0] > cache["time_to_live"]:
+            del cache["entries"][key]
+            entry = None
+        if entry is None:
+            cache["misses"] += 1
+            return None
+        cache["entries"].move_to_end(key)
+        cache["hits"] += 1
+        return entry[1]
+
+
+def put_cached(cache, key, value):
+    """Adds an entry to the cache and removes the least recently used entries if the cache is full.
+
+    Parameters
+    ----------
+    cache: dict
+        cache
+    key: str
+        key of the entry
+    value: object
+        value of the entry
+    """
+
+    with cache["lock"]:
+        cache["entries"][key] = (time.monotonic(), value)
+        cache["entries"].move_to_end(key)
+        while len(cache["entries"]) > cache["max_entries"]:
+            cache["entries"].popitem(last=False)
+    return None
+
+
+def get_job_features(cache, link, directory="data", store=None):
+    """Scrapes a job ad and extracts its features, unless they are already stored or cached.
+
+    Job ads of the feature store are not scraped again, their stored features are used instead. Job ads that could not
+    be scraped are not cached, since the error may only be temporary. The cached values are shared and must not be
+    modified.
+
+    Parameters
+    ----------
+    cache: dict
+        cache of scraped job ads
+    link: str
+        link to the job ad
+    directory: str
+        needed to find the stored data of the Positionstack API
+    store: dict
+        feature store of the preprocessed job ads (None to always scrape the job ad)
+
+    Returns
+    -------
+    data: dict
+        scraped information of the job ad (the stored record for job ads of the feature store, None if the job ad could
+        not be scraped)
+    features: dict
+        features of the prediction model (None if the job ad could not be scraped or its contract type is not supported)
+    """
+
+    # the scraping is only imported when the first job ad is requested (see salary_estimation)
+    from feature_store import lookup_features
+    from record_features import extract_features
+    from webscraper import scrape_features
+
+    stored = lookup_features(store, link)
+    if stored is not None:
+        return stored, stored
+    key = normalize_link(link)
+    cached = get_cached(cache, key)
+    if cached is not None:
+        return cached
+    data = scrape_features(link)
+    if data is None:
+        return None, None
+    features, _ = extract_features(data, directory)
+    put_cached(cache, key, (data, features))
+    return data, features
@@ -0,0 +1,20 @@
+"""
+This script contains the helper functions for the links of job ads, which identify a job ad in all indexes and caches.
+"""
+
+
+def normalize_link(link):
+    """Normalizes the link of a job ad (surrounding whitespace, query parameters and fragments are removed).
+
+    Parameters
+    ----------
+    link: str
+        link of the job ad
+
+    Returns
+    -------
+    link: str
+        normalized link
+    """
+
+    return link.strip().split("#")[0].split("?")[0]
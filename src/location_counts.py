@@ -0,0 +1,144 @@
+"""
+This script contains the precomputed number of jobs per location and title category for the geographical analysis.
+
+The long format data contains one entry per job and location. For the map, only the number of jobs per location and
+title category is needed, so that the web app only has to sum the columns of the selected title categories instead of
+grouping all entries after every change of the selection. To keep the map clear for a large number of locations,
+nearby locations can be combined into clusters on a grid.
+"""
+
+import numpy as np
+import pandas as pd
+
+from patterns import TITLE_CATEGORIES
+
+
+LOCATION_INDEX = ["location", "latitude", "longitude"]
+# grid sizes (in degrees) for the clustering of nearby locations
+CLUSTER_LEVELS = {"Locations": None, "Cities (~25 km)": 0.25, "Regions (~100 km)": 1.0}
+
+
+def create_location_counts(df):
+    """Counts the jobs per location and title category.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        long format data with geographic information (contains one entry per location)
+
+    Returns
+    -------
+    counts: pandas.DataFrame
+        one row per location (with latitude and longitude) and one column per title category
+    """
+
+    counts = df.groupby(LOCATION_INDEX + ["title_category"])["link"].count().unstack(fill_value=0)
+    counts = counts.reindex(columns=list(TITLE_CATEGORIES), fill_value=0)
+    counts = counts.loc[counts.sum(axis=1) > 0]
+    return counts
+
+
+def add_location_counts(counts):
+    """Combines the counts of several parts of the data (e.g. of several chunks).
+
+    Parameters
+    ----------
+    counts: list
+        counts of disjoint parts of the data
+
+    Returns
+    -------
+    counts: pandas.DataFrame
+        counts of all parts
+    """
+
+    counts = pd.concat(counts).groupby(level=LOCATION_INDEX).sum()
+    return counts
+
+
+def save_location_counts(counts, path):
+    """Saves the counts.
+
+    Parameters
+    ----------
+    counts: pandas.DataFrame
+        number of jobs per location and title category
+    path: str
+        path where the counts are saved
+    """
+
+    counts.to_csv(path)
+    return None
+
+
+def load_location_counts(path):
+    """Loads saved counts.
+
+    Parameters
+    ----------
+    path: str
+        path to the saved counts
+
+    Returns
+    -------
+    counts: pandas.DataFrame
+        number of jobs per location and title category
+    """
+
+    counts = pd.read_csv(path, index_col=LOCATION_INDEX)
+    return counts
+
+
+def select_title_categories(counts, title_categories):
+    """Sums the number of jobs of the selected title categories per location.
+
+    Parameters
+    ----------
+    counts: pandas.DataFrame
+        number of jobs per location and title category
+    title_categories: list
+        selected title categories
+
+    Returns
+    -------
+    df_map: pandas.DataFrame
+        columns 'location', 'latitude', 'longitude' and 'number of jobs' for all locations with at least one job
+    """
+
+    jobs = counts[title_categories].sum(axis=1).astype(np.int64)
+    df_map = jobs.loc[jobs > 0].rename("number of jobs").reset_index()
+    return df_map
+
+
+def cluster_locations(df_map, cell_size):
+    """Combines nearby locations into clusters on a grid.
+
+    Each cluster is placed at the average position of its jobs and named after its location with the most jobs.
+
+    Parameters
+    ----------
+    df_map: pandas.DataFrame
+        number of jobs per location
+    cell_size: float
+        size of the grid cells in degrees
+
+    Returns
+    -------
+    df_map: pandas.DataFrame
+        number of jobs per cluster
+    """
+
+    cells = [np.floor(df_map["latitude"] / cell_size), np.floor(df_map["longitude"] / cell_size)]
+    df_map = df_map.assign(weighted_latitude=df_map["latitude"] * df_map["number of jobs"],
+                           weighted_longitude=df_map["longitude"] * df_map["number of jobs"])
+    df_map = df_map.sort_values("number of jobs", ascending=False, kind="stable")
+    clusters = df_map.groupby([cells[0].loc[df_map.index], cells[1].loc[df_map.index]]).agg(
+        location=("location", "first"), num_locations=("location", "size"), jobs=("number of jobs", "sum"),
+        weighted_latitude=("weighted_latitude", "sum"), weighted_longitude=("weighted_longitude", "sum"))
+    others = clusters["num_locations"] - 1
+    df_map = pd.DataFrame({"location": clusters["location"].where(others == 0, clusters["location"] + " (+"
+                                                                  + others.astype(str) + " more)"),
+                           "latitude": clusters["weighted_latitude"] / clusters["jobs"],
+                           "longitude": clusters["weighted_longitude"] / clusters["jobs"],
+                           "number of jobs": clusters["jobs"]}).reset_index(drop=True)
+    return df_map
@@ -0,0 +1,152 @@
+"""
+This script refreshes the trained salary model with newly scraped job ads without running the searches again.
+
+The encoding of the features and the hyperparameters of the saved model are kept. Boosted models (XGBoost, LightGBM)
+are warm-started: additional trees are trained on the new job ads on top of the existing ones. For all other models,
+only the final estimator is fitted again on the old and new job ads (linear models with warm start begin with the
+existing coefficients). The new job ads are the ones released after the latest release date in the report of the
+training (or after --since).
+
+The job ads that the training held out as test data (selected by a checksum of the link, see training.split_holdout)
+are held out from the refresh as well. The refreshed model only replaces the saved model (and the compiled
+predictor) if its mean absolute error on this slice is not higher than the one of the saved model. Example:
+
+    python src/model_refresh.py --directory data --since 2024-06-01
+"""
+
+import copy
+import datetime
+import json
+import warnings
+
+import joblib
+import numpy as np
+from sklearn.metrics import mean_absolute_error
+
+from arguments import parse_model_refresh
+from feature_store import TARGET, update_feature_store
+from salary_predictor import compile_model, save_predictor
+from training import select_salaried_jobs, split_holdout
+
+
+def main():
+    """Refreshes the saved model and replaces it if the error on the held-out job ads does not increase."""
+
+    warnings.filterwarnings("ignore")
+    args = parse_model_refresh()
+    try:
+        model = joblib.load(args.model)
+        store = update_feature_store(args.directory, model.feature_names_in_)
+    except FileNotFoundError:
+        store = None
+    except ValueError as error:
+        print(f"{error} Train the model again instead of refreshing it.")
+        return None
+    if store is None:
+        print("Needed data or model was not found.")
+        return None
+    try:
+        with open(args.report, encoding="utf-8") as file:
+            report = json.load(file)
+    except FileNotFoundError:
+        report = {}
+    since = args.since or report.get("latest_release_date")
+    if since is None:
+        print("No release date of the training data is known, all job ads are treated as new.")
+
+    df = select_salaried_jobs(store["frame"])
+    df_train, df_holdout = split_holdout(df)
+    df_new = df_train if since is None else df_train.loc[df_train["release_date"] > since]
+    if df_new.empty:
+        print(f"No new job ads released after {since}.")
+        return None
+    features = list(model.feature_names_in_)
+    print(f"refreshing with {len(df_new)} new job ads ({len(df_train)} job ads in total, {len(df_holdout)} held out)")
+    refreshed, method = refresh_model(model, df_train[features], df_train[TARGET], df_new[features], df_new[TARGET],
+                                      args.rounds)
+
+    previous_mae = mean_absolute_error(df_holdout[TARGET], model.predict(df_holdout[features]))
+    refreshed_mae = mean_absolute_error(df_holdout[TARGET], refreshed.predict(df_holdout[features]))
+    replaced = bool(refreshed_mae <= previous_mae)
+    print(f"{method}: held-out MAE {previous_mae:.0f} (saved model) -> {refreshed_mae:.0f} (refreshed model)")
+    if replaced:
+        joblib.dump(refreshed, args.model)
+        try:
+            save_predictor(compile_model(refreshed), args.predictor)
+        except (KeyError, ValueError):
+            pass
+        report["latest_release_date"] = df["release_date"].max()
+        print(f"model saved to {args.model}")
+    else:
+        print("the error increased, the saved model is kept")
+    report.setdefault("refreshes", []).append({
+        "date": datetime.date.today().isoformat(), "method": method, "feature_store_version": store["version"],
+        "since": since, "new_rows": len(df_new), "holdout_rows": len(df_holdout), "previous_mae": previous_mae,
+        "refreshed_mae": refreshed_mae, "replaced": replaced})
+    with open(args.report, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2,
+                  default=lambda value: value.item() if isinstance(value, np.generic) else str(value))
+    return None
+
+
+def refresh_model(model, X, y, X_new, y_new, rounds):
+    """Fits the final estimator of the pipeline again while the encoding of the features is kept.
+
+    Parameters
+    ----------
+    model: sklearn.pipeline.Pipeline
+        saved pipeline with the final estimator as step 'model' (optionally inside a TransformedTargetRegressor)
+    X: pandas.DataFrame
+        features of all job ads of the refresh
+    y: pandas.Series
+        salaries of all job ads of the refresh
+    X_new: pandas.DataFrame
+        features of the new job ads
+    y_new: pandas.Series
+        salaries of the new job ads
+    rounds: int
+        number of additional trees of boosted models
+
+    Returns
+    -------
+    refreshed: sklearn.pipeline.Pipeline
+        copy of the pipeline with the refreshed final estimator
+    method: str
+        description of the refresh
+    """
+
+    refreshed = copy.deepcopy(model)
+    estimator = refreshed["model"]
+    transformer = None
+    if hasattr(estimator, "regressor_"):
+        transformer = estimator.transformer_
+        estimator = estimator.regressor_
+    encoding = refreshed[:-1]
+
+    def transform_target(target):
+        target = np.asarray(target, dtype=np.float64)
+        return target if transformer is None else transformer.transform(target.reshape(-1, 1)).ravel()
+
+    name = type(estimator).__name__
+    if name == "XGBRegressor":
+        booster = estimator.get_booster()
+        estimator.set_params(n_estimators=rounds)
+        estimator.fit(encoding.transform(X_new), transform_target(y_new), xgb_model=booster)
+        return refreshed, f"warm start of {name} with {rounds} additional trees"
+    if name == "LGBMRegressor":
+        booster = estimator.booster_
+        estimator.set_params(n_estimators=rounds)
+        estimator.fit(encoding.transform(X_new), transform_target(y_new), init_model=booster)
+        return refreshed, f"warm start of {name} with {rounds} additional trees"
+    # the warm start of other ensembles would only add trees, so it is only used for linear models
+    if hasattr(estimator, "coef_") and "warm_start" in estimator.get_params():
+        estimator.set_params(warm_start=True)
+        method = f"refit of {name} starting with the saved coefficients"
+    else:
+        method = f"refit of {name}"
+    estimator.fit(encoding.transform(X), transform_target(y))
+    return refreshed, method
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+"""
+This script contains the detection of near-duplicate job ads based on their text description.
+
+Reposted job ads often differ only slightly in their text or link, so they are not caught by the exact comparison in
+'preprocessing.remove_duplicates'. Each text is therefore reduced to a MinHash signature of its word shingles. Similar
+signatures are found via locality-sensitive hashing (LSH). Templated texts (e.g. the same boilerplate of a company)
+share bands with many other job ads, so the buckets of the LSH bands are limited to MAX_BUCKET_SIZE job ads: a job ad is
+not added to a full bucket, but it is still found via its other bands. Together with comparing all candidates of a job
+ad at once, this keeps the runtime linear in the number of job ads. As a consequence, a near-duplicate is missed if all
+bands that it shares with the similar job ad belong to full buckets, which only happens for texts that share most of
+their shingles with more than MAX_BUCKET_SIZE other job ads.
+
+The index can be saved and extended with every new crawl. By default, a job ad is only removed if the similar job ad is
+part of the current data, i.e. it was indexed or seen again since the index was loaded. Optionally, job ads that are
+similar to a job ad of a previous crawl are removed as well, even if that job ad is no longer part of the data.
+"""
+
+import os
+import re
+import zlib
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+BATCH_SIZE = 5000
+# maximum number of job ads per LSH bucket
+MAX_BUCKET_SIZE = 100
+TOKEN = re.compile(r"\w+")
+
+# fixed random parameters, so that signatures of different crawls are comparable
+_random = np.random.default_rng(93)
+SHINGLE_MULTIPLIERS = _random.integers(1, 2**63, size=SHINGLE_SIZE, dtype=np.uint64) | np.uint64(1)
+PERMUTATION_MULTIPLIERS = _random.integers(1, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+PERMUTATION_OFFSETS = _random.integers(0, 2**63, size=NUM_PERMUTATIONS, dtype=np.uint64)
+BAND_MULTIPLIERS = _random.integers(1, 2**63, size=NUM_PERMUTATIONS // NUM_BANDS, dtype=np.uint64) | np.uint64(1)
+EMPTY = np.iinfo(np.uint32).max
+
+
+def minhash_signatures(texts):
+    """Calculates the MinHash signatures of several texts.
+
+    Parameters
+    ----------
+    texts: iterable
+        texts of the job ads (missing texts are allowed)
+
+    Returns
+    -------
+    signatures: numpy.ndarray
+        one row of NUM_PERMUTATIONS values per text (all values are EMPTY for texts without words)
+    """
+
+    texts = list(texts)
+    signatures = np.full((len(texts), NUM_PERMUTATIONS), EMPTY, dtype=np.uint32)
+    for start in range(0, len(texts), BATCH_SIZE):
+        shingles = [hash_shingles(text) for text in texts[start:start + BATCH_SIZE]]
+        lengths = np.array([len(element) for element in shingles])
+        if lengths.sum() == 0:
+            continue
+        shingles = np.concatenate(shingles)
+        starts = (np.cumsum(lengths) - lengths)[lengths > 0]
+        rows = start + np.flatnonzero(lengths > 0)
+        with np.errstate(over="ignore"):
+            for i in range(NUM_PERMUTATIONS):
+                # multiply-shift hashing as random permutation of the shingles
+                values = ((shingles * PERMUTATION_MULTIPLIERS[i] + PERMUTATION_OFFSETS[i]) >> np.uint64(32))
+                signatures[rows, i] = np.minimum.reduceat(values, starts).astype(np.uint32)
+    return signatures
+
+
+def hash_shingles(text):
+    """Hashes all sequences of SHINGLE_SIZE consecutive words of a text.
+
+    Parameters
+    ----------
+    text: str
+        text of a job ad
+
+    Returns
+    -------
+    shingles: numpy.ndarray
+        hash values of the shingles (texts with fewer words form a single shingle)
+    """
+
+    if not isinstance(text, str):
+        return np.array([], dtype=np.uint64)
+    tokens = TOKEN.findall(text.lower())
+    if not tokens:
+        return np.array([], dtype=np.uint64)
+    tokens = np.array([zlib.crc32(token.encode()) for token in tokens], dtype=np.uint64)
+    if len(tokens) < SHINGLE_SIZE:
+        windows = tokens[None, :]
+    else:
+        windows = sliding_window_view(tokens, SHINGLE_SIZE)
+    with np.errstate(over="ignore"):
+        shingles = (windows * SHINGLE_MULTIPLIERS[:windows.shape[1]]).sum(axis=1, dtype=np.uint64)
+    return shingles
+
+
+def band_hashes(signatures):
+    """Combines the signature values of each LSH band into a single hash.
+
+    Parameters
+    ----------
+    signatures: numpy.ndarray
+        MinHash signatures
+
+    Returns
+    -------
+    hashes: numpy.ndarray
+        one column per band
+    """
+
+    bands = signatures.astype(np.uint64).reshape(len(signatures), NUM_BANDS, -1)
+    with np.errstate(over="ignore"):
+        hashes = (bands * BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64)
+    return hashes
+
+
+def create_index():
+    """Creates an empty near-duplicate index.
+
+    Returns
+    -------
+    index: dict
+        links and signatures of all indexed job ads, whether they are part of the current data as well as one bucket
+        dictionary per LSH band (the signature matrix and the flags have spare rows, only the first len(links) rows
+        belong to job ads)
+    """
+
+    index = {"links": [], "signatures": np.empty((0, NUM_PERMUTATIONS), dtype=np.uint32),
+             "current": np.zeros(0, dtype=bool), "ids": {}, "buckets": [{} for _ in range(NUM_BANDS)]}
+    return index
+
+
+def load_index(path):
+    """Loads a saved near-duplicate index (or creates a new one if no index exists yet).
+
+    The job ads of the saved index are not part of the current data until they are seen again.
+
+    Parameters
+    ----------
+    path: str
+        path to the saved index
+
+    Returns
+    -------
+    index: dict
+        near-duplicate index
+    """
+
+    index = create_index()
+    if os.path.exists(path):
+        saved = np.load(path)
+        add_to_index(index, saved["links"].tolist(), saved["signatures"])
+    return index
+
+
+def save_index(index, path):
+    """Saves a near-duplicate index.
+
+    Only links and signatures are stored, the LSH buckets are rebuilt when loading the index.
+
+    Parameters
+    ----------
+    index: dict
+        near-duplicate index
+    path: str
+        path where the index is saved
+    """
+
+    signatures = index["signatures"][:len(index["links"])]
+    np.savez_compressed(path, links=np.array(index["links"], dtype=str), signatures=signatures)
+    return None
+
+
+def add_to_index(index, links, signatures):
+    """Adds job ads to a near-duplicate index.
+
+    Parameters
+    ----------
+    index: dict
+        near-duplicate index
+    links: list
+        links of the job ads
+    signatures: numpy.ndarray
+        MinHash signatures of the job ads
+    """
+
+    hashes = band_hashes(signatures)
+    for link, signature, bands in zip(links, signatures, hashes):
+        if link in index["ids"]:
+            continue
+        element_id = len(index["links"])
+        if element_id == len(index["signatures"]):
+            # the capacity is doubled, so that adding job ads one by one does not copy the matrix every time
+            grown = np.empty((max(2 * element_id, 1024), NUM_PERMUTATIONS), dtype=np.uint32)
+            grown[:element_id] = index["signatures"]
+            index["signatures"] = grown
+            index["current"] = np.concatenate([index["current"], np.zeros(len(grown) - element_id, dtype=bool)])
+        index["ids"][link] = element_id
+        index["links"].append(link)
+        index["signatures"][element_id] = signature
+        if signature[0] == EMPTY:
+            continue
+        for buckets, band in zip(index["buckets"], bands.tolist()):
+            bucket = buckets.setdefault(band, [])
+            if len(bucket) < MAX_BUCKET_SIZE:
+                bucket.append(element_id)
+    return None
+
+
+def find_near_duplicates(index, links, signatures, threshold, previous=False):
+    """Finds near-duplicates of job ads and adds all job ads that are not a near-duplicate to the index.
+
+    The job ads are processed in the given order, so a job ad is a near-duplicate if it is similar to a job ad of the
+    current data or to a previous job ad with a different link. All job ads are marked as part of the current data.
+
+    Parameters
+    ----------
+    index: dict
+        near-duplicate index
+    links: list
+        links of the job ads
+    signatures: numpy.ndarray
+        MinHash signatures of the job ads
+    threshold: float
+        minimum estimated Jaccard similarity of the word shingles to be considered a near-duplicate
+    previous: bool
+        if job ads that are only similar to job ads of previous crawls (which are not part of the current data) are
+        near-duplicates as well
+
+    Returns
+    -------
+    originals: list
+        link of the similar job ad for each near-duplicate (None for all other job ads)
+    """
+
+    hashes = band_hashes(signatures)
+    originals = []
+    for link, signature, bands in zip(links, signatures, hashes):
+        original = None
+        if link in index["ids"]:
+            index["current"][index["ids"][link]] = True
+        elif signature[0] != EMPTY:
+            candidates = [bucket for bucket in map(dict.get, index["buckets"], bands.tolist()) if bucket]
+            if candidates:
+                # sorted, so that the job ad that was indexed first is chosen
+                candidates = np.unique(np.concatenate(candidates))
+                if not previous:
+                    candidates = candidates[index["current"][candidates]]
+                similarities = (index["signatures"][candidates] == signature).mean(axis=1)
+                similar = np.flatnonzero(similarities >= threshold)
+                if len(similar) > 0:
+                    original = index["links"][candidates[similar[0]]]
+        if original is None and link not in index["ids"]:
+            add_to_index(index, [link], signature[None, :])
+            index["current"][index["ids"][link]] = True
+        originals.append(original)
+    return originals
+
+
+def remove_near_duplicates(df, index, threshold, previous=False):
+    """Removes job ads whose text is nearly identical to another job ad.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        original dataframe
+    index: dict
+        near-duplicate index with the job ads of previous crawls (is extended by the remaining job ads)
+    threshold: float
+        minimum estimated Jaccard similarity of the word shingles to be considered a near-duplicate
+    previous: bool
+        if job ads that are only similar to job ads of previous crawls (which are not part of the current data) are
+        removed as well
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        transformed dataframe
+    """
+
+    signatures = minhash_signatures(df["content"])
+    originals = find_near_duplicates(index, df["link"].tolist(), signatures, threshold, previous)
+    df = df.loc[[original is None for original in originals]]
+    return df
@@ -0,0 +1,183 @@
+"""
+This script contains the patterns and mappings used to extract features from the job ads.
+
+They are shared by the batch preprocessing (preprocessing.py) and the feature extraction for single job ads
+(record_features.py), so that both always produce the same features.
+"""
+
+
+# categories of job titles (later matches take precedence over earlier ones)
+TITLE_CATEGORIES = {
+    "Software Engineer": "Software|Developer|Entwickler",
+    "Data Analyst": "Analyst|Business[- ]*Intelligence|Analytics|Reporting",
+    "Data Scientist": "Data[ \S]*Scien|Research[ \S]*(Scientist|Engineer)|Statistik",
+    "Data Engineer": "(Data|Cloud)[ \S]*(Engineer|Archite(c|k)t|Specialist)|Data Warehouse|Datenbank|Database",
+    "Machine Learning Engineer": "Machine[- ]*Learning|Deep[- ]*Learning|(\W|^)(AI|KI|ML|DL)(\W|$)|Artificial[- ]*Intelligence|Künstliche[- ]*Intelligenz|MLOps",
+    "Data Science Consultant": "Consultant|Berater|Consulting",
+    "Data Science Manager": "Manager|Head|Lead|Leiter|Leitung|Vorstand|Chief|Owner|Partner|Director",
+}
+
+# experience levels within job titles (later matches take precedence over earlier ones)
+EXPERIENCE_LEVELS = {
+    "Junior": "Junior|Jr.",
+    "Senior": "Senior|Sr.",
+}
+
+COMPANY_SIZES = {"11-50": "0-50", "1-10": "0-50", ">15": "0-50", "1000+": "1001-2500", "130": "51-250",
+                 "approx. 250": "251-500", "201-500 Mitarbeiter": "251-500", "120": "251-500"}
+
+# requirements as (pattern, case sensitive), derived requirements have no pattern
+REQUIREMENT_PATTERNS = {
+    # programming languages (18)
+    "python": ("Python", False),
+    "r": ("\WR(\W|Studio)", False),
+    "sql": ("(?<!No)SQL", False),
+    "java": ("Java ", False),
+    "javascript": ("Javascript", False),
+    "c": ("\WC ", False),
+    "c++": ("C\+\+", False),
+    "c#": ("C#", False),
+    "scala": ("Scala ", False),
+    "julia": ("Julia", False),
+    "matlab": ("Matlab", False),
+    "swift": ("Swift", False),
+    "go": ("\WGo |Golang", True),
+    "perl": ("Perl", False),
+    "php": ("Php", False),
+    "html": ("HTML", False),
+    "css": ("CSS", False),
+    "rust": ("\WRust\W", False),
+    # tools (31)
+    "excel": ("Excel", True),
+    "tableau": ("Tableau", False),
+    "power_bi": ("Power ?BI|PBI", False),
+    "spark": ("Spark", False),
+    "hadoop": ("Hadoop", False),
+    "hive": ("Hive", False),
+    "aws": ("AWS|Amazon ?Web ?Services|Redshift", False),
+    "kafka": ("Kafka", False),
+    "azure": ("Azure|Synapse", False),
+    "google_cloud": ("Google ?Cloud|GCP|Big ?query", False),
+    "docker": ("Docker", False),
+    "git": ("\WGit", False),
+    "linux": ("Linux|Unix|Bash|Shell", False),
+    "kubernetes": ("Kubernetes", False),
+    "jenkins": ("Jenkins", False),
+    "airflow": ("Airflow", False),
+    "databricks": ("Databricks", False),
+    "sas": ("\WSas\W", False),
+    "spss": ("Spss", False),
+    "terraform": ("Terraform", False),
+    "ansible": ("Ansible", False),
+    "puppet": ("Puppet", False),
+    "mlflow": ("Mlflow", False),
+    "kubeflow": ("Kubeflow", False),
+    "splunk": ("Splunk", False),
+    "talend": ("Talend", False),
+    "prometheus": ("Prometheus", False),
+    "grafana": ("Grafana", False),
+    "flink": ("Flink", False),
+    "storm": ("Storm", False),
+    "looker": ("Looker", False),
+    # databases / data warehouses (21)
+    "mysql": ("My ?SQL", False),
+    "postgresql": ("Postgre", False),
+    "oracle": ("Oracle", False),
+    "sql_server": ("SQL ?Server", False),
+    "maria_db": ("Maria ?DB", False),
+    "sqlite": ("Sqlite", False),
+    "ibm_db2": ("DB2", False),
+    "amazon_redshift": ("Redshift", False),
+    "google_bigquery": ("Big ?Query", False),
+    "azure_synapse": ("Synapse", False),
+    "snowflake": ("Snowflake", False),
+    "redis": ("Redis", False),
+    "dynamo_db": ("Dynamo ?DB", False),
+    "mongo_db": ("Mongo ?DB", False),
+    "firebase": ("Firebase", False),
+    "couch_db": ("Couch ?DB|Couchbase", False),
+    "cassandra": ("Cassandra", False),
+    "hbase": ("H ?Base", False),
+    "neo4j": ("Neo4j", False),
+    "amazon_neptune": ("Amazon ?Neptune", False),
+    "elastic_search": ("Elastic ?Search", False),
+    # python libraries (18)
+    "pandas": ("Pandas", False),
+    "numpy": ("Numpy", False),
+    "tensorflow/keras": ("Tensorflow|Keras", False),
+    "pytorch": ("Pytorch", False),
+    "matplotlib": ("Matplotlib", False),
+    "seaborn": ("Seaborn", False),
+    "scikit-learn": ("(scikit[ -]?learn|sklearn)", False),
+    "plotly": ("plotly", False),
+    "streamlit": ("stream[ -]lit", False),
+    "spacy": ("spacy", False),
+    "nltk": ("nltk", False),
+    "scipy": ("scipy", False),
+    "statsmodels": ("statsmodels", False),
+    "flask": ("flask", False),
+    "fastapi": ("fast ?api", False),
+    "dask": ("dask", False),
+    "xgboost": ("xg ?boost|light ?gbm", False),
+    "pyspark": ("pyspark", False),
+    # degrees (4)
+    "master": ("(master|diplom)", False),
+    "phd": ("(doktor|phd|promotion)", False),
+    "bachelor": ("(Studium|degree|Hochschulabschluss|studiert|Studienabschluss|studies|bachelor)", False),
+    "no_degree_info": None,
+    # majors (5)
+    "computer_science": ("(computer science|informatik|informatics)", False),
+    "math/statistics": ("(math|Statistik|statistics|stats)", False),
+    "natural_science": ("(Physik|physics|Naturwissenschaft|natural science|Chemie|chemistry|Biologie|biology|natur-)", False),
+    "engineering": ("(Ingenieurwesen|Ingenieurwissenschaft|Engineering)", False),
+    "business": ("(bwl|Betriebswirtschaft|vwl|Volkswirtschaft|Wirtschaftswissenschaft)", False),
+    # knowledge (13)
+    "machine_learning": ("(Machine Learning|Machinelle[sn]? Lern)", False),
+    "deep_learning": ("Deep Learning|Neural|Neuronal", False),
+    "computer_vision": ("computer vision|convolution|cnn|image processing|Bildverarbeitung", False),
+    "natural_language_processing": ("nlp|natural language|speech recognition|Spracherkennung", False),
+    "autonomous_driving": ("autonomous driving|autonomes fahren", False),
+    "robotics": ("roboti", False),
+    "reinforcement_learning": ("reinforcement", False),
+    "regression": ("regression", False),
+    "classification": ("classification|Klassifikation|Klassifizierung", False),
+    "clustering": ("cluster", False),
+    "forecasting": ("forecast|time ?series|Zeitreihe", False),
+    "recommender_systems": ("recommender system|recommendation system|Empfehlungssystem", False),
+    "anomaly_detection": ("anomaly|Anomalie", False),
+    # soft skills (10)
+    "communication": ("communication| Kommunikation|storytelling", False),
+    "teamwork": ("teamfähig|teamplay|teamwork|teamorient|interpersonal|zwischenmenschlich", False),
+    "motivation": ("motivation |Neugier|curiosity|lernbereit|to learn|persönlich[\S]* weiterentwick|Engagement|Leidenschaft|passion", False),
+    "critical_thinking": ("(analytisch|struktur|logisch|kritisch)[\S]* denk|(analytic|structur|logic|critical)[\S]* think|Auffassungsgabe|problemlös|problem solv", False),
+    "creativity": ("kreativität|creativity", False),
+    "leadership": ("Führungs(kraft|stärke|kompetenz)|leadership skill|verantwortungsbereit", False),
+    "flexibility": ("belastbarkeit|flexibilit|anpassungsfähig", False),
+    "business_focus": ("unternehmerisch|Geschäftssinn", False),
+    "initiative": ("(selbst|eigen)ständig|eigen(initiative|verantwortung)", False),
+    "structured_working": ("(struktur|strategi|orientiert)[\S]* Arbeit|sorgfalt|sorgfältig|(slebst|Zeit|time )manage", False),
+}
+
+# patterns for the required professional experience (in order of precedence)
+EXPERIENCE_PATTERNS = [
+    r"(\S+) ?Jahre?n? ?(Beruf|\S*erfahrung|relevant|praktisch|einschlägig|fundiert|Expertise)",
+    r"(\S+) ?jährige[rn]? ?(Beruf|\S*erfahrung|,? praktisch|,? relevant|,? einschlägig|,? fundiert|Expertise)",
+    r"(\S+) ?years?( of)? ?(\S* ?experience|professional|relevant|work|employment|proven|practical)",
+    r"(\S+) ?Berufserfahrung",
+    r"(\S+) ?(professional|work|working|practical) experience",
+    "(Berufseinstieg|Berufseinsteiger)",
+]
+
+NUMBER_WORDS_DE = {"ein": "1", "zwei": "2", "drei": "3", "vier": "4", "fünf": "5", "sechs": "6",
+                   "sieben": "7", "acht": "8", "neun": "9", "zehn": "10"}
+NUMBER_WORDS_EN = {"one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
+                   "seven": "7", "eight": "8", "nine": "9", "ten": "10"}
+QUANTITY_WORDS_DE = {"einigen": "much", "einige": "much", "mehr": "much", "mehrere": "much"}
+
+EXPERIENCE_BINS = {"1": "<=2_years_experience", "2": "<=2_years_experience", "3": "3-4_years_experience",
+                   "4": "3-4_years_experience", "5": ">=5_years_experience", "6": ">=5_years_experience",
+                   "7": ">=5_years_experience", "8": ">=5_years_experience", "9": ">=5_years_experience",
+                   "10": ">=5_years_experience", "little": "<=2_years_experience", "some": "3-4_years_experience",
+                   "much": ">=5_years_experience"}
+EXPERIENCE_CATEGORIES = ["<=2_years_experience", "3-4_years_experience", ">=5_years_experience",
+                         "no_experience_information"]
@@ -0,0 +1,179 @@
+"""
+This script contains the instrumentation of the preprocessing.
+
+Every step of the preprocessing is run through run_stage, which measures its wall time, its CPU time and the number of
+job ads before and after it. Steps that are run several times (e.g. once per chunk) are added up. Tracing the memory
+allocations slows down the preprocessing considerably, so the peak of the memory allocated during a step (relative to
+the memory allocated before it, measured with tracemalloc) is only measured on request; the peak memory of a step is
+the highest peak of all its runs. The report is saved as JSON, so that the durations of different runs can be compared.
+
+With profiling enabled, every step additionally runs under cProfile. The statistics of a step are saved to
+'profiles/<step>.prof' (e.g. for 'python -m pstats' or snakeviz) together with the most expensive functions as text
+('profiles/<step>.txt').
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+import pandas as pd
+
+
+PROFILE_DIRECTORY = "profiles"
+# number of functions in the text summary of a profile
+PROFILE_LINES = 30
+
+
+def create_report(profile=False, memory=False):
+    """Creates an empty report and starts tracing the memory allocations if the peak memory should be measured.
+
+    Parameters
+    ----------
+    profile: bool
+        if the steps should run under cProfile
+    memory: bool
+        if the peak memory of the steps should be measured
+
+    Returns
+    -------
+    report: dict
+        measurements per step, profiles per step (None without profiling), if the memory is measured and start of the
+        preprocessing
+    """
+
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    report = {"stages": {}, "profiles": {} if profile else None, "memory": memory,
+              "start": {"wall": time.perf_counter(), "cpu": time.process_time()}}
+    return report
+
+
+def run_stage(report, function, *args, **kwargs):
+    """Runs a step of the preprocessing and adds its measurements to the report.
+
+    Steps must not be nested, since the peak memory of the outer step would be reset by the inner one.
+
+    Parameters
+    ----------
+    report: dict
+        report of the preprocessing (None to run the step without measurements)
+    function: callable
+        step of the preprocessing (the name of the function is the name of the step, so steps that are measured
+        separately need their own functions)
+    args: tuple
+        positional arguments of the step (the first one is the input data)
+    kwargs: dict
+        keyword arguments of the step
+
+    Returns
+    -------
+    result: object
+        result of the step
+    """
+
+    if report is None:
+        return function(*args, **kwargs)
+    name = function.__name__
+    if report["memory"]:
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+    wall, cpu = time.perf_counter(), time.process_time()
+    if report["profiles"] is None:
+        result = function(*args, **kwargs)
+    else:
+        # the profile of a step collects the statistics of all of its runs
+        result = report["profiles"].setdefault(name, cProfile.Profile()).runcall(function, *args, **kwargs)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+
+    stage = report["stages"].setdefault(name, {"calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0,
+                                               "peak_memory_mb": None, "rows_in": None, "rows_out": None})
+    stage["calls"] += 1
+    stage["wall_seconds"] += wall
+    stage["cpu_seconds"] += cpu
+    if report["memory"]:
+        peak = tracemalloc.get_traced_memory()[1] - memory
+        stage["peak_memory_mb"] = max(stage["peak_memory_mb"] or 0.0, peak / 2 ** 20)
+    for key, rows in [("rows_in", count_rows(args[0]) if args else None), ("rows_out", count_rows(result))]:
+        if rows is not None:
+            stage[key] = (stage[key] or 0) + rows
+    return result
+
+
+def count_rows(value):
+    """Counts the job ads of the input or the result of a step.
+
+    Parameters
+    ----------
+    value: object
+        input or result of a step
+
+    Returns
+    -------
+    rows: int
+        number of rows of the (first) dataframe (None if the value is no dataframe)
+    """
+
+    if isinstance(value, tuple) and value:
+        value = value[0]
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    return None
+
+
+def save_report(report, directory):
+    """Saves the report (and the profiles) and stops tracing the memory allocations if the peak memory was measured.
+
+    Parameters
+    ----------
+    report: dict
+        report of the preprocessing
+    directory: str
+        path to the folder where the report is saved
+
+    Returns
+    -------
+    summary: dict
+        total durations and measurements per step as saved in 'preprocessing_report.json'
+    """
+
+    wall = time.perf_counter() - report["start"]["wall"]
+    cpu = time.process_time() - report["start"]["cpu"]
+    if report["memory"]:
+        tracemalloc.stop()
+    measured = sum(stage["wall_seconds"] for stage in report["stages"].values())
+    # e.g. reading the chunks of the raw data
+    summary = {"wall_seconds": wall, "cpu_seconds": cpu, "unattributed_wall_seconds": max(wall - measured, 0.0),
+               "stages": [dict(stage=name, **stage) for name, stage in report["stages"].items()]}
+    with open(os.path.join(directory, "preprocessing_report.json"), "w", encoding="utf-8") as file:
+        json.dump(summary, file, indent=2)
+    if report["profiles"] is not None:
+        os.makedirs(os.path.join(directory, PROFILE_DIRECTORY), exist_ok=True)
+        for name, profile in report["profiles"].items():
+            path = os.path.join(directory, PROFILE_DIRECTORY, name)
+            profile.dump_stats(path + ".prof")
+            with open(path + ".txt", "w", encoding="utf-8") as file:
+                pstats.Stats(profile, stream=file).sort_stats("cumulative").print_stats(PROFILE_LINES)
+    return summary
+
+
+def print_report(summary):
+    """Prints the measurements of every step.
+
+    Parameters
+    ----------
+    summary: dict
+        result of save_report
+    """
+
+    print(f"{'step':<28} {'calls':>5} {'wall [s]':>9} {'cpu [s]':>9} {'peak [MB]':>10} {'rows in':>9} {'rows out':>9}")
+    for stage in sorted(summary["stages"], key=lambda stage: stage["wall_seconds"], reverse=True):
+        rows = ["" if stage[key] is None else stage[key] for key in ["rows_in", "rows_out"]]
+        peak = "" if stage["peak_memory_mb"] is None else f"{stage['peak_memory_mb']:.1f}"
+        print(f"{stage['stage']:<28} {stage['calls']:>5} {stage['wall_seconds']:>9.2f} {stage['cpu_seconds']:>9.2f} "
+              f"{peak:>10} {rows[0]:>9} {rows[1]:>9}")
+    print(f"{'total':<28} {'':>5} {summary['wall_seconds']:>9.2f} {summary['cpu_seconds']:>9.2f} "
+          f"({summary['unattributed_wall_seconds']:.2f} s outside of the steps)")
+    return None
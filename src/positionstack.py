@@ -1,67 +1,247 @@
 """
 Script to retrieve geographic data of all locations via the Positionstack API.
+
+The file 'geo_data.csv' also serves as persistent cache: locations that are already contained in it (including
+locations for which the API returned no result) are not requested again. New locations are requested in batches over a
+pooled session with rate limiting and retries. For testing without an account, the script 'positionstack_stub.py'
+provides a local server with the same interface.
 """
 
 import os
+import time
+import threading
 import concurrent.futures
 
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
+from urllib3.util.retry import Retry
 
 import config
 from arguments import parse_positionstack
+from geo_index import clear_geo_index, normalize_location
+
+
+API_URL = "http://api.positionstack.com/v1/forward"
+BATCH_SIZE = 80
+MAX_WORKERS = 4
+REQUESTS_PER_SECOND = 5
+MAX_RETRIES = 3
+TIMEOUT = 10
 
 
-def main(directory):
-    """Retrieves geographical data for all locations.
+def main(directory, url=None):
+    """Retrieves geographical data for all locations that are not yet contained in the cache.
 
     Parameters
     ----------
     directory: str
         path to the folder where the data of all job ads are stored
+    url: str
+        URL of the forward geocoding endpoint (default: 'positionstack_url' of the config or the official API)
     """
     try:
-        df = pd.read_csv(os.path.join(directory, "data_long.csv"))
+        df = pd.read_csv(os.path.join(directory, "data_long.csv"), usecols=["location"])
     except FileNotFoundError:
         print("Needed Data was not found in directory.")
     else:
         print("get geo data")
-        api_key = config.positionstack_key
-        locations = df["location"].unique()
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            geo_data = list(tqdm(executor.map(lambda x: get_location(x, api_key), locations), total=len(locations)))
-        geo_data = pd.concat(geo_data)
-        geo_data.to_csv(os.path.join(directory, "geo_data.csv"), index=False)
+        if url is None:
+            url = getattr(config, "positionstack_url", API_URL)
+        api_key = getattr(config, "positionstack_key", None)
+        path = os.path.join(directory, "geo_data.csv")
+        cache = load_cache(path)
+        cached = set(cache["location"].map(normalize_location))
+        locations = [location for location in df["location"].dropna().unique()
+                     if normalize_location(location) not in cached]
+        print(f"{len(locations)} new locations ({len(cached)} cached)")
+        if len(locations) == 0:
+            return None
+        session = create_session()
+        limiter = create_rate_limiter(REQUESTS_PER_SECOND)
+        batches = [locations[start:start + BATCH_SIZE] for start in range(0, len(locations), BATCH_SIZE)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            results = executor.map(lambda x: get_batch(session, x, api_key, url, limiter), batches)
+            geo_data = [record for batch in tqdm(results, total=len(batches)) for record in batch]
+        if len(geo_data) == 0:
+            return None
+        geo_data = pd.concat([cache, pd.DataFrame.from_records(geo_data)], ignore_index=True)
+        geo_data.to_csv(path, index=False)
+        # lookups must see the newly retrieved locations
+        clear_geo_index()
+    return None
+
+
+def load_cache(path):
+    """Loads the previously retrieved geographic data.
+
+    Parameters
+    ----------
+    path: str
+        path to 'geo_data.csv'
+
+    Returns
+    -------
+    cache: pandas.DataFrame
+        previously retrieved geographic data (empty if no data was retrieved yet)
+    """
+
+    try:
+        cache = pd.read_csv(path)
+    except FileNotFoundError:
+        cache = pd.DataFrame(columns=["location"])
+    return cache
+
+
+def create_session():
+    """Creates a session with connection pooling and automatic retries of failed requests.
+
+    Returns
+    -------
+    session: requests.Session
+        session for all requests to the API
+    """
+
+    retry = Retry(total=MAX_RETRIES, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                  allowed_methods=None, respect_retry_after_header=True)
+    adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_rate_limiter(rate):
+    """Creates a rate limiter that is shared by all threads.
+
+    Parameters
+    ----------
+    rate: float
+        maximum number of requests per second
+
+    Returns
+    -------
+    limiter: dict
+        minimum interval between two requests and time of the next free slot
+    """
+
+    limiter = {"interval": 1 / rate, "next": time.monotonic(), "lock": threading.Lock()}
+    return limiter
+
+
+def wait_for_slot(limiter):
+    """Blocks until the next request may be sent.
+
+    Parameters
+    ----------
+    limiter: dict
+        rate limiter
+    """
+
+    with limiter["lock"]:
+        now = time.monotonic()
+        slot = max(now, limiter["next"])
+        limiter["next"] = slot + limiter["interval"]
+    time.sleep(slot - now)
     return None
 
 
-def get_location(location, key):
+def get_batch(session, locations, key, url=API_URL, limiter=None):
+    """Retrieves the geographic information for several locations with a single batch request.
+
+    If the batch request is rejected (e.g. because batch requests are not included in the plan of the account), the
+    locations are requested one by one.
+
+    Parameters
+    ----------
+    session: requests.Session
+        session for all requests to the API
+    locations: list
+        locations for which the information is to be retrieved
+    key: str
+        private key of a required Positionstack account
+    url: str
+        URL of the forward geocoding endpoint
+    limiter: dict
+        rate limiter (no limit if None)
+
+    Returns
+    -------
+    results: list
+        one record per location that was answered by the API (locations with failed requests are omitted)
+    """
+
+    body = {"access_key": key, "batch": [{"query": location, "limit": 1, "country": "DE"} for location in locations]}
+    if limiter is not None:
+        wait_for_slot(limiter)
+    try:
+        data = session.post(url, json=body, timeout=TIMEOUT).json()["data"]
+    except (requests.RequestException, ValueError, KeyError, TypeError):
+        data = None
+    if not isinstance(data, list) or len(data) != len(locations):
+        results = [get_location(session, location, key, url, limiter) for location in locations]
+        return [record for record in results if record is not None]
+    results = [create_record(location, element) for location, element in zip(locations, data)]
+    return results
+
+
+def get_location(session, location, key, url=API_URL, limiter=None):
     """Retrieve the geographic information for a specified location.
 
     Parameters
     ----------
+    session: requests.Session
+        session for all requests to the API
     location: str
         location for which the information is to be retrieved
     key: str
         private key of a required Positionstack account
+    url: str
+        URL of the forward geocoding endpoint
+    limiter: dict
+        rate limiter (no limit if None)
 
     Returns
     -------
-    results: pandas.DataFrame
-        contains various geographic information if the request was successful
+    record: dict
+        contains various geographic information if the request was successful (None if the request failed)
     """
-    url = f"http://api.positionstack.com/v1/forward?access_key={key}&query={location}&limit=1&country=DE"
+    params = {"access_key": key, "query": location, "limit": 1, "country": "DE"}
+    if limiter is not None:
+        wait_for_slot(limiter)
     try:
-        results = pd.DataFrame(requests.get(url).json()["data"])
-    except KeyError:
+        data = session.get(url, params=params, timeout=TIMEOUT).json()["data"]
+    except (requests.RequestException, ValueError, KeyError, TypeError):
         return None
-    else:
-        results["location"] = [location]
-        return results
+    return create_record(location, data)
+
+
+def create_record(location, data):
+    """Combines the answer of the API for a location into a single record.
+
+    Parameters
+    ----------
+    location: str
+        location that was sent to the API
+    data: list
+        results of the API for the location
+
+    Returns
+    -------
+    record: dict
+        first result of the API (only the location if the API found no result, so that it is not requested again)
+    """
+
+    # answers of batch requests may contain the results directly or wrapped in a list
+    if isinstance(data, dict):
+        data = [data]
+    record = dict(data[0]) if data else {}
+    record["location"] = location
+    return record
 
 
 if __name__ == "__main__":
     # if the script is executed directly, the directory must be passed via the command line
     args = parse_positionstack()
-    main(args.directory)
+    main(args.directory, args.url)
@@ -0,0 +1,128 @@
+"""
+Local stub of the Positionstack API to test the retrieval of geographic data without an account or internet connection.
+
+The server answers single and batch requests to '/v1/forward' with the records of an existing 'geo_data.csv'. Unknown
+locations are answered with an empty result. Optionally, batch requests can be rejected (as for accounts without batch
+access) and a fraction of the requests can fail with status 503 to test the retries of the client. Example:
+
+    python src/positionstack_stub.py --geo_data data/geo_data.csv --port 8000
+    python src/positionstack.py --directory data --url http://localhost:8000/v1/forward
+"""
+
+import json
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pandas as pd
+
+from arguments import parse_positionstack_stub
+from geo_index import normalize_location
+
+
+def main():
+    """Starts the stub server."""
+
+    args = parse_positionstack_stub()
+    server = create_server(args.geo_data, args.port, args.no_batch, args.error_rate)
+    print(f"serving {len(server.records)} locations on http://localhost:{args.port}/v1/forward")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"{server.counts['single']} single requests, {server.counts['batch']} batch requests, "
+              f"{server.counts['error']} simulated errors")
+    return None
+
+
+def create_server(path, port, no_batch=False, error_rate=0):
+    """Creates the stub server.
+
+    Parameters
+    ----------
+    path: str
+        path to a 'geo_data.csv' whose records are returned
+    port: int
+        port of the server (0 to choose a free port)
+    no_batch: bool
+        if batch requests should be rejected
+    error_rate: float
+        fraction of the requests that are answered with status 503
+
+    Returns
+    -------
+    server: http.server.ThreadingHTTPServer
+        server with the records and the request counts as additional attributes
+    """
+
+    geo_df = pd.read_csv(path)
+    geo_df = geo_df.loc[geo_df["type"].notna()]
+    records = {}
+    for record in geo_df.to_dict("records"):
+        location = normalize_location(record.pop("location"))
+        records.setdefault(location, {key: (None if pd.isna(value) else value) for key, value in record.items()})
+    server = ThreadingHTTPServer(("localhost", port), StubHandler)
+    server.records = records
+    server.no_batch = no_batch
+    server.error_rate = error_rate
+    server.counts = {"single": 0, "batch": 0, "error": 0}
+    server.lock = threading.Lock()
+    return server
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers requests to the forward geocoding endpoint."""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("query", [""])[0]
+        if self.check_error("single"):
+            return None
+        self.send_json(200, {"data": self.geocode(query)})
+        return None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length))
+            batch = body["batch"]
+        except (ValueError, KeyError, TypeError):
+            self.send_json(422, {"error": {"code": "validation_error", "message": "Request failed."}})
+            return None
+        if self.server.no_batch:
+            self.send_json(403, {"error": {"code": "batch_not_supported_on_plan",
+                                           "message": "Batch requests are not supported on the current plan."}})
+            return None
+        if self.check_error("batch"):
+            return None
+        self.send_json(200, {"data": [self.geocode(element.get("query", "")) for element in batch]})
+        return None
+
+    def geocode(self, query):
+        record = self.server.records.get(normalize_location(query))
+        return [] if record is None else [record]
+
+    def check_error(self, kind):
+        with self.server.lock:
+            failed = random.random() < self.server.error_rate
+            self.server.counts["error" if failed else kind] += 1
+        if failed:
+            self.send_json(503, {"error": {"code": "service_unavailable", "message": "Simulated error."}})
+        return failed
+
+    def send_json(self, status, content):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return None
+
+
+if __name__ == "__main__":
+    main()
@@ -8,11 +8,20 @@ import warnings
 
 import numpy as np
 import pandas as pd
-from sklearn.preprocessing import OneHotEncoder
 
 import config
-import positionstack
 from arguments import parse_preprocessing
+from geo_index import geocode_location, lookup_locations
+from near_duplicates import load_index, save_index, remove_near_duplicates
+from patterns import (TITLE_CATEGORIES, EXPERIENCE_LEVELS, COMPANY_SIZES, REQUIREMENT_PATTERNS, EXPERIENCE_PATTERNS,
+                      NUMBER_WORDS_DE, NUMBER_WORDS_EN, QUANTITY_WORDS_DE, EXPERIENCE_BINS, EXPERIENCE_CATEGORIES)
+from skill_matrix import pack_flags, concat_matrices, save_skill_matrix
+from requirement_cube import create_cube, add_cubes, save_cube
+from similar_jobs import relevant_job_features, create_similarity_index, save_similarity_index
+from location_counts import create_location_counts, add_location_counts, save_location_counts
+from feature_store import (create_feature_store, save_feature_store, create_store_parts, append_store_part,
+                           save_store_parts)
+from pipeline_report import create_report, run_stage, save_report, print_report
 
 
 def main():
@@ -21,36 +30,312 @@ def main():
     Two different dataframes are generated from the raw data:
     1. long format: contains one entry per location ==> needed for regional analysis
     2. wide format: contains one entry per job ad ==> needed for all further analysis
+
+    In addition, the requirement flags of the wide format are saved as bit-packed matrix, aggregated for every
+    combination of the filters of the requirement analysis and indexed to find similar job ads, and the features of the
+    salary estimation are saved as new version of the feature store.
+
+    The wall time, CPU time and number of job ads of every step are saved to 'preprocessing_report.json' (see
+    pipeline_report.py), with --memory also the peak memory and with --profile the cProfile statistics of every step.
     """
 
     warnings.filterwarnings('ignore')
     args = parse_preprocessing()
-    try:
-        data = pd.read_csv(os.path.join(args.directory, "data_raw.csv"))
-    except FileNotFoundError:
-        print("Needed data was not found in directory.")
+    report = create_report(args.profile, args.memory)
+    if args.chunksize is not None:
+        preprocess_in_chunks(args.directory, args.geo_data, args.chunksize, args.near_duplicates, report,
+                             args.previous_crawls)
     else:
-        data = filter_contract_types(data)
-        data = convert_work_types(data)
-        data = convert_title(data)
-        data = extract_experience_level(data)
-        data = convert_salary(data)
-        data, data_long = extract_locations(data)
-        data_long.to_csv(os.path.join(args.directory, "data_long.csv"), index=False)
-        if args.geo_data:
-            positionstack.main(args.directory)
-            data_long = integrate_geo_data(data_long, args.directory)
-            data_long.to_csv(os.path.join(args.directory, "data_long.csv"), index=False)
-        data = create_location_features(data, args.directory, args.geo_data)
-        data = convert_industries(data)
-        data = convert_company_size(data)
-        data = extract_requirements(data)
-        data = extract_experience(data)
-        data = remove_duplicates(data)
-        data.to_csv(os.path.join(args.directory, "data_wide.csv"), index=False)
+        try:
+            data = run_stage(report, pd.read_csv, os.path.join(args.directory, "data_raw.csv"))
+        except FileNotFoundError:
+            print("Needed data was not found in directory.")
+        else:
+            preprocess_in_memory(data, args.directory, args.geo_data, args.near_duplicates, report,
+                                 args.previous_crawls)
+    if report["stages"]:
+        print_report(save_report(report, args.directory))
+    return None
+
+
+def preprocess_in_memory(data, directory, geo_flag, threshold=None, report=None, previous=False):
+    """Transforms and saves the data of all job ads at once.
+
+    Parameters
+    ----------
+    data: pandas.DataFrame
+        raw data
+    directory: str
+        path to the folder where the data of all job ads are stored
+    geo_flag: bool
+        if geographic information should be retrieved from the Positionstack API
+    threshold: float
+        minimum similarity of the text descriptions to remove near-duplicates (None to keep them)
+    report: dict
+        report of the preprocessing (None to run the steps without measurements)
+    previous: bool
+        if near-duplicates of job ads of previous crawls are removed even if those job ads are no longer part of the
+        data
+    """
+
+    data, data_long = transform_locations(data, report)
+    if geo_flag:
+        run_stage(report, save_locations, data_long, directory)
+        run_stage(report, retrieve_geo_data, directory)
+        data_long = run_stage(report, integrate_geo_data, data_long, directory)
+        run_stage(report, save_location_counts, run_stage(report, create_location_counts, data_long),
+                  os.path.join(directory, "location_counts.csv"))
+    run_stage(report, save_data_long, data_long, directory)
+    data = transform_features(data, directory, geo_flag, report)
+    data = run_stage(report, remove_duplicates, data)
+    if threshold is not None:
+        index = run_stage(report, load_index, os.path.join(directory, "near_duplicates.npz"))
+        data = run_stage(report, remove_near_duplicates, data, index, threshold, previous)
+        run_stage(report, save_index, index, os.path.join(directory, "near_duplicates.npz"))
+    run_stage(report, save_data_wide, data, directory)
+    skills = run_stage(report, pack_flags, data)
+    run_stage(report, save_skill_matrix, skills, os.path.join(directory, "skills.npz"))
+    run_stage(report, save_cube, run_stage(report, create_cube, data, skills),
+              os.path.join(directory, "requirements_cube.csv"))
+    index = run_stage(report, create_similarity_index, *run_stage(report, relevant_job_features, data, skills))
+    run_stage(report, save_similarity_index, index, os.path.join(directory, "similar_jobs.npz"))
+    run_stage(report, save_feature_store, run_stage(report, create_feature_store, data, directory=directory),
+              directory)
     return None
 
 
+def preprocess_in_chunks(directory, geo_flag, chunksize, threshold=None, report=None, previous=False):
+    """Loads, transforms and saves the data in chunks to limit the memory usage for very large raw data.
+
+    All steps except the removal of duplicates only depend on the job ad itself, so they are applied to each chunk
+    separately and the results are appended to the output files. Duplicates are removed across chunks by keeping the
+    hashes of all previously seen job ads (8 bytes per job ad). If geographic information is requested, the locations of
+    all job ads are extracted in a first pass, so that the Positionstack API can be queried before the second pass.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder where the data of all job ads are stored
+    geo_flag: bool
+        if geographic information should be retrieved from the Positionstack API
+    chunksize: int
+        number of job ads per chunk
+    threshold: float
+        minimum similarity of the text descriptions to remove near-duplicates (None to keep them)
+    report: dict
+        report of the preprocessing (None to run the steps without measurements)
+    previous: bool
+        if near-duplicates of job ads of previous crawls are removed even if those job ads are no longer part of the
+        data
+    """
+
+    path = os.path.join(directory, "data_raw.csv")
+    if not os.path.exists(path):
+        print("Needed data was not found in directory.")
+        return None
+    if geo_flag:
+        header = True
+        for data in read_raw_chunks(path, chunksize):
+            _, data_long = transform_locations(data, report)
+            run_stage(report, save_locations, data_long, directory, header)
+            header = False
+        run_stage(report, retrieve_geo_data, directory)
+    columns = None
+    seen = np.array([], dtype="uint64")
+    matrices = []
+    cubes = []
+    features = []
+    parts = None
+    location_counts = []
+    if threshold is not None:
+        index = run_stage(report, load_index, os.path.join(directory, "near_duplicates.npz"))
+    for data in read_raw_chunks(path, chunksize):
+        data, data_long = transform_locations(data, report)
+        if len(data) == 0:
+            continue
+        if geo_flag:
+            data_long = run_stage(report, integrate_geo_data, data_long, directory)
+            location_counts.append(run_stage(report, create_location_counts, data_long))
+        data = transform_features(data, directory, geo_flag, report)
+        data, seen = run_stage(report, remove_seen_duplicates, data, seen)
+        if threshold is not None:
+            data = run_stage(report, remove_near_duplicates, data, index, threshold, previous)
+        # the column order can differ between chunks (e.g. depending on the data type of the salaries)
+        header = columns is None
+        if header:
+            columns = (data_long.columns, data.columns)
+        run_stage(report, save_data_long, data_long[columns[0]], directory, header)
+        run_stage(report, save_data_wide, data[columns[1]], directory, header)
+        matrices.append(run_stage(report, pack_flags, data))
+        cubes.append(run_stage(report, create_cube, data, matrices[-1]))
+        features.append(run_stage(report, relevant_job_features, data, matrices[-1]))
+        # the feature store is written chunk by chunk and merged from disk after the last chunk
+        if parts is None:
+            parts = create_store_parts(directory)
+        run_stage(report, append_store_part, data, parts)
+    if threshold is not None:
+        run_stage(report, save_index, index, os.path.join(directory, "near_duplicates.npz"))
+    if location_counts:
+        run_stage(report, save_location_counts, run_stage(report, add_location_counts, location_counts),
+                  os.path.join(directory, "location_counts.csv"))
+    if matrices:
+        run_stage(report, save_skill_matrix, run_stage(report, concat_matrices, matrices),
+                  os.path.join(directory, "skills.npz"))
+        run_stage(report, save_cube, run_stage(report, add_cubes, cubes),
+                  os.path.join(directory, "requirements_cube.csv"))
+        links, bits = (np.concatenate(arrays) for arrays in zip(*features))
+        run_stage(report, save_similarity_index, run_stage(report, create_similarity_index, links, bits),
+                  os.path.join(directory, "similar_jobs.npz"))
+    if parts is not None:
+        run_stage(report, save_store_parts, parts, directory)
+    return None
+
+
+def retrieve_geo_data(directory):
+    """Requests the geographic information of all new locations of 'data_long.csv' from the Positionstack API.
+
+    Parameters
+    ----------
+    directory: str
+        path to the folder where the data of all job ads are stored
+    """
+
+    import positionstack
+    positionstack.main(directory)
+    return None
+
+
+def save_locations(df_long, directory, header=True):
+    """Saves the locations of the long format data as 'data_long.csv', so that the geographic information of new
+    locations can be requested before the geographic data is integrated (see retrieve_geo_data).
+
+    Parameters
+    ----------
+    df_long: pandas.DataFrame
+        long format data (contains one entry per location)
+    directory: str
+        path to the folder where the data of all job ads are stored
+    header: bool
+        if the file is created (False to append a chunk)
+    """
+
+    df_long[["location"]].to_csv(os.path.join(directory, "data_long.csv"), mode="w" if header else "a", header=header,
+                                 index=False)
+    return None
+
+
+def save_data_long(df_long, directory, header=True):
+    """Saves the long format data as 'data_long.csv'.
+
+    Parameters
+    ----------
+    df_long: pandas.DataFrame
+        long format data (contains one entry per location)
+    directory: str
+        path to the folder where the data of all job ads are stored
+    header: bool
+        if the file is created (False to append a chunk)
+    """
+
+    df_long.to_csv(os.path.join(directory, "data_long.csv"), mode="w" if header else "a", header=header, index=False)
+    return None
+
+
+def save_data_wide(df, directory, header=True):
+    """Saves the wide format data as 'data_wide.csv'.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data (contains one entry per job)
+    directory: str
+        path to the folder where the data of all job ads are stored
+    header: bool
+        if the file is created (False to append a chunk)
+    """
+
+    df.to_csv(os.path.join(directory, "data_wide.csv"), mode="w" if header else "a", header=header, index=False)
+    return None
+
+
+def read_raw_chunks(path, chunksize):
+    """Reads the raw data in chunks.
+
+    Text columns are always read as strings, since a small chunk may contain only missing values for a column.
+
+    Parameters
+    ----------
+    path: str
+        path to the raw data
+    chunksize: int
+        number of job ads per chunk
+
+    Returns
+    -------
+    chunks: iterator
+        dataframes with up to chunksize job ads
+    """
+
+    text_columns = ["link", "company", "title", "location", "contract_type", "work_type", "content", "industry",
+                    "company_link", "release_date", "company_size"]
+    return pd.read_csv(path, chunksize=chunksize, dtype={column: "object" for column in text_columns})
+
+
+def transform_locations(df, report=None):
+    """Runs all steps up to the extraction of the locations.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        raw data
+    report: dict
+        report of the preprocessing (None to run the steps without measurements)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        transformed dataframe
+    df_long: pandas.DataFrame
+        transformed dataframe in long format (contains one entry per location)
+    """
+
+    df = run_stage(report, filter_contract_types, df)
+    df = run_stage(report, convert_work_types, df)
+    df = run_stage(report, convert_title, df)
+    df = run_stage(report, extract_experience_level, df)
+    df = run_stage(report, convert_salary, df)
+    df, df_long = run_stage(report, extract_locations, df)
+    return df, df_long
+
+
+def transform_features(df, directory, geo_flag, report=None):
+    """Runs all steps after the extraction of the locations except the removal of duplicates.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        result of transform_locations
+    directory: str
+        needed to find the stored data of the Positionstack API
+    geo_flag: bool
+        if geo_data is available to extract the region
+    report: dict
+        report of the preprocessing (None to run the steps without measurements)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        transformed dataframe
+    """
+
+    df = run_stage(report, create_location_features, df, directory, geo_flag)
+    df = run_stage(report, convert_industries, df)
+    df = run_stage(report, convert_company_size, df)
+    df = run_stage(report, extract_requirements, df)
+    df = run_stage(report, extract_experience, df)
+    return df
+
+
 def filter_contract_types(df):
     """Filters out unwanted contract types (e.g. internship).
 
@@ -65,7 +350,6 @@ def filter_contract_types(df):
         transformed dataframe
     """
 
-    print("filter contract type")
     df["permanent_employment"] = df["contract_type"].str.contains("Feste Anstellung")
     df["trainee"] = df["contract_type"].str.contains("Trainee")
     df = df.loc[(df["permanent_employment"] == 1) | (df["trainee"] == 1)]
@@ -87,7 +371,6 @@ def convert_work_types(df):
         transformed dataframe
     """
 
-    print("convert work type")
     df["full_time"] = df["work_type"].str.contains("Vollzeit")
     df["part_time"] = df["work_type"].str.contains("Teilzeit")
     df["home_office_possible"] = df["work_type"].str.contains("Home Office möglich")
@@ -109,15 +392,9 @@ def convert_title(df):
         transformed dataframe
     """
 
-    print("convert title")
     df["title_category"] = "Others"
-    df.loc[df["title"].str.contains("Software|Developer|Entwickler", case=False, regex=True), "title_category"] = "Software Engineer"
-    df.loc[df["title"].str.contains("Analyst|Business[- ]*Intelligence|Analytics|Reporting", case=False, regex=True), "title_category"] = "Data Analyst"
-    df.loc[df["title"].str.contains("Data[ \S]*Scien|Research[ \S]*(Scientist|Engineer)|Statistik", case=False, regex=True), "title_category"] = "Data Scientist"
-    df.loc[df["title"].str.contains("(Data|Cloud)[ \S]*(Engineer|Archite(c|k)t|Specialist)|Data Warehouse|Datenbank|Database", case=False, regex=True), "title_category"] = "Data Engineer"
-    df.loc[df["title"].str.contains("Machine[- ]*Learning|Deep[- ]*Learning|(\W|^)(AI|KI|ML|DL)(\W|$)|Artificial[- ]*Intelligence|Künstliche[- ]*Intelligenz|MLOps", case=False, regex=True), "title_category"] = "Machine Learning Engineer"
-    df.loc[df["title"].str.contains("Consultant|Berater|Consulting", case=False, regex=True), "title_category"] = "Data Science Consultant"
-    df.loc[df["title"].str.contains("Manager|Head|Lead|Leiter|Leitung|Vorstand|Chief|Owner|Partner|Director", case=False, regex=True), "title_category"] = "Data Science Manager"
+    for category, pattern in TITLE_CATEGORIES.items():
+        df.loc[df["title"].str.contains(pattern, case=False, regex=True), "title_category"] = category
     return df
 
 
@@ -135,10 +412,9 @@ def extract_experience_level(df):
         transformed dataframe
     """
 
-    print("extract experience level")
     df["experience_level"] = "No Information"
-    df.loc[df["title"].str.contains("Junior|Jr.", case=False), "experience_level"] = "Junior"
-    df.loc[df["title"].str.contains("Senior|Sr.", case=False), "experience_level"] = "Senior"
+    for level, pattern in EXPERIENCE_LEVELS.items():
+        df.loc[df["title"].str.contains(pattern, case=False), "experience_level"] = level
     return df
 
 
@@ -156,7 +432,6 @@ def convert_salary(df):
         transformed dataframe
     """
 
-    print("convert salary")
     if df["salary"].dtype == "object":
         min_salaries = df["salary"].str.split(" ").str[0].str.replace(".", "", regex=False).astype("float")
         max_salaries = df["salary"].str.split(" ").str[2].str.replace(".", "", regex=False).astype("float")
@@ -184,7 +459,6 @@ def extract_locations(df):
         transformed dataframe in long format (contains one entry per location)
     """
 
-    print("extract_locations")
     locations = df["location"].str.strip(" ,")
     locations = locations.str.split(", ?").explode()
     locations = locations.str.split(" ?/ ?").explode()
@@ -228,10 +502,9 @@ def integrate_geo_data(df_long, directory):
         transformed dataframe in long format (contains one entry per location) with additional geographic information
     """
 
-    print("integrate geo data")
-    geo_df = pd.read_csv(os.path.join(directory, "geo_data.csv"))
-    geo_df = geo_df.loc[(geo_df["type"] == "locality") & (geo_df["confidence"] == 1)]
-    df_long = pd.merge(df_long, geo_df[["latitude", "longitude", "location", "region"]], on="location", how="inner")
+    geo_data = lookup_locations(df_long["location"], directory)
+    df_long[["latitude", "longitude", "region"]] = geo_data[["latitude", "longitude", "region"]]
+    df_long = df_long.loc[geo_data["locality"].notna()].reset_index(drop=True)
     return df_long
 
 
@@ -258,25 +531,25 @@ def create_location_features(df, directory, geo_flag):
         transformed dataframe
     """
 
-    # helper function
-    def remove_element(x):
-        x.remove("bundesweit")
-        return x
-
-    print("create location features")
-    df.loc[(df["location"].apply(lambda x: "bundesweit" in x)) & (
-                df["location"].apply(lambda x: len(x)) > 1), "location"].apply(remove_element)
-    df.loc[(df["location"].apply(lambda x: "bundesweit" in x)) & (
-                df["location"].apply(lambda x: len(x)) > 1), "location"].apply(remove_element)
-    df["main_location"] = df["location"].str[0]
-    df["multiple_locations"] = df["location"].apply(lambda x: len(x) > 1)
+    # long format with one entry per location, indexed by the position of the job ad
+    locations = df["location"].reset_index(drop=True).explode()
+    positions = locations.index.to_numpy()
+    locations = locations.to_numpy()
+    bundesweit = locations == "bundesweit"
+    num_locations = np.bincount(positions, minlength=len(df))
+    # "bundesweit" is removed up to two times, as long as at least one other location remains
+    num_removed = np.minimum(np.minimum(np.bincount(positions, weights=bundesweit, minlength=len(df)), 2),
+                             num_locations - 1)
+    rank = np.cumsum(bundesweit)
+    starts = np.cumsum(num_locations) - num_locations
+    rank -= np.repeat(rank[starts] - bundesweit[starts], num_locations)
+    kept = ~(bundesweit & (rank <= num_removed[positions]))
+    first = np.diff(positions[kept], prepend=-1) != 0
+    df["main_location"] = locations[kept][first]
+    df["multiple_locations"] = num_locations - num_removed > 1
     if geo_flag:
-        geo_df = pd.read_csv(os.path.join(directory, "geo_data.csv"))
-        df = pd.merge(df, geo_df[["location", "region"]], left_on="main_location", right_on="location",
-                      suffixes=(None, "_y"), how="left")
-        df.drop("location_y", axis=1, inplace=True)
+        df["main_region"] = lookup_locations(df["main_location"], directory, locality_only=False)["region"]
     df.drop("location", axis=1, inplace=True)
-    df.rename({"region": "main_region"}, axis=1, inplace=True)
     return df
 
 
@@ -294,7 +567,6 @@ def convert_industries(df):
         transformed dataframe
     """
 
-    print("convert industries")
     try:
         df["main_industry"] = df["industry"].str.split("|").str[0]
     except AttributeError:
@@ -317,10 +589,7 @@ def convert_company_size(df):
         transformed dataframe
     """
 
-    print("convert company size")
-    df["company_size"] = df["company_size"].replace({"11-50": "0-50", "1-10": "0-50", ">15": "0-50",
-                                                     "1000+": "1001-2500", "130": "51-250", "approx. 250": "251-500",
-                                                     "201-500 Mitarbeiter": "251-500", "120": "251-500"})
+    df["company_size"] = df["company_size"].replace(COMPANY_SIZES)
     return df
 
 
@@ -347,135 +616,13 @@ def extract_requirements(df):
         transformed dataframe
     """
 
-    print("extract skills")
-    # programming languages (18)
-    df["python"] = df["content"].str.contains("Python", case=False)
-    df["r"] = df["content"].str.contains("\WR(\W|Studio)", case=False, regex=True)
-    df["sql"] = df["content"].str.contains("(?<!No)SQL", case=False)
-    df["java"] = df["content"].str.contains("Java ", case=False)
-    df["javascript"] = df["content"].str.contains("Javascript", case=False)
-    df["c"] = df["content"].str.contains("\WC ", case=False, regex=True)
-    df["c++"] = df["content"].str.contains("C\+\+", case=False, regex=True)
-    df["c#"] = df["content"].str.contains("C#", case=False, regex=True)
-    df["scala"] = df["content"].str.contains("Scala ", case=False)
-    df["julia"] = df["content"].str.contains("Julia", case=False)
-    df["matlab"] = df["content"].str.contains("Matlab", case=False)
-    df["swift"] = df["content"].str.contains("Swift", case=False)
-    df["go"] = df["content"].str.contains("\WGo |Golang", case=True)
-    df["perl"] = df["content"].str.contains("Perl", case=False)
-    df["php"] = df["content"].str.contains("Php", case=False)
-    df["html"] = df["content"].str.contains("HTML", case=False)
-    df["css"] = df["content"].str.contains("CSS", case=False)
-    df["rust"] = df["content"].str.contains("\WRust\W", case=False, regex=True)
-    # tools (31)
-    df["excel"] = df["content"].str.contains("Excel", case=True)
-    df["tableau"] = df["content"].str.contains("Tableau", case=False)
-    df["power_bi"] = df["content"].str.contains("Power ?BI|PBI", case=False, regex=True)
-    df["spark"] = df["content"].str.contains("Spark", case=False)
-    df["hadoop"] = df["content"].str.contains("Hadoop", case=False)
-    df["hive"] = df["content"].str.contains("Hive", case=False)
-    df["aws"] = df["content"].str.contains("AWS|Amazon ?Web ?Services|Redshift", case=False, regex=True)
-    df["kafka"] = df["content"].str.contains("Kafka", case=False)
-    df["azure"] = df["content"].str.contains("Azure|Synapse", case=False)
-    df["google_cloud"] = df["content"].str.contains("Google ?Cloud|GCP|Big ?query", case=False)
-    df["docker"] = df["content"].str.contains("Docker", case=False)
-    df["git"] = df["content"].str.contains("\WGit", case=False, regex=True)
-    df["linux"] = df["content"].str.contains("Linux|Unix|Bash|Shell", case=False, regex=True)
-    df["kubernetes"] = df["content"].str.contains("Kubernetes", case=False)
-    df["jenkins"] = df["content"].str.contains("Jenkins", case=False)
-    df["airflow"] = df["content"].str.contains("Airflow", case=False)
-    df["databricks"] = df["content"].str.contains("Databricks", case=False)
-    df["sas"] = df["content"].str.contains("\WSas\W", case=False, regex=True)
-    df["spss"] = df["content"].str.contains("Spss", case=False, regex=True)
-    df["terraform"] = df["content"].str.contains("Terraform", case=False, regex=True)
-    df["ansible"] = df["content"].str.contains("Ansible", case=False, regex=True)
-    df["puppet"] = df["content"].str.contains("Puppet", case=False, regex=True)
-    df["mlflow"] = df["content"].str.contains("Mlflow", case=False, regex=True)
-    df["kubeflow"] = df["content"].str.contains("Kubeflow", case=False, regex=True)
-    df["splunk"] = df["content"].str.contains("Splunk", case=False, regex=True)
-    df["talend"] = df["content"].str.contains("Talend", case=False, regex=True)
-    df["prometheus"] = df["content"].str.contains("Prometheus", case=False, regex=True)
-    df["grafana"] = df["content"].str.contains("Grafana", case=False, regex=True)
-    df["flink"] = df["content"].str.contains("Flink", case=False, regex=True)
-    df["storm"] = df["content"].str.contains("Storm", case=False, regex=True)
-    df["looker"] = df["content"].str.contains("Looker", case=False, regex=True)
-    # databases / data warehouses (21)
-    df["mysql"] = df["content"].str.contains("My ?SQL", case=False, regex=True)
-    df["postgresql"] = df["content"].str.contains("Postgre", case=False, regex=True)
-    df["oracle"] = df["content"].str.contains("Oracle", case=False, regex=True)
-    df["sql_server"] = df["content"].str.contains("SQL ?Server", case=False, regex=True)
-    df["maria_db"] = df["content"].str.contains("Maria ?DB", case=False, regex=True)
-    df["sqlite"] = df["content"].str.contains("Sqlite", case=False, regex=True)
-    df["ibm_db2"] = df["content"].str.contains("DB2", case=False, regex=True)
-    df["amazon_redshift"] = df["content"].str.contains("Redshift", case=False, regex=True)
-    df["google_bigquery"] = df["content"].str.contains("Big ?Query", case=False, regex=True)
-    df["azure_synapse"] = df["content"].str.contains("Synapse", case=False, regex=True)
-    df["snowflake"] = df["content"].str.contains("Snowflake", case=False, regex=True)
-    df["redis"] = df["content"].str.contains("Redis", case=False, regex=True)
-    df["dynamo_db"] = df["content"].str.contains("Dynamo ?DB", case=False, regex=True)
-    df["mongo_db"] = df["content"].str.contains("Mongo ?DB", case=False, regex=True)
-    df["firebase"] = df["content"].str.contains("Firebase", case=False, regex=True)
-    df["couch_db"] = df["content"].str.contains("Couch ?DB|Couchbase", case=False, regex=True)
-    df["cassandra"] = df["content"].str.contains("Cassandra", case=False, regex=True)
-    df["hbase"] = df["content"].str.contains("H ?Base", case=False, regex=True)
-    df["neo4j"] = df["content"].str.contains("Neo4j", case=False, regex=True)
-    df["amazon_neptune"] = df["content"].str.contains("Amazon ?Neptune", case=False, regex=True)
-    df["elastic_search"] = df["content"].str.contains("Elastic ?Search", case=False, regex=True)
-    # python libraries (18)
-    df["pandas"] = df["content"].str.contains("Pandas", case=False)
-    df["numpy"] = df["content"].str.contains("Numpy", case=False)
-    df["tensorflow/keras"] = df["content"].str.contains("Tensorflow|Keras", case=False)
-    df["pytorch"] = df["content"].str.contains("Pytorch", case=False)
-    df["matplotlib"] = df["content"].str.contains("Matplotlib", case=False)
-    df["seaborn"] = df["content"].str.contains("Seaborn", case=False)
-    df["scikit-learn"] = df["content"].str.contains("(scikit[ -]?learn|sklearn)", case=False, regex=True)
-    df["plotly"] = df["content"].str.contains("plotly", case=False)
-    df["streamlit"] = df["content"].str.contains("stream[ -]lit", case=False)
-    df["spacy"] = df["content"].str.contains("spacy", case=False)
-    df["nltk"] = df["content"].str.contains("nltk", case=False)
-    df["scipy"] = df["content"].str.contains("scipy", case=False)
-    df["statsmodels"] = df["content"].str.contains("statsmodels", case=False)
-    df["flask"] = df["content"].str.contains("flask", case=False)
-    df["fastapi"] = df["content"].str.contains("fast ?api", case=False)
-    df["dask"] = df["content"].str.contains("dask", case=False)
-    df["xgboost"] = df["content"].str.contains("xg ?boost|light ?gbm", case=False)
-    df["pyspark"] = df["content"].str.contains("pyspark", case=False)
-    # degrees (4)
-    df["master"] = df["content"].str.contains("(master|diplom)", case=False, regex=True)
-    df["phd"] = df["content"].str.contains("(doktor|phd|promotion)", case=False, regex=True)
-    df["bachelor"] = (df["content"].str.contains("(Studium|degree|Hochschulabschluss|studiert|Studienabschluss|studies|bachelor)", case=False, regex=True)) & ~df["master"]
-    df["no_degree_info"] = ~df["bachelor"] & ~df["master"] & ~df["phd"]
-    # majors (5)
-    df["computer_science"] = df["content"].str.contains("(computer science|informatik|informatics)", case=False, regex=True)
-    df["math/statistics"] = df["content"].str.contains("(math|Statistik|statistics|stats)", case=False, regex=True)
-    df["natural_science"] = df["content"].str.contains("(Physik|physics|Naturwissenschaft|natural science|Chemie|chemistry|Biologie|biology|natur-)", case=False, regex=True)
-    df["engineering"] = df["content"].str.contains("(Ingenieurwesen|Ingenieurwissenschaft|Engineering)", case=False, regex=True)
-    df["business"] = df["content"].str.contains("(bwl|Betriebswirtschaft|vwl|Volkswirtschaft|Wirtschaftswissenschaft)", case=False, regex=True)
-    # knowledge (13)
-    df["machine_learning"] = df["content"].str.contains("(Machine Learning|Machinelle[sn]? Lern)", case=False, regex=True)
-    df["deep_learning"] = df["content"].str.contains("Deep Learning|Neural|Neuronal", case=False, regex=True)
-    df["computer_vision"] = df["content"].str.contains("computer vision|convolution|cnn|image processing|Bildverarbeitung", case=False, regex=True)
-    df["natural_language_processing"] = df["content"].str.contains("nlp|natural language|speech recognition|Spracherkennung", case=False, regex=True)
-    df["autonomous_driving"] = df["content"].str.contains("autonomous driving|autonomes fahren", case=False, regex=True)
-    df["robotics"] = df["content"].str.contains("roboti", case=False, regex=True)
-    df["reinforcement_learning"] = df["content"].str.contains("reinforcement", case=False, regex=True)
-    df["regression"] = df["content"].str.contains("regression", case=False, regex=True)
-    df["classification"] = df["content"].str.contains("classification|Klassifikation|Klassifizierung", case=False, regex=True)
-    df["clustering"] = df["content"].str.contains("cluster", case=False, regex=True)
-    df["forecasting"] = df["content"].str.contains("forecast|time ?series|Zeitreihe", case=False, regex=True)
-    df["recommender_systems"] = df["content"].str.contains("recommender system|recommendation system|Empfehlungssystem", case=False, regex=True)
-    df["anomaly_detection"] = df["content"].str.contains("anomaly|Anomalie", case=False, regex=True)
-    # soft skills (10)
-    df["communication"] = df["content"].str.contains("communication| Kommunikation|storytelling", case=False, regex=True)
-    df["teamwork"] = df["content"].str.contains("teamfähig|teamplay|teamwork|teamorient|interpersonal|zwischenmenschlich", case=False, regex=True)
-    df["motivation"] = df["content"].str.contains("motivation |Neugier|curiosity|lernbereit|to learn|persönlich[\S]* weiterentwick|Engagement|Leidenschaft|passion", case=False, regex=True)
-    df["critical_thinking"] = df["content"].str.contains("(analytisch|struktur|logisch|kritisch)[\S]* denk|(analytic|structur|logic|critical)[\S]* think|Auffassungsgabe|problemlös|problem solv", case=False, regex=True)
-    df["creativity"] = df["content"].str.contains("kreativität|creativity", case=False, regex=True)
-    df["leadership"] = df["content"].str.contains("Führungs(kraft|stärke|kompetenz)|leadership skill|verantwortungsbereit", case=False, regex=True)
-    df["flexibility"] = df["content"].str.contains("belastbarkeit|flexibilit|anpassungsfähig", case=False, regex=True)
-    df["business_focus"] = df["content"].str.contains("unternehmerisch|Geschäftssinn", case=False, regex=True)
-    df["initiative"] = df["content"].str.contains("(selbst|eigen)ständig|eigen(initiative|verantwortung)", case=False, regex=True)
-    df["structured_working"] = df["content"].str.contains("(struktur|strategi|orientiert)[\S]* Arbeit|sorgfalt|sorgfältig|(slebst|Zeit|time )manage", case=False, regex=True)
+    requirements = dict.fromkeys(REQUIREMENT_PATTERNS)
+    for column, pattern in REQUIREMENT_PATTERNS.items():
+        if pattern is not None:
+            requirements[column] = df["content"].str.contains(pattern[0], case=pattern[1], regex=True)
+    requirements["bachelor"] = requirements["bachelor"] & ~requirements["master"]
+    requirements["no_degree_info"] = ~requirements["bachelor"] & ~requirements["master"] & ~requirements["phd"]
+    df = pd.concat([df, pd.DataFrame(requirements, index=df.index)], axis=1)
     return df
 
 
@@ -495,104 +642,50 @@ def extract_experience(df):
         transformed dataframe
     """
 
-    # helper Functions
-    def drop_outliers(x):
-        try:
-            int_value = int(x)
-            if int_value > 10:
-                return np.nan
-            else:
-                return x
-        except ValueError:
-            return x
-
-    def convert_ranges(x):
-        try:
-            splits = x.split("-")
-        except AttributeError:
-            return x
-        try:
-            if len(splits) > 1:
-                return str(int((int(splits[0]) + int(splits[1])) / 2))
-            else:
-                return x
-        except ValueError:
-            return x
-
-    def unify_words(x):
-        try:
-            x = x.lower()
-            return x
-        except AttributeError:
-            return x
-
-    def drop_useless(x):
-        try:
-            int(x)
-            return x
-        except ValueError:
-            if x == "much":
-                return x
-            else:
-                return np.nan
-
-    def convert_keywords(x):
-        if type(x) == float:
-            return x
-        else:
-            if x in ("erste", "first", "initial"):
-                return "little"
-            else:
-                return "some"
-
-    print("extract experience")
     # first pattern
-    pattern = df["content"].str.extract(r"(\S+) ?Jahre?n? ?(Beruf|\S*erfahrung|relevant|praktisch|einschlägig|fundiert|Expertise)", flags=re.IGNORECASE)[0]
+    pattern = df["content"].str.extract(EXPERIENCE_PATTERNS[0], flags=re.IGNORECASE)[0]
     pattern = pattern.apply(drop_outliers)
     pattern = pattern.apply(convert_ranges)
-    pattern = pattern.replace({"ein": "1", "zwei": "2", "drei": "3", "vier": "4", "fünf": "5", "sechs": "6",
-                               "sieben": "7", "acht": "8", "neun": "9", "zehn": "10"})
+    pattern = pattern.replace(NUMBER_WORDS_DE)
     pattern = pattern.apply(unify_words)
-    pattern = pattern.replace({"einigen": "much", "einige": "much", "mehr": "much", "mehrere": "much"})
+    pattern = pattern.replace(QUANTITY_WORDS_DE)
     pattern = pattern.fillna("")
     digits = pattern.str.extract(r"\D*(\d+)\D*")[0]
     pattern = digits.combine_first(pattern)
     experience = pattern.apply(drop_useless)
     # second pattern
-    pattern = df["content"].str.extract(r"(\S+) ?jährige[rn]? ?(Beruf|\S*erfahrung|,? praktisch|,? relevant|,? einschlägig|,? fundiert|Expertise)", flags=re.IGNORECASE)[0]
+    pattern = df["content"].str.extract(EXPERIENCE_PATTERNS[1], flags=re.IGNORECASE)[0]
     pattern = pattern.where(~(pattern.str.contains("mehr|lang", case=False, regex=True, na=False)), "much")
     pattern = pattern.str.strip("- ")
     pattern = pattern.apply(drop_outliers)
     pattern = pattern.apply(unify_words)
-    pattern = pattern.replace({"ein": "1", "zwei": "2", "drei": "3", "vier": "4", "fünf": "5", "sechs": "6",
-                               "sieben": "7", "acht": "8", "neun": "9", "zehn": "10"})
+    pattern = pattern.replace(NUMBER_WORDS_DE)
     pattern = pattern.apply(drop_useless)
     experience = experience.combine_first(pattern)
     # third pattern
-    pattern = df["content"].str.extract(r"(\S+) ?years?( of)? ?(\S* ?experience|professional|relevant|work|employment|proven|practical)", flags=re.IGNORECASE)[0]
+    pattern = df["content"].str.extract(EXPERIENCE_PATTERNS[2], flags=re.IGNORECASE)[0]
     pattern = pattern.apply(convert_ranges)
     pattern = pattern.fillna("")
     digits = pattern.str.extract(r"\D*(\d+)\D*")[0]
     pattern = digits.combine_first(pattern)
     pattern = pattern.apply(unify_words)
     pattern = pattern.where(~(pattern.str.contains("several|multiple", case=False, regex=True, na=False)), "much")
-    pattern = pattern.replace({"one": "1", "two": "2", "three": "3", "four": "4", "five": "5", "six": "6",
-                               "seven": "7", "eight": "8", "nine": "9", "ten": "10"})
+    pattern = pattern.replace(NUMBER_WORDS_EN)
     pattern = pattern.apply(drop_outliers)
     pattern = pattern.apply(drop_useless)
     experience = experience.combine_first(pattern)
     # fourth pattern
-    pattern = df["content"].str.extract(r"(\S+) ?Berufserfahrung", flags=re.IGNORECASE)[0]
+    pattern = df["content"].str.extract(EXPERIENCE_PATTERNS[3], flags=re.IGNORECASE)[0]
     pattern = pattern.apply(unify_words)
     pattern = pattern.apply(convert_keywords)
     experience = experience.combine_first(pattern)
     # fifth pattern
-    pattern = df["content"].str.extract(r"(\S+) ?(professional|work|working|practical) experience", flags=re.IGNORECASE)[0]
+    pattern = df["content"].str.extract(EXPERIENCE_PATTERNS[4], flags=re.IGNORECASE)[0]
     pattern = pattern.apply(unify_words)
     pattern = pattern.apply(convert_keywords)
     experience = experience.combine_first(pattern)
     # sixth pattern
-    pattern = df["content"].str.extract("(Berufseinstieg|Berufseinsteiger)", flags=re.IGNORECASE)[0]
+    pattern = df["content"].str.extract(EXPERIENCE_PATTERNS[5], flags=re.IGNORECASE)[0]
     pattern = pattern.replace({"Berufseinstieg": "little", "Berufseinsteiger": "little"})
     experience = experience.combine_first(pattern)
     # seventh pattern
@@ -604,12 +697,11 @@ def extract_experience(df):
     pattern = pattern.replace({True: "little", False: np.nan})
     experience = experience.combine_first(pattern)
 
-    experience_bins = experience.replace({"1": "<=2_years_experience", "2": "<=2_years_experience", "3": "3-4_years_experience", "4": "3-4_years_experience", 
-                                      "5": ">=5_years_experience", "6": ">=5_years_experience", "7": ">=5_years_experience", "8": ">=5_years_experience",
-                                      "9": ">=5_years_experience", "10": ">=5_years_experience", "little": "<=2_years_experience", "some": "3-4_years_experience",
-                                      "much": ">=5_years_experience"})
+    experience_bins = experience.replace(EXPERIENCE_BINS)
     experience_bins.fillna("no_experience_information", inplace=True)
-    categories = ["<=2_years_experience", "3-4_years_experience", ">=5_years_experience", "no_experience_information"]
+    categories = EXPERIENCE_CATEGORIES
+    # scikit-learn is only imported here, so that the web app does not load it together with the helper functions
+    from sklearn.preprocessing import OneHotEncoder
     # pd.get_dummies() would only generate one feature for new data points
     experience_dummies = OneHotEncoder(categories=[categories], sparse_output=False, dtype="bool").fit_transform(experience_bins.to_frame())
     experience_dummies = pd.DataFrame(experience_dummies, columns=categories)
@@ -618,6 +710,70 @@ def extract_experience(df):
     return df
 
 
+def drop_outliers(x):
+    """Discards implausible numbers of years (helper function of extract_experience)."""
+
+    try:
+        int_value = int(x)
+        if int_value > 10:
+            return np.nan
+        else:
+            return x
+    except ValueError:
+        return x
+
+
+def convert_ranges(x):
+    """Converts ranges of years into their mean (helper function of extract_experience)."""
+
+    try:
+        splits = x.split("-")
+    except AttributeError:
+        return x
+    try:
+        if len(splits) > 1:
+            return str(int((int(splits[0]) + int(splits[1])) / 2))
+        else:
+            return x
+    except ValueError:
+        return x
+
+
+def unify_words(x):
+    """Converts words to lowercase (helper function of extract_experience)."""
+
+    try:
+        x = x.lower()
+        return x
+    except AttributeError:
+        return x
+
+
+def drop_useless(x):
+    """Discards everything except numbers and 'much' (helper function of extract_experience)."""
+
+    try:
+        int(x)
+        return x
+    except ValueError:
+        if x == "much":
+            return x
+        else:
+            return np.nan
+
+
+def convert_keywords(x):
+    """Converts keywords in front of 'experience' into categories (helper function of extract_experience)."""
+
+    if type(x) == float:
+        return x
+    else:
+        if x in ("erste", "first", "initial"):
+            return "little"
+        else:
+            return "some"
+
+
 def remove_duplicates(df):
     """Removes duplicate job ads.
 
@@ -636,6 +792,35 @@ def remove_duplicates(df):
     return df
 
 
+def remove_seen_duplicates(df, seen):
+    """Removes duplicate job ads, also with regard to job ads of previous chunks.
+
+    Uses the same columns as remove_duplicates, but only keeps 64-bit hashes of them in memory.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        original dataframe
+    seen: numpy.ndarray
+        sorted hashes of all previously kept job ads
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        transformed dataframe
+    seen: numpy.ndarray
+        sorted hashes of all kept job ads including the current ones
+    """
+
+    compared = df.drop(["link", "title", "content", "release_date"], axis=1)
+    # the data types of a column can differ between chunks
+    compared = compared.astype({column: "float64" for column in compared.select_dtypes("number").columns})
+    hashes = pd.util.hash_pandas_object(compared.astype("str"), index=False).to_numpy()
+    keep = ~pd.Series(hashes).duplicated().to_numpy() & ~np.isin(hashes, seen)
+    seen = np.union1d(seen, hashes[keep])
+    return df.loc[keep], seen
+
+
 def preprocess_data(df):
     """Preprocesses the input data for the prediction model.
     
@@ -661,21 +846,19 @@ def preprocess_data(df):
     df = extract_experience_level(df)
     df, _ = extract_locations(df)
     df = create_location_features(df, None, None)
-    geo_df = pd.read_csv("data/geo_data.csv")
     query = df["main_location"].iloc[0]
-    response = geo_df.loc[(geo_df["name"] == query) & (geo_df["type"] == "locality") & (geo_df["confidence"] == 1)]
+    response = geocode_location(query, "data")
     # the code in the comments can be used to get the location data from the Positionstack API when executed locally
     # when used in the published streamlit app I decided to only use the data from the Positionstack API that I already saved in the data folder
-    if response.empty:
-        # response = positionstack.get_location(query, config.positionstack_key)
-        # if "region" in response.columns:
-        #     if (response["type"].iloc[0] == "locality") & response["confidence"].iloc[0] == 1:
-        #         df["main_region"] = response["region"].iloc[0]
+    if response is None:
+        # record = positionstack.get_location(positionstack.create_session(), query, config.positionstack_key)
+        # if record is not None and record.get("type") == "locality" and record.get("confidence") == 1:
+        #     df["main_region"] = record["region"]
         # else:
         #     df["main_region"] = np.nan
         df["main_region"] = np.nan
     else:
-        df["main_region"] = response["region"].iloc[0]
+        df["main_region"] = response.region
     df = convert_industries(df)
     df = convert_company_size(df)
     df = extract_requirements(df)
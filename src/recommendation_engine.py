@@ -0,0 +1,258 @@
+"""
+This script contains the matching engine for the job recommendation of the web app.
+
+The filters of the recommendation (experience, degree and company size) are precomputed as bitmap indexes, i.e. one
+bit-packed row mask per option of each filter. A query combines the bitmaps of the selected options with a bitwise AND
+and scores the remaining jobs with popcounts on the bit-packed skill matrix. Only the best jobs are sorted, so that
+queries over a large number of jobs are answered in milliseconds.
+
+As an alternative to the number of matching skills, jobs can be ranked by a weighted similarity. Each skill is weighted
+by its inverse document frequency (IDF), so that rare skills count more than skills required by almost every job. Jobs
+are ranked by the cosine similarity of their weighted skill vector to the skills of the applicant, reduced by the
+weighted share of required skills that the applicant does not have. All jobs are scored with sparse matrix-vector
+products.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from requirement_cube import SIZE_GROUPS, SIZE_FILTERS
+from skill_matrix import GROUP_COLUMNS, any_flag, count_matches
+
+
+# jobs with less required experience or a lower degree are also included
+EXPERIENCE_OPTIONS = {
+    "Little (<=2 years)": ["no_experience_information", "<=2_years_experience"],
+    "Some (3-4 years)": ["no_experience_information", "<=2_years_experience", "3-4_years_experience"],
+    "Much (>=5 years)": None
+}
+EDUCATION_OPTIONS = {
+    "No Degree": ["no_degree_info"],
+    "Bachelor": ["no_degree_info", "bachelor"],
+    "Master": ["no_degree_info", "master"],
+    "Phd": None
+}
+SCORING_OPTIONS = {"Number of Matches": "matches", "Weighted Similarity": "similarity"}
+# groups of skills that can be selected by the applicant
+SKILL_GROUPS = ["Languages", "Tools", "Databases", "Libraries", "Knowledge", "Soft_skills"]
+# maximum reduction of the similarity if the applicant has none of the required skills
+MISSING_PENALTY = 0.25
+
+
+def create_engine(df, skills):
+    """Creates the bitmap indexes of all filter options.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        general information of the jobs (at least 'title', 'company', 'link' and 'company_size')
+    skills: dict
+        bit-packed requirement flags with the same rows as df
+
+    Returns
+    -------
+    engine: dict
+        bit-packed skill matrix, bitmap per filter option and the information that is displayed for each job
+    """
+
+    num_jobs = len(df)
+    everything = np.ones(num_jobs, dtype=bool)
+    size_groups = df["company_size"].map(SIZE_GROUPS).to_numpy()
+    bitmaps = {}
+    for option, flags in EXPERIENCE_OPTIONS.items():
+        bitmaps["experience", option] = np.packbits(everything if flags is None else any_flag(skills, flags))
+    for option, flags in EDUCATION_OPTIONS.items():
+        bitmaps["education", option] = np.packbits(everything if flags is None else any_flag(skills, flags))
+    bitmaps["company_size", "All"] = np.packbits(everything)
+    for option in SIZE_FILTERS:
+        bitmaps["company_size", option] = np.packbits(size_groups == option)
+    engine = {"skills": skills, "bitmaps": bitmaps, "num_jobs": num_jobs,
+              "similarity": create_similarity_index(skills),
+              "info": df[["title", "company", "link"]].reset_index(drop=True)}
+    return engine
+
+
+def create_similarity_index(skills):
+    """Creates the sparse IDF-weighted job x skill matrix for the weighted similarity.
+
+    Parameters
+    ----------
+    skills: dict
+        bit-packed requirement flags
+
+    Returns
+    -------
+    index: dict
+        names of the skills, IDF weight per skill, weighted sparse matrix and the norm and the sum of the weights of each
+        job
+    """
+
+    columns = [column for group in SKILL_GROUPS for column in GROUP_COLUMNS[group]]
+    flags = np.unpackbits(skills["bits"], axis=1, count=len(skills["columns"]))
+    flags = flags[:, [skills["columns"].index(column) for column in columns]]
+    matrix = sparse.csr_matrix(flags, dtype=np.float64)
+    num_jobs = matrix.shape[0]
+    document_frequency = np.bincount(matrix.indices, minlength=len(columns))
+    # smoothed IDF as in scikit-learn's TfidfTransformer
+    idf = np.log((1 + num_jobs) / (1 + document_frequency)) + 1
+    matrix = matrix.multiply(idf).tocsr()
+    index = {"columns": columns, "idf": idf, "matrix": matrix,
+             "norms": np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()),
+             "weights": np.asarray(matrix.sum(axis=1)).ravel()}
+    return index
+
+
+def similarity_scores(index, query):
+    """Calculates the weighted similarity of all jobs to the skills of the applicant.
+
+    Parameters
+    ----------
+    index: dict
+        sparse IDF-weighted job x skill matrix
+    query: list
+        names of the skills of the applicant
+
+    Returns
+    -------
+    scores: numpy.ndarray
+        cosine similarity minus MISSING_PENALTY times the weighted share of missing skills (one score per job)
+    """
+
+    selected = np.isin(index["columns"], query).astype(np.float64)
+    query_vector = index["idf"] * selected
+    query_norm = np.sqrt(query_vector @ query_vector)
+    # the weighted skill vectors of the jobs contain the IDF weight once, the query vector adds it a second time
+    products, matched = (index["matrix"] @ np.column_stack([query_vector, selected])).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cosine = np.where(index["norms"] * query_norm > 0, products / (index["norms"] * query_norm), 0)
+        missing = np.where(index["weights"] > 0, 1 - matched / index["weights"], 0)
+    scores = cosine - MISSING_PENALTY * missing
+    return scores
+
+
+def filter_jobs(engine, experience, education, company_size):
+    """Selects all jobs that fit the specified experience, degree and company size.
+
+    Parameters
+    ----------
+    engine: dict
+        matching engine
+    experience: str
+        option of EXPERIENCE_OPTIONS
+    education: str
+        option of EDUCATION_OPTIONS
+    company_size: str
+        "All" or option of SIZE_FILTERS
+
+    Returns
+    -------
+    positions: numpy.ndarray
+        positions of the selected jobs
+    """
+
+    bitmaps = engine["bitmaps"]
+    bitmap = (bitmaps["experience", experience] & bitmaps["education", education]
+              & bitmaps["company_size", company_size])
+    positions = np.flatnonzero(np.unpackbits(bitmap, count=engine["num_jobs"]))
+    return positions
+
+
+def top_jobs(scores, k=None):
+    """Selects the k jobs with the highest scores.
+
+    Only the k best jobs are sorted (partial selection with argpartition). Jobs with equal scores keep their order.
+
+    Parameters
+    ----------
+    scores: numpy.ndarray
+        score of each job
+    k: int
+        maximum number of jobs (all jobs if None)
+
+    Returns
+    -------
+    order: numpy.ndarray
+        positions of the selected jobs within scores, sorted by descending score
+    """
+
+    selected = np.arange(len(scores))
+    if k is not None and k < len(scores):
+        # the k-th best score is the threshold, jobs with the same score are kept in their order
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        best = np.flatnonzero(scores > threshold)
+        ties = np.flatnonzero(scores == threshold)[:k - len(best)]
+        selected = np.sort(np.concatenate([best, ties]))
+    order = selected[np.argsort(-scores[selected], kind="stable")]
+    return order
+
+
+def recommend(engine, experience, education, company_size, query, min_matches, k=None, scoring="matches"):
+    """Ranks all jobs that fit the filters by their similarity to the skills of the applicant.
+
+    Parameters
+    ----------
+    engine: dict
+        matching engine
+    experience: str
+        option of EXPERIENCE_OPTIONS
+    education: str
+        option of EDUCATION_OPTIONS
+    company_size: str
+        "All" or option of SIZE_FILTERS
+    query: list
+        names of the skills of the applicant
+    min_matches: int
+        minimum number of matching skills
+    k: int
+        maximum number of jobs to be returned (all jobs if None)
+    scoring: str
+        "matches" to rank by the number of matching skills or "similarity" to rank by the weighted similarity
+
+    Returns
+    -------
+    num_jobs: int
+        number of jobs that fit the criteria
+    df: pandas.DataFrame
+        best jobs with the number of matches (and the score), the matching skills and title, company and link
+    """
+
+    positions = filter_jobs(engine, experience, education, company_size)
+    matches = count_matches(engine["skills"], query)[positions]
+    relevant = matches >= min_matches
+    positions, matches = positions[relevant], matches[relevant]
+    if scoring == "similarity":
+        scores = similarity_scores(engine["similarity"], query)[positions]
+    else:
+        scores = matches
+    order = top_jobs(scores, k)
+    df = create_display(engine, positions[order], query)
+    if scoring == "similarity":
+        df.insert(0, "score", scores[order].round(3))
+    df.insert(0, "matches", matches[order])
+    return len(positions), df
+
+
+def create_display(engine, positions, query):
+    """Collects the information of the selected jobs that is displayed in the web app.
+
+    Parameters
+    ----------
+    engine: dict
+        matching engine
+    positions: numpy.ndarray
+        positions of the selected jobs
+    query: list
+        names of the skills of the applicant
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        requirement flags of the query and title, company and link of the selected jobs
+    """
+
+    columns = engine["skills"]["columns"]
+    flags = np.unpackbits(engine["skills"]["bits"][positions], axis=1, count=len(columns)).astype(bool)
+    flags = pd.DataFrame(flags[:, [columns.index(column) for column in query]], columns=query)
+    df = pd.concat([flags, engine["info"].iloc[positions].reset_index(drop=True)], axis=1)
+    return df
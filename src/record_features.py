@@ -0,0 +1,303 @@
+"""
+This script contains a fast feature extraction for single job ads, which is used for the online salary estimation.
+
+Instead of pushing a one-row dataframe through the pandas pipeline of preprocessing.py, a single job ad is processed
+as plain dictionary with precompiled patterns. The results are identical to 'preprocessing.preprocess_data'.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from geo_index import geocode_location
+from patterns import (TITLE_CATEGORIES, EXPERIENCE_LEVELS, COMPANY_SIZES, REQUIREMENT_PATTERNS, EXPERIENCE_PATTERNS,
+                      NUMBER_WORDS_DE, NUMBER_WORDS_EN, QUANTITY_WORDS_DE, EXPERIENCE_BINS, EXPERIENCE_CATEGORIES)
+from preprocessing import drop_outliers, convert_ranges, unify_words, drop_useless, convert_keywords
+
+
+PERMANENT_EMPLOYMENT = re.compile("Feste Anstellung")
+TRAINEE = re.compile("Trainee")
+FULL_TIME = re.compile("Vollzeit")
+PART_TIME = re.compile("Teilzeit")
+HOME_OFFICE = re.compile("Home Office möglich")
+TITLES = [(category, re.compile(pattern, re.IGNORECASE)) for category, pattern in TITLE_CATEGORIES.items()]
+LEVELS = [(level, re.compile(pattern, re.IGNORECASE)) for level, pattern in EXPERIENCE_LEVELS.items()]
+REQUIREMENTS = [(column, re.compile(pattern[0], 0 if pattern[1] else re.IGNORECASE))
+                for column, pattern in REQUIREMENT_PATTERNS.items() if pattern is not None]
+EXPERIENCE = [re.compile(pattern, re.IGNORECASE) for pattern in EXPERIENCE_PATTERNS]
+DIGITS = re.compile(r"\D*(\d+)\D*")
+MUCH_DE = re.compile("mehr|lang", re.IGNORECASE)
+MUCH_EN = re.compile("several|multiple", re.IGNORECASE)
+EXPERIENCE_LEVEL = re.compile("(Junior|Senior)", re.IGNORECASE)
+
+# steps of preprocessing.extract_locations
+LOCATION_SPLITS = [re.compile(pattern) for pattern in [", ?", " ?/ ?", " oder ", " und ", " - ", "; ", r" ?\+ ?"]]
+LOCATION_REPLACEMENTS = [
+    (re.compile("^Raum "), ""),
+    (re.compile(r" \(?(bei|b\.|an|am|a\.|ob|in|im|vor|v\.|\+|%|u\.a\.|Raum)[)\w\d .]+"), ""),
+    (re.compile(r"[ \w-]*(Home|Office|Mobile|Remote|Bundes|Deutschland|Wahl|Standort|DACH|keine Angabe)[( \w-]*",
+                re.IGNORECASE), "bundesweit"),
+    (re.compile(r" ?(a\.M\.|Main|M\.|\.\.\.und weitere|Gutenbergquartier)$"), ""),
+    (re.compile(r"(MBTI|bei|\d{5}|Metropolregion|Fürstentum|Großraum|100%) ?"), ""),
+]
+LOCATION_BRACKETS = re.compile(r" \(")
+LOCATION_PREFIXES = re.compile("^(Bad|Sankt|Palma|New|Den|Schwäbisch|Lindau) ")
+ERROR_CONTRACT_TYPE = "only permanent employment or trainee positions are supported"
+
+
+def contains(pattern, text):
+    """Checks if a pattern occurs in a text (equivalent of pandas.Series.str.contains for a single value).
+
+    Parameters
+    ----------
+    pattern: re.Pattern
+        precompiled pattern
+    text: str
+        text to search in
+
+    Returns
+    -------
+    result: bool
+        if the pattern occurs (NaN if no text was given)
+    """
+
+    if not isinstance(text, str):
+        return np.nan
+    return pattern.search(text) is not None
+
+
+def extract(pattern, text):
+    """Extracts the first group of a pattern (equivalent of pandas.Series.str.extract for a single value).
+
+    Parameters
+    ----------
+    pattern: re.Pattern
+        precompiled pattern
+    text: str
+        text to search in
+
+    Returns
+    -------
+    result: str
+        content of the first group (NaN if there is no match)
+    """
+
+    if not isinstance(text, str):
+        return np.nan
+    match = pattern.search(text)
+    if match is None or match.group(1) is None:
+        return np.nan
+    return match.group(1)
+
+
+def extract_features(record, directory="data"):
+    """Transforms a single scraped job ad into the features of the prediction model.
+
+    Parameters
+    ----------
+    record: dict
+        scraped information of a job ad (see webscraper.scrape_features)
+    directory: str
+        needed to find the stored data of the Positionstack API
+
+    Returns
+    -------
+    features: dict
+        same columns and values as the result of preprocessing.preprocess_data (None if the contract type is not
+        supported by the model)
+    error: str
+        reason why the features cannot be used by the model (None if there is no error)
+    """
+
+    features = dict(record)
+    # filter_contract_types
+    contract_type = features.pop("contract_type", np.nan)
+    permanent_employment = contains(PERMANENT_EMPLOYMENT, contract_type)
+    trainee = contains(TRAINEE, contract_type)
+    if not (permanent_employment is True or trainee is True):
+        return None, ERROR_CONTRACT_TYPE
+    features["permanent_employment"] = permanent_employment
+    features["trainee"] = trainee
+    # convert_work_types
+    work_type = features.pop("work_type", np.nan)
+    features["full_time"] = contains(FULL_TIME, work_type)
+    features["part_time"] = contains(PART_TIME, work_type)
+    features["home_office_possible"] = contains(HOME_OFFICE, work_type)
+    # convert_title
+    features["title_category"] = classify_title(features["title"])
+    # extract_experience_level
+    features["experience_level"] = "No Information"
+    for level, pattern in LEVELS:
+        if pattern.search(features["title"]):
+            features["experience_level"] = level
+    # extract_locations and create_location_features
+    locations = split_locations(features.pop("location", np.nan))
+    for _ in range(2):
+        if "bundesweit" in locations and len(locations) > 1:
+            locations.remove("bundesweit")
+    features["main_location"] = locations[0]
+    features["multiple_locations"] = len(locations) > 1
+    response = geocode_location(features["main_location"], directory)
+    features["main_region"] = np.nan if response is None else response.region
+    # convert_industries
+    industry = features.pop("industry", np.nan)
+    features["main_industry"] = industry.split("|")[0] if isinstance(industry, str) else np.nan
+    # convert_company_size
+    company_size = features.get("company_size", np.nan)
+    if isinstance(company_size, str):
+        features["company_size"] = COMPANY_SIZES.get(company_size, company_size)
+    # extract_requirements
+    content = features.get("content", np.nan)
+    features.update(extract_requirements(content))
+    # extract_experience
+    experience_bin = extract_experience(content, features["experience_level"], trainee)
+    for category in EXPERIENCE_CATEGORIES:
+        features[category] = experience_bin == category
+    return features, None
+
+
+def classify_title(title):
+    """Classifies a job title into one of the title categories (same steps as preprocessing.convert_title).
+
+    Parameters
+    ----------
+    title: str
+        title of the job ad
+
+    Returns
+    -------
+    category: str
+        title category (the last matching category or "Others")
+    """
+
+    category = "Others"
+    for name, pattern in TITLES:
+        if pattern.search(title):
+            category = name
+    return category
+
+
+def split_locations(location):
+    """Splits a list of locations into individual locations (same steps as preprocessing.extract_locations).
+
+    Parameters
+    ----------
+    location: str
+        locations as specified in the job ad
+
+    Returns
+    -------
+    locations: list
+        individual locations (NaN for empty locations)
+    """
+
+    if not isinstance(location, str):
+        return [np.nan]
+    locations = [location.strip(" ,")]
+    for pattern in LOCATION_SPLITS:
+        locations = [split for element in locations for split in pattern.split(element)]
+    cleaned = []
+    for element in locations:
+        for pattern, replacement in LOCATION_REPLACEMENTS:
+            element = pattern.sub(replacement, element)
+        element = element.replace("St.", "Sankt").replace(".", "")
+        for split in LOCATION_BRACKETS.split(element):
+            if LOCATION_PREFIXES.search(split):
+                cleaned.append(split)
+            else:
+                cleaned.extend(split.split(" "))
+    locations = [element.strip("[ )]") for element in cleaned]
+    locations = [element if element else np.nan for element in locations]
+    return locations
+
+
+def extract_requirements(content):
+    """Extracts the requirements from the text description (same steps as preprocessing.extract_requirements).
+
+    Parameters
+    ----------
+    content: str
+        text description of the job ad
+
+    Returns
+    -------
+    requirements: dict
+        flag per requirement (NaN if no text description was given)
+    """
+
+    requirements = dict.fromkeys(REQUIREMENT_PATTERNS, np.nan)
+    for column, pattern in REQUIREMENTS:
+        requirements[column] = contains(pattern, content)
+    if isinstance(content, str):
+        requirements["bachelor"] = requirements["bachelor"] and not requirements["master"]
+        requirements["no_degree_info"] = (not requirements["bachelor"] and not requirements["master"]
+                                          and not requirements["phd"])
+    return requirements
+
+
+def extract_experience(content, experience_level, trainee):
+    """Extracts the required professional experience (same steps as preprocessing.extract_experience).
+
+    Parameters
+    ----------
+    content: str
+        text description of the job ad
+    experience_level: str
+        experience level captured from the job title
+    trainee: bool
+        if the job is a trainee position
+
+    Returns
+    -------
+    experience_bin: str
+        one of the experience categories
+    """
+
+    # first pattern
+    pattern = extract(EXPERIENCE[0], content)
+    pattern = convert_ranges(drop_outliers(pattern))
+    pattern = unify_words(NUMBER_WORDS_DE.get(pattern, pattern))
+    pattern = QUANTITY_WORDS_DE.get(pattern, pattern)
+    pattern = "" if pd.isna(pattern) else pattern
+    digits = extract(DIGITS, pattern)
+    experience = drop_useless(pattern if pd.isna(digits) else digits)
+    # second pattern
+    if pd.isna(experience):
+        pattern = extract(EXPERIENCE[1], content)
+        if isinstance(pattern, str):
+            pattern = "much" if MUCH_DE.search(pattern) else pattern.strip("- ")
+        pattern = unify_words(drop_outliers(pattern))
+        experience = drop_useless(NUMBER_WORDS_DE.get(pattern, pattern))
+    # third pattern
+    if pd.isna(experience):
+        pattern = convert_ranges(extract(EXPERIENCE[2], content))
+        pattern = "" if pd.isna(pattern) else pattern
+        digits = extract(DIGITS, pattern)
+        pattern = unify_words(pattern if pd.isna(digits) else digits)
+        pattern = "much" if MUCH_EN.search(pattern) else pattern
+        pattern = drop_outliers(NUMBER_WORDS_EN.get(pattern, pattern))
+        experience = drop_useless(pattern)
+    # fourth and fifth pattern
+    for pattern in EXPERIENCE[3:5]:
+        if pd.isna(experience):
+            experience = convert_keywords(unify_words(extract(pattern, content)))
+    # sixth pattern
+    if pd.isna(experience):
+        pattern = extract(EXPERIENCE[5], content)
+        experience = {"Berufseinstieg": "little", "Berufseinsteiger": "little"}.get(pattern, pattern)
+    # seventh pattern
+    if pd.isna(experience):
+        pattern = extract(EXPERIENCE_LEVEL, experience_level)
+        experience = {"Junior": "little", "Senior": "much"}.get(pattern, pattern)
+    # eighth pattern
+    if pd.isna(experience) and trainee is True:
+        experience = "little"
+
+    if pd.isna(experience):
+        return "no_experience_information"
+    experience_bin = EXPERIENCE_BINS.get(experience, experience)
+    if experience_bin not in EXPERIENCE_CATEGORIES:
+        # same behaviour as the OneHotEncoder in preprocessing.extract_experience
+        raise ValueError(f"Found unknown categories ['{experience_bin}'] in column 0 during transform")
+    return experience_bin
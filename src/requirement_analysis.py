@@ -6,17 +6,20 @@ import pandas as pd
 import streamlit as st
 import plotly.express as px
 
+from requirement_cube import EXPERIENCE_FILTERS, SIZE_FILTERS, lookup_percentages
+from skill_matrix import GROUP_COLUMNS
 
-def requirements_analysis(df):
+
+def requirements_analysis(cube):
     """Realizes the requirement analysis of the web app.
 
-    Filters the data according to the specified information and calculates for each of the specified attributes the
-    percentage of jobs where this attribute occurs.
+    Looks up the percentage of jobs where each of the specified attributes occurs for the specified filters in the
+    precomputed aggregate cube.
 
     Parameters
     ----------
-    df: pandas.DatFrame
-        wide format data (contains one entry per job)
+    cube: pandas.DataFrame
+        number of jobs per requirement for every combination of job title, experience level and company size
     """
 
     st.header("Top Requirements for Data Science Jobs")
@@ -24,21 +27,13 @@ def requirements_analysis(df):
              " titles, experience levels and company sizes.")
     st.write("")
     col1, col2 = st.columns(2)
-    choices_jobtitle = ["All"] + list(df["General_info", "title_category"].unique())
-    choices_requirement = ["All"] + list(df.columns.unique(0).drop(["General_info", "Major", "Degree", "Experience"]))
-    choices_experience = ["All", "<=2 Years Experience", "3-4 Years Experience", ">=5 Years Experience"]
-    choices_size = ["All", "Small (0-1,000)", "Medium (1,001-10,000)", "Big (>10,000)"]
-
-    size_groups = {
-        "10,001+": "Big (>10,000)", 
-        "5001-10,000": "Medium (1,001-10,000)", 
-        "2501-5000": "Medium (1,001-10,000)", 
-        "1001-2500": "Medium (1,001-10,000)",
-        "501-1000": "Small (0-1,000)", 
-        "251-500": "Small (0-1,000)", 
-        "51-250": "Small (0-1,000)", 
-        "0-50": "Small (0-1,000)"
-    }
+    titles = cube.index.unique("title_category")
+    choices_jobtitle = ["All"] + list(titles.drop("All"))
+    requirement_groups = {group: columns for group, columns in GROUP_COLUMNS.items()
+                          if group not in ["Major", "Degree", "Experience"]}
+    choices_requirement = ["All"] + list(requirement_groups)
+    choices_experience = ["All"] + EXPERIENCE_FILTERS
+    choices_size = ["All"] + SIZE_FILTERS
 
     with col1:
         selected_requirements = st.selectbox("Which Requirements are you interested in?", choices_requirement)
@@ -49,20 +44,13 @@ def requirements_analysis(df):
         selected_size = st.selectbox("Which company size are you interested in?", choices_size)
 
     if selected_requirements != "All":
-        columns = selected_requirements
+        columns = requirement_groups[selected_requirements]
     else:
-        columns = df.columns.unique(0).drop(["General_info", "Major", "Degree", "Experience"])
-    if selected_experience != "All":
-        df = df.loc[df["Experience", selected_experience.replace(" ", "_").lower()]]
-    if selected_jobtitle != "All":
-        df = df.loc[df["General_info", "title_category"] == selected_jobtitle]
-    if selected_size != "All":
-        df = df.loc[df["General_info", "company_size"].map(size_groups) == selected_size]
-
-    percentages = pd.Series(df[columns].mean() * 100, 
+        columns = [column for group in requirement_groups.values() for column in group]
+
+    percentages = lookup_percentages(cube, selected_jobtitle, selected_experience, selected_size)
+    percentages = pd.Series(percentages[columns],
                             name=selected_requirements).sort_values(ascending=False).to_frame().head(20)
-    if percentages.index.nlevels > 1:
-        percentages = percentages.droplevel(0, axis=0)
 
     percentages.index = percentages.index.str.title()
 
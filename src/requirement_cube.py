@@ -0,0 +1,150 @@
+"""
+This script contains a precomputed aggregate cube for the requirement analysis of the web app.
+
+The requirement analysis can be filtered by job title, experience level and company size. The cube contains the number
+of job ads and the number of job ads per requirement for every combination of these filters (including "All"), so
+that the web app only has to look up a single row instead of filtering all job ads after every change of a filter.
+"""
+
+import numpy as np
+import pandas as pd
+
+from skill_matrix import FLAG_COLUMNS
+
+
+EXPERIENCE_FILTERS = ["<=2 Years Experience", "3-4 Years Experience", ">=5 Years Experience"]
+SIZE_FILTERS = ["Small (0-1,000)", "Medium (1,001-10,000)", "Big (>10,000)"]
+SIZE_GROUPS = {
+    "10,001+": "Big (>10,000)",
+    "5001-10,000": "Medium (1,001-10,000)",
+    "2501-5000": "Medium (1,001-10,000)",
+    "1001-2500": "Medium (1,001-10,000)",
+    "501-1000": "Small (0-1,000)",
+    "251-500": "Small (0-1,000)",
+    "51-250": "Small (0-1,000)",
+    "0-50": "Small (0-1,000)"
+}
+CUBE_INDEX = ["title_category", "experience", "company_size"]
+
+
+def create_cube(df, skills):
+    """Counts the job ads with each requirement for every combination of the filters.
+
+    Job ads of the title category "Others" are not considered, as they are not shown in the web app. The job ads are
+    first aggregated by title, company size and combination of experience levels, the cells of the cube are then
+    calculated from these few groups.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data (contains one entry per job)
+    skills: dict
+        bit-packed requirement flags with the same rows as df
+
+    Returns
+    -------
+    cube: pandas.DataFrame
+        one row per combination of title, experience level and company size with the number of job ads ('num_jobs')
+        and the number of job ads per requirement
+    """
+
+    flags = np.unpackbits(skills["bits"], axis=1, count=len(skills["columns"]))
+    flags = pd.DataFrame(flags, columns=skills["columns"])[FLAG_COLUMNS]
+    flags.insert(0, "num_jobs", 1)
+    relevant = (df["title_category"] != "Others").to_numpy()
+    experience = flags[[level.replace(" ", "_").lower() for level in EXPERIENCE_FILTERS]].to_numpy()
+    keys = pd.DataFrame({"title": df["title_category"].to_numpy(),
+                         "size": df["company_size"].map(SIZE_GROUPS).fillna("").to_numpy(),
+                         "experience": experience @ (1 << np.arange(len(EXPERIENCE_FILTERS)))})
+    groups = flags.loc[relevant].groupby([keys.loc[relevant, column] for column in keys], sort=False).sum()
+    titles = groups.index.get_level_values("title")
+    sizes = groups.index.get_level_values("size")
+    codes = groups.index.get_level_values("experience").to_numpy()
+
+    cells = {}
+    for title in ["All"] + list(titles.unique()):
+        title_rows = np.ones(len(groups), dtype=bool) if title == "All" else (titles == title)
+        for i, level in enumerate(["All"] + EXPERIENCE_FILTERS):
+            level_rows = title_rows if level == "All" else title_rows & ((codes & (1 << (i - 1))) > 0)
+            for size in ["All"] + SIZE_FILTERS:
+                rows = level_rows if size == "All" else level_rows & (sizes == size)
+                cells[(title, level, size)] = groups.loc[rows].sum()
+    cube = pd.DataFrame.from_dict(cells, orient="index", columns=groups.columns).astype(np.int64)
+    cube.index = pd.MultiIndex.from_tuples(cube.index, names=CUBE_INDEX)
+    return cube
+
+
+def add_cubes(cubes):
+    """Combines the cubes of several parts of the data (e.g. of several chunks).
+
+    Parameters
+    ----------
+    cubes: list
+        cubes of disjoint parts of the data
+
+    Returns
+    -------
+    cube: pandas.DataFrame
+        cube of all parts
+    """
+
+    cube = pd.concat(cubes).groupby(level=CUBE_INDEX, sort=False).sum()
+    return cube
+
+
+def save_cube(cube, path):
+    """Saves a cube.
+
+    Parameters
+    ----------
+    cube: pandas.DataFrame
+        aggregate cube
+    path: str
+        path where the cube is saved
+    """
+
+    cube.to_csv(path)
+    return None
+
+
+def load_cube(path):
+    """Loads a saved cube.
+
+    Parameters
+    ----------
+    path: str
+        path to the saved cube
+
+    Returns
+    -------
+    cube: pandas.DataFrame
+        aggregate cube
+    """
+
+    cube = pd.read_csv(path, index_col=CUBE_INDEX)
+    return cube
+
+
+def lookup_percentages(cube, title, experience, size):
+    """Looks up the percentage of job ads with each requirement for a combination of the filters.
+
+    Parameters
+    ----------
+    cube: pandas.DataFrame
+        aggregate cube
+    title: str
+        selected title category or "All"
+    experience: str
+        selected experience level or "All"
+    size: str
+        selected company size or "All"
+
+    Returns
+    -------
+    percentages: pandas.Series
+        percentage of job ads per requirement (missing values if no job ad matches the filters)
+    """
+
+    cell = cube.loc[(title, experience, size)]
+    percentages = cell[FLAG_COLUMNS] / cell["num_jobs"] * 100
+    return percentages
@@ -4,20 +4,27 @@ This script contains the function for the salary estimation of the web app.
 
 import streamlit as st
 
-from webscraper import scrape_features
-from preprocessing import preprocess_data
+from batch_estimation import estimate_salaries, read_links
+from job_cache import get_job_features
+from salary_predictor import predict_salaries
 
 
-def salary_estimation(model):
+def salary_estimation(predictor, cache, store=None):
     """Realizes the salary estimation of the web app.
 
     Scrapes the data of a specified job advertisement on “https://www.stepstone.de”, processes and transforms it
     and then estimates the salary of the job advertisement obased on the available information.
+    Job advertisements that were recently requested (in any session) are taken from the cache instead, and the features
+    of already preprocessed job advertisements are taken from the feature store.
 
     Parameters
     ----------
-    model: sklearn.pipeline.Pipeline
-        trained model used to estimate the salary
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline used to estimate the salary
+    cache: dict
+        cache of recently scraped job ads that is shared by all sessions
+    store: dict
+        feature store of the preprocessed job ads (None to always scrape the job ad)
     """
 
     st.header("Salary Estimation for Data Science Jobs")
@@ -28,23 +35,28 @@ def salary_estimation(model):
     "as any requests from the Streamlit Cloud are blocked by the website.")
     st.write("")
 
+    mode = st.radio("Mode", ["Single Job Ad", "Several Job Ads"], horizontal=True)
+    if mode == "Several Job Ads":
+        batch_estimation(predictor, cache, store)
+        return None
+
     with st.form(key='salary_estimation_form'):
         job_ad = st.text_input("Job Ad", placeholder="Enter the link to the job ad on Stepstone")
         submit_button = st.form_submit_button(label='Estimate Salary')
     
     if submit_button:
-        data = scrape_features(job_ad)
+        data, features = get_job_features(cache, job_ad, store=store)
         if data is None:
             st.write("❌ **Error:** Unfortunately, it was not possible to extract the data from the specified job advertisement.")
+        elif features is None:
+            st.write("❌ **Error:** The model can only estimate salaries for permanent employment or trainee positions.")
         else:
-            data = preprocess_data(data)
-            features = model["imputer"].feature_names_in_
-            salary = model.predict(data[features])[0]
+            salary = predict_salaries(predictor, [features])[0]
 
             results = {}
-            results["Job Title"] = data["title"].iloc[0]
-            results["Company"] = data["company"].iloc[0]
-            results["Location"] = data["main_location"].iloc[0]
+            results["Job Title"] = features["title"]
+            results["Company"] = features["company"]
+            results["Location"] = features["main_location"]
             results["Salary"] = round(salary)
         
             st.write("")
@@ -56,4 +68,39 @@ def salary_estimation(model):
             {'Location:':<{label_width}} {results["Location"]}
             {'Estimated Salary:':<{label_width}} {results["Salary"]:} €
             ```
-            """)    
+            """)
+
+
+def batch_estimation(predictor, cache, store=None):
+    """Realizes the estimation of the salaries of several job ads at once.
+
+    The links can be pasted or uploaded as file. The results can be downloaded as .csv file and contain the reason for
+    every job ad whose salary could not be estimated.
+
+    Parameters
+    ----------
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline used to estimate the salaries
+    cache: dict
+        cache of recently scraped job ads that is shared by all sessions
+    store: dict
+        feature store of the preprocessed job ads (None to always scrape the job ads)
+    """
+
+    with st.form(key="batch_estimation_form"):
+        text = st.text_area("Job Ads", placeholder="Enter the links to the job ads on Stepstone (one per line)")
+        file = st.file_uploader("or upload a file with the links", type=["txt", "csv"])
+        submit_button = st.form_submit_button(label="Estimate Salaries")
+
+    if submit_button:
+        links = read_links(text + "\n" + (file.getvalue().decode("utf-8") if file is not None else ""))
+        if not links:
+            st.write("❌ **Error:** No links to job ads were found.")
+            return None
+        with st.spinner(f"Estimating the salaries of {len(links)} job ads..."):
+            results = estimate_salaries(predictor, links, cache, store=store)
+        st.write(f"The salaries of {results['error'].isna().sum()} of {len(results)} job ads were estimated.")
+        st.dataframe(results)
+        st.download_button("Download Results", results.to_csv(index=False), file_name="salary_estimates.csv",
+                           mime="text/csv")
+    return None
@@ -0,0 +1,255 @@
+"""
+This script compiles the trained salary model into a compact predictor that only needs NumPy.
+
+The model is a scikit-learn pipeline of an imputer, a one-hot encoder and a linear regressor whose target may be
+log-transformed. For such a pipeline, the estimated (transformed) salary is the intercept plus one coefficient per
+feature, which only depends on the category of the feature. The predictor therefore stores one lookup table per
+feature that maps each category to its coefficient. The tables are created with the fitted encoder itself, so that
+dropped and infrequent categories get the same coefficients as in the pipeline. Missing values are replaced by the fill
+value of the imputer, and unknown categories get the coefficient of the encoding of unknown values (nothing with
+handle_unknown='ignore'). The coefficients are summed in the same order as in the sparse matrix product of
+scikit-learn, so that both give the same predictions. Example:
+
+    python src/salary_predictor.py --model models/model.joblib --output models/predictor.json
+"""
+
+import json
+import os
+
+import numpy as np
+
+from arguments import parse_salary_predictor
+
+
+INVERSE_FUNCTIONS = {"identity": lambda x: x, "exp": np.exp}
+# value that is not a category of any feature
+UNKNOWN = "\x00unknown category"
+
+
+def main():
+    """Loads the trained model, compiles it and saves the predictor."""
+
+    import joblib
+
+    args = parse_salary_predictor()
+    predictor = compile_model(joblib.load(args.model))
+    save_predictor(predictor, args.output)
+    print(f"compiled {len(predictor['features'])} features with "
+          f"{sum(len(table) for table in predictor['tables'])} non-zero coefficients")
+    return None
+
+
+def compile_model(model):
+    """Compiles the trained pipeline into lookup tables.
+
+    Parameters
+    ----------
+    model: sklearn.pipeline.Pipeline
+        trained pipeline with the steps 'imputer' (SimpleImputer), 'encoder' (OneHotEncoder) and 'model' (linear
+        regressor, optionally inside a TransformedTargetRegressor with np.log and np.exp)
+
+    Returns
+    -------
+    predictor: dict
+        features, fill value per feature, lookup table (category -> coefficient) per feature, coefficient of unknown
+        categories per feature, intercept and the name of the inverse transformation of the target
+    """
+
+    imputer, encoder, regressor = model["imputer"], model["encoder"], model["model"]
+    inverse_func = "identity"
+    if hasattr(regressor, "regressor_"):
+        if regressor.func is not np.log or regressor.inverse_func is not np.exp:
+            raise ValueError("Only a log-transformed target can be compiled.")
+        inverse_func = "exp"
+        regressor = regressor.regressor_
+    if not hasattr(regressor, "coef_") or np.ndim(regressor.coef_) != 1:
+        raise ValueError("Only linear regressors with a single target can be compiled.")
+    if encoder.handle_unknown == "error":
+        raise ValueError("Only encoders that do not raise errors for unknown categories can be compiled.")
+
+    tables = []
+    unknown = []
+    for i, categories in enumerate(encoder.categories_):
+        # all other features are unknown, so that their columns of the encoding are zero
+        X = np.full((len(categories) + 1, len(encoder.categories_)), UNKNOWN, dtype=object)
+        X[:-1, i] = categories
+        coefficients = encoder.transform(X) @ regressor.coef_
+        # categories without influence on the prediction do not need to be stored
+        tables.append({to_builtin(category): float(coefficient)
+                       for category, coefficient in zip(categories, coefficients) if coefficient != 0})
+        unknown.append(float(coefficients[-1]))
+    predictor = {"features": [str(feature) for feature in imputer.feature_names_in_],
+                 "fill_values": [to_builtin(value) for value in imputer.statistics_],
+                 "tables": tables, "unknown": unknown, "intercept": float(regressor.intercept_),
+                 "inverse_func": inverse_func}
+    return predictor
+
+
+def to_builtin(value):
+    """Converts a NumPy scalar into the corresponding Python object, so that it can be saved as JSON.
+
+    Parameters
+    ----------
+    value: object
+        category or fill value
+
+    Returns
+    -------
+    value: object
+        the same value as bool, int, float or str
+    """
+
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def save_predictor(predictor, path):
+    """Saves the predictor as JSON.
+
+    Parameters
+    ----------
+    predictor: dict
+        compiled predictor
+    path: str
+        path where the predictor is saved
+    """
+
+    # JSON only allows strings as keys, so the lookup tables are saved as lists of pairs
+    saved = dict(predictor, tables=[list(table.items()) for table in predictor["tables"]])
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(saved, file, ensure_ascii=False)
+    return None
+
+
+def load_predictor(path):
+    """Loads a saved predictor.
+
+    Parameters
+    ----------
+    path: str
+        path to the saved predictor
+
+    Returns
+    -------
+    predictor: dict
+        compiled predictor
+    """
+
+    with open(path, encoding="utf-8") as file:
+        predictor = json.load(file)
+    predictor["tables"] = [{category: coefficient for category, coefficient in table} for table in predictor["tables"]]
+    # predictors that were compiled without coefficients for unknown categories ignore them
+    predictor.setdefault("unknown", [0.0] * len(predictor["features"]))
+    return predictor
+
+
+def load_estimator(model_path, predictor_path):
+    """Loads the compiled predictor, or the trained pipeline if the predictor does not belong to it.
+
+    The predictor is compiled from the pipeline again if it is missing or older than the pipeline (e.g. after training a
+    model that cannot be compiled), so that the salaries are never estimated with a previous model. Pipelines that
+    cannot be compiled (e.g. with non-linear regressors or target encoding) are used directly.
+
+    Parameters
+    ----------
+    model_path: str
+        path to the trained pipeline
+    predictor_path: str
+        path to the compiled predictor
+
+    Returns
+    -------
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline (raises FileNotFoundError if neither exists)
+    """
+
+    if not os.path.exists(model_path) or (os.path.exists(predictor_path)
+                                          and os.path.getmtime(predictor_path) >= os.path.getmtime(model_path)):
+        return load_predictor(predictor_path)
+    import joblib
+
+    model = joblib.load(model_path)
+    try:
+        return compile_model(model)
+    except (KeyError, ValueError):
+        return model
+
+
+def linear_score(predictor, record):
+    """Calculates the output of the linear regressor for a single job ad.
+
+    Parameters
+    ----------
+    predictor: dict
+        compiled predictor
+    record: dict
+        features of the job ad (at least all features of the predictor)
+
+    Returns
+    -------
+    score: float
+        intercept plus the coefficients of the categories of the job ad
+    """
+
+    score = 0.0
+    for feature, fill_value, table, unknown in zip(predictor["features"], predictor["fill_values"],
+                                                   predictor["tables"], predictor["unknown"]):
+        value = record[feature]
+        # only NaN is not equal to itself
+        if value != value:
+            value = fill_value
+        score += table.get(value, unknown)
+    return score + predictor["intercept"]
+
+
+def model_features(predictor):
+    """Provides the features that the predictor expects.
+
+    Parameters
+    ----------
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline
+
+    Returns
+    -------
+    features: list
+        names of the features
+    """
+
+    if isinstance(predictor, dict):
+        return predictor["features"]
+    return [str(feature) for feature in predictor.feature_names_in_]
+
+
+def predict_salaries(predictor, records):
+    """Estimates the salaries of several job ads.
+
+    Pipelines that cannot be compiled (e.g. with non-linear regressors or target encoding) predict the salaries
+    themselves.
+
+    Parameters
+    ----------
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline
+    records: list
+        features of the job ads as dictionaries
+
+    Returns
+    -------
+    salaries: numpy.ndarray
+        estimated salary per job ad
+    """
+
+    if not isinstance(predictor, dict):
+        import pandas as pd
+
+        if not records:
+            return np.array([], dtype=np.float64)
+        X = pd.DataFrame.from_records(records, columns=predictor.feature_names_in_)
+        return np.asarray(predictor.predict(X), dtype=np.float64)
+    scores = np.array([linear_score(predictor, record) for record in records], dtype=np.float64)
+    salaries = INVERSE_FUNCTIONS[predictor["inverse_func"]](scores)
+    return salaries
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Local HTTP service for the salary estimation without the web app.
+
+POST requests to '/estimate' contain either links to job ads on Stepstone ({"links": [...]}) or already scraped job ads
+with the fields of webscraper.scrape_features ({"records": [...]}). The answer contains the estimated salary or the
+reason of the error for every job ad ({"results": [{"link": ..., "estimated_salary": ..., "error": ...}, ...]}).
+
+The features are extracted by the threads of the individual requests, while a single background thread estimates the
+salaries: it collects the features of concurrent requests for a short time and estimates them with one call of the
+predictor (micro-batching). GET requests to '/metrics' return the number of requests, job ads and batches, the 50th
+and 99th percentile of the latency and the throughput. Example:
+
+    python src/salary_service.py --port 8080
+    curl -X POST localhost:8080/estimate -d '{"links": ["https://www.stepstone.de/stellenangebote--..."]}'
+"""
+
+import collections
+import concurrent.futures
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from arguments import parse_salary_service
+from batch_estimation import MAX_WORKERS, scrape_link
+from feature_store import update_feature_store
+from job_cache import create_cache
+from record_features import extract_features
+from salary_predictor import load_estimator, model_features, predict_salaries
+
+
+MAX_BATCH_SIZE = 64
+MAX_WAIT = 0.005
+# number of recent requests that are used for the latency percentiles
+LATENCY_WINDOW = 10000
+# number of seconds that are used for the throughput
+THROUGHPUT_WINDOW = 60
+
+
+def main():
+    """Starts the service."""
+
+    args = parse_salary_service()
+    try:
+        server = create_server(args.model, args.predictor, args.port, args.directory, args.batch_size,
+                               args.wait / 1000)
+    except FileNotFoundError:
+        print("Neither a trained model nor a compiled predictor was found.")
+        return None
+    print(f"serving salary estimates on http://localhost:{args.port}/estimate")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(summarize_metrics(server.metrics)))
+    return None
+
+
+def create_server(model_path, predictor_path, port, directory="data", max_batch_size=MAX_BATCH_SIZE, max_wait=MAX_WAIT):
+    """Creates the service and starts the thread that estimates the salaries.
+
+    Parameters
+    ----------
+    model_path: str
+        path to the trained pipeline (used if the compiled predictor is missing or older than the pipeline)
+    predictor_path: str
+        path to the compiled predictor
+    port: int
+        port of the server (0 to choose a free port)
+    directory: str
+        needed to find the stored data of the Positionstack API
+    max_batch_size: int
+        maximum number of job ads that are estimated together
+    max_wait: float
+        maximum number of seconds that the first job ad of a batch waits for further job ads
+
+    Returns
+    -------
+    server: http.server.ThreadingHTTPServer
+        server with the batcher, the feature store, the cache of scraped job ads, the metrics and the directory as
+        additional attributes
+    """
+
+    predictor = load_estimator(model_path, predictor_path)
+    server = ServiceServer(("localhost", port), ServiceHandler)
+    server.directory = directory
+    try:
+        server.store = update_feature_store(directory, model_features(predictor))
+    except ValueError as error:
+        print(f"{error} The feature store is not used.")
+        server.store = None
+    server.cache = create_cache()
+    server.executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+    server.metrics = create_metrics()
+    server.batcher = create_batcher(predictor, max_batch_size, max_wait, server.metrics)
+    return server
+
+
+def create_metrics():
+    """Creates the counters and the recent latencies of the service.
+
+    Returns
+    -------
+    metrics: dict
+        start time, counters (requests, job ads, errors, batches and estimated job ads), recent requests (end time,
+        latency and number of job ads) and lock
+    """
+
+    metrics = {"start": time.monotonic(), "requests": 0, "records": 0, "errors": 0, "batches": 0, "batched_records": 0,
+               "recent": collections.deque(maxlen=LATENCY_WINDOW), "lock": threading.Lock()}
+    return metrics
+
+
+def record_request(metrics, latency, num_records, num_errors):
+    """Adds a finished request to the metrics.
+
+    Parameters
+    ----------
+    metrics: dict
+        metrics of the service
+    latency: float
+        duration of the request in seconds
+    num_records: int
+        number of job ads of the request
+    num_errors: int
+        number of job ads that could not be estimated
+    """
+
+    with metrics["lock"]:
+        metrics["requests"] += 1
+        metrics["records"] += num_records
+        metrics["errors"] += num_errors
+        metrics["recent"].append((time.monotonic(), latency, num_records))
+    return None
+
+
+def summarize_metrics(metrics):
+    """Calculates the latency percentiles and the throughput of the service.
+
+    Parameters
+    ----------
+    metrics: dict
+        metrics of the service
+
+    Returns
+    -------
+    summary: dict
+        counters, mean batch size, 50th and 99th percentile of the latency of the recent requests in milliseconds and
+        the number of requests and job ads per second during the last THROUGHPUT_WINDOW seconds
+    """
+
+    with metrics["lock"]:
+        recent = np.array(metrics["recent"]).reshape(-1, 3)
+        summary = {name: metrics[name] for name in ["requests", "records", "errors", "batches"]}
+        batched_records = metrics["batched_records"]
+    now = time.monotonic()
+    window = min(THROUGHPUT_WINDOW, now - metrics["start"])
+    last = recent[recent[:, 0] >= now - window]
+    summary["mean_batch_size"] = batched_records / summary["batches"] if summary["batches"] else 0
+    summary["p50_ms"] = float(np.percentile(recent[:, 1], 50) * 1000) if len(recent) else None
+    summary["p99_ms"] = float(np.percentile(recent[:, 1], 99) * 1000) if len(recent) else None
+    summary["requests_per_second"] = len(last) / window if window > 0 else 0
+    summary["records_per_second"] = float(last[:, 2].sum()) / window if window > 0 else 0
+    return summary
+
+
+def create_batcher(predictor, max_batch_size, max_wait, metrics):
+    """Creates the queue of the features that wait for their estimation and starts the thread that estimates them.
+
+    Parameters
+    ----------
+    predictor: dict
+        compiled predictor of the trained model
+    max_batch_size: int
+        maximum number of job ads that are estimated together
+    max_wait: float
+        maximum number of seconds that the first job ad of a batch waits for further job ads
+    metrics: dict
+        metrics of the service (the number of batches is counted)
+
+    Returns
+    -------
+    batcher: dict
+        predictor, queue, limits of the batches and metrics
+    """
+
+    batcher = {"predictor": predictor, "queue": queue.Queue(), "max_batch_size": max_batch_size,
+               "max_wait": max_wait, "metrics": metrics}
+    threading.Thread(target=run_batcher, args=(batcher,), daemon=True).start()
+    return batcher
+
+
+def run_batcher(batcher):
+    """Estimates the salaries of the waiting features in batches (runs in a background thread).
+
+    Parameters
+    ----------
+    batcher: dict
+        predictor, queue and limits of the batches
+    """
+
+    while True:
+        pending = [batcher["queue"].get()]
+        size = len(pending[0]["features"])
+        deadline = time.monotonic() + batcher["max_wait"]
+        while size < batcher["max_batch_size"]:
+            try:
+                pending.append(batcher["queue"].get(timeout=max(deadline - time.monotonic(), 0)))
+            except queue.Empty:
+                break
+            size += len(pending[-1]["features"])
+        try:
+            salaries = predict_salaries(batcher["predictor"], [features for item in pending
+                                                               for features in item["features"]])
+        except Exception as error:
+            salaries = None
+            for item in pending:
+                item["error"] = f"{type(error).__name__}: {error}"
+        start = 0
+        for item in pending:
+            if salaries is not None:
+                item["salaries"] = salaries[start:start + len(item["features"])]
+                start += len(item["features"])
+            item["done"].set()
+        with batcher["metrics"]["lock"]:
+            batcher["metrics"]["batches"] += 1
+            batcher["metrics"]["batched_records"] += size
+
+
+def estimate_batched(batcher, features):
+    """Adds features to the queue of the batcher and waits for their estimation.
+
+    Parameters
+    ----------
+    batcher: dict
+        predictor, queue and limits of the batches
+    features: list
+        features of the job ads
+
+    Returns
+    -------
+    salaries: numpy.ndarray
+        estimated salary per job ad (None if the estimation failed)
+    error: str
+        reason why the estimation failed (None if there is no error)
+    """
+
+    item = {"features": features, "done": threading.Event(), "salaries": None, "error": None}
+    batcher["queue"].put(item)
+    item["done"].wait()
+    return item["salaries"], item["error"]
+
+
+def convert_record(record, directory):
+    """Extracts the features of an already scraped job ad without raising errors.
+
+    Parameters
+    ----------
+    record: dict
+        scraped information of the job ad (missing values as null)
+    directory: str
+        needed to find the stored data of the Positionstack API
+
+    Returns
+    -------
+    features: dict
+        features of the prediction model (None if the job ad cannot be estimated)
+    error: str
+        reason why the job ad cannot be estimated (None if there is no error)
+    """
+
+    try:
+        features, error = extract_features({key: (np.nan if value is None else value) for key, value in record.items()},
+                                           directory)
+    except Exception as error:
+        return None, f"{type(error).__name__}: {error}"
+    return features, error
+
+
+class ServiceServer(ThreadingHTTPServer):
+    """Threading server that accepts many concurrent connections."""
+
+    # the default backlog of 5 connections delays clients by the retry of the connection under load
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Answers requests to the salary estimation and the metrics."""
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/metrics":
+            self.send_json(404, {"error": "Unknown path."})
+            return None
+        self.send_json(200, summarize_metrics(self.server.metrics))
+        return None
+
+    def do_POST(self):
+        start = time.monotonic()
+        if self.path.rstrip("/") != "/estimate":
+            self.send_json(404, {"error": "Unknown path."})
+            return None
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            body = json.loads(self.rfile.read(length))
+            links, records = body.get("links"), body.get("records")
+            if not isinstance(links or records, list) or (links and records):
+                raise ValueError
+        except (ValueError, AttributeError):
+            self.send_json(422, {"error": "The body must contain either a list of 'links' or of 'records'."})
+            return None
+        if links:
+            extracted = list(self.server.executor.map(
+                lambda link: scrape_link(self.server.cache, link, self.server.directory, self.server.store), links))
+        else:
+            links = [record.get("link") if isinstance(record, dict) else None for record in records]
+            extracted = [convert_record(record, self.server.directory) if isinstance(record, dict)
+                         else (None, "the record must be an object") for record in records]
+        features = [features for features, _ in extracted if features is not None]
+        salaries, error = estimate_batched(self.server.batcher, features) if features else ([], None)
+        salaries = iter([None] * len(features) if salaries is None else [round(float(salary)) for salary in salaries])
+        results = [{"link": link, "estimated_salary": None if features is None else next(salaries),
+                    "error": error if features is not None else extraction_error}
+                   for link, (features, extraction_error) in zip(links, extracted)]
+        self.send_json(200, {"results": results})
+        record_request(self.server.metrics, time.monotonic() - start, len(results),
+                       sum(result["error"] is not None for result in results))
+        return None
+
+    def send_json(self, status, content):
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        return None
+
+
+if __name__ == "__main__":
+    main()
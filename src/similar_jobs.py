@@ -0,0 +1,263 @@
+"""
+This script contains a nearest-neighbour index to find job ads that are similar to a given job ad.
+
+Each job ad is described by the set of its requirement flags (skills, degree, major, knowledge, soft skills and
+experience), its title category and its company size. The similarity of two job ads is the Jaccard similarity of these
+sets. To avoid comparing a job ad with all other job ads, the index uses MinHash signatures of the sets and
+locality-sensitive hashing (LSH): only job ads that share at least one band of their signature with the queried job ad
+are compared. The band keys are stored as sorted arrays, so that the candidates are found by binary search and the
+index can be saved without the need to rebuild any buckets after loading.
+"""
+
+import numpy as np
+import pandas as pd
+
+from links import normalize_link
+from patterns import TITLE_CATEGORIES
+from recommendation_engine import top_jobs
+from requirement_cube import SIZE_GROUPS, SIZE_FILTERS
+from skill_matrix import FLAG_COLUMNS, POPCOUNT
+
+
+FEATURES = FLAG_COLUMNS + list(TITLE_CATEGORIES) + SIZE_FILTERS
+NUM_PERMUTATIONS = 128
+# four signature values of at most 8 bits each form the 32 bit key of a band
+ROWS_PER_BAND = 4
+NUM_BANDS = NUM_PERMUTATIONS // ROWS_PER_BAND
+# fixed random permutations of the features, so that saved signatures remain valid
+PERMUTATIONS = np.array([np.random.default_rng(seed).permutation(len(FEATURES)) for seed in range(NUM_PERMUTATIONS)])
+# signature value of job ads without any feature
+EMPTY = len(FEATURES)
+
+
+def job_features(df, skills):
+    """Combines the requirement flags, title category and company size of the job ads into bit-packed feature sets.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data (at least the columns 'title_category' and 'company_size')
+    skills: dict
+        bit-packed requirement flags with the same rows as df
+
+    Returns
+    -------
+    bits: numpy.ndarray
+        one bit-packed row of FEATURES per job ad
+    """
+
+    flags = np.unpackbits(skills["bits"], axis=1, count=len(skills["columns"]))
+    flags = flags[:, [skills["columns"].index(column) for column in FLAG_COLUMNS]].astype(bool)
+    titles = df["title_category"].to_numpy()[:, None] == np.array(list(TITLE_CATEGORIES))
+    sizes = df["company_size"].map(SIZE_GROUPS).to_numpy()[:, None] == np.array(SIZE_FILTERS)
+    bits = np.packbits(np.hstack([flags, titles, sizes]), axis=1)
+    return bits
+
+
+def relevant_job_features(df, skills):
+    """Selects the links and feature sets of all job ads that are shown in the web app (title category not "Others").
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data (contains one entry per job)
+    skills: dict
+        bit-packed requirement flags with the same rows as df
+
+    Returns
+    -------
+    links: numpy.ndarray
+        links of the job ads
+    bits: numpy.ndarray
+        bit-packed feature sets of the job ads
+    """
+
+    relevant = (df["title_category"] != "Others").to_numpy()
+    return df["link"].to_numpy(dtype=str)[relevant], job_features(df, skills)[relevant]
+
+
+def minhash_signatures(bits):
+    """Calculates the MinHash signatures of the feature sets.
+
+    For each permutation, the signature contains the position of the first feature of the set in the permuted order.
+
+    Parameters
+    ----------
+    bits: numpy.ndarray
+        bit-packed feature sets
+
+    Returns
+    -------
+    signatures: numpy.ndarray
+        one row of NUM_PERMUTATIONS values per job ad (EMPTY for job ads without any feature)
+    """
+
+    flags = np.unpackbits(bits, axis=1, count=len(FEATURES)).astype(bool)
+    signatures = np.empty((len(flags), NUM_PERMUTATIONS), dtype=np.uint8)
+    for i, permutation in enumerate(PERMUTATIONS):
+        signatures[:, i] = flags[:, permutation].argmax(axis=1)
+    signatures[~flags.any(axis=1)] = EMPTY
+    return signatures
+
+
+def band_keys(signatures):
+    """Combines the signature values of each LSH band into a single key.
+
+    Parameters
+    ----------
+    signatures: numpy.ndarray
+        MinHash signatures
+
+    Returns
+    -------
+    keys: numpy.ndarray
+        one column per band
+    """
+
+    bands = signatures.astype(np.uint32).reshape(len(signatures), NUM_BANDS, ROWS_PER_BAND)
+    keys = (bands * (256 ** np.arange(ROWS_PER_BAND, dtype=np.uint32))).sum(axis=2, dtype=np.uint32)
+    return keys
+
+
+def create_similarity_index(links, bits):
+    """Creates the nearest-neighbour index.
+
+    Parameters
+    ----------
+    links: numpy.ndarray
+        links of the job ads
+    bits: numpy.ndarray
+        bit-packed feature sets of the job ads
+
+    Returns
+    -------
+    index: dict
+        links and feature sets of the job ads as well as the sorted band keys with the corresponding job ads
+    """
+
+    keys = band_keys(minhash_signatures(bits))
+    orders = np.argsort(keys, axis=0, kind="stable").T.astype(np.int32)
+    index = {"links": np.asarray(links, dtype=str), "bits": bits, "orders": orders,
+             "keys": np.take_along_axis(keys, orders.T, axis=0).T}
+    index["positions"] = {normalize_link(link): position for position, link in enumerate(index["links"])}
+    return index
+
+
+def save_similarity_index(index, path):
+    """Saves the nearest-neighbour index.
+
+    Parameters
+    ----------
+    index: dict
+        nearest-neighbour index
+    path: str
+        path where the index is saved
+    """
+
+    np.savez_compressed(path, links=index["links"], bits=index["bits"], orders=index["orders"], keys=index["keys"])
+    return None
+
+
+def load_similarity_index(path):
+    """Loads a saved nearest-neighbour index.
+
+    Parameters
+    ----------
+    path: str
+        path to the saved index
+
+    Returns
+    -------
+    index: dict
+        nearest-neighbour index
+    """
+
+    saved = np.load(path)
+    index = {name: saved[name] for name in ["links", "bits", "orders", "keys"]}
+    index["positions"] = {normalize_link(link): position for position, link in enumerate(index["links"])}
+    return index
+
+
+def find_candidates(index, position):
+    """Finds all job ads that share at least one LSH band with a job ad.
+
+    Parameters
+    ----------
+    index: dict
+        nearest-neighbour index
+    position: int
+        position of the job ad
+
+    Returns
+    -------
+    candidates: numpy.ndarray
+        positions of the candidates (without the job ad itself)
+    """
+
+    query = band_keys(minhash_signatures(index["bits"][[position]]))[0]
+    candidates = []
+    for keys, order, key in zip(index["keys"], index["orders"], query):
+        start, end = np.searchsorted(keys, key, side="left"), np.searchsorted(keys, key, side="right")
+        candidates.append(order[start:end])
+    candidates = np.unique(np.concatenate(candidates))
+    return candidates[candidates != position]
+
+
+def jaccard_similarities(index, position, candidates):
+    """Calculates the Jaccard similarity of a job ad to several other job ads.
+
+    Parameters
+    ----------
+    index: dict
+        nearest-neighbour index
+    position: int
+        position of the job ad
+    candidates: numpy.ndarray
+        positions of the other job ads
+
+    Returns
+    -------
+    similarities: numpy.ndarray
+        Jaccard similarity of the feature sets
+    """
+
+    query = index["bits"][position]
+    other = index["bits"][candidates]
+    intersection = POPCOUNT[other & query].sum(axis=1, dtype=np.int64)
+    union = POPCOUNT[other | query].sum(axis=1, dtype=np.int64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        similarities = np.where(union > 0, intersection / union, 0)
+    return similarities
+
+
+def find_similar_jobs(index, link, k):
+    """Finds the k job ads that are most similar to a given job ad.
+
+    If the LSH candidates contain fewer than k job ads, all job ads are compared with the given job ad.
+
+    Parameters
+    ----------
+    index: dict
+        nearest-neighbour index
+    link: str
+        link of the job ad
+    k: int
+        number of similar job ads
+
+    Returns
+    -------
+    similar: pandas.DataFrame
+        positions and similarities of the most similar job ads, sorted by descending similarity (None if the link is
+        not contained in the index)
+    """
+
+    position = index["positions"].get(normalize_link(link))
+    if position is None:
+        return None
+    candidates = find_candidates(index, position)
+    if len(candidates) < k:
+        candidates = np.delete(np.arange(len(index["links"])), position)
+    similarities = jaccard_similarities(index, position, candidates)
+    best = top_jobs(similarities, k)
+    similar = pd.DataFrame({"position": candidates[best], "similarity": similarities[best]})
+    return similar
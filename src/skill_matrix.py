@@ -0,0 +1,226 @@
+"""
+This script contains a compact bit-packed representation of the requirement flags of all job ads.
+
+Each job ad is stored as one row of bits (one bit per skill, degree, major, knowledge, soft skill and experience flag),
+so 124 flags take 16 bytes per job ad. Counting and filtering is done with bitwise operations and popcounts instead of
+pandas column selections.
+"""
+
+from itertools import accumulate
+
+import numpy as np
+import pandas as pd
+
+from patterns import REQUIREMENT_PATTERNS, EXPERIENCE_CATEGORIES
+
+
+# groups of flags in the order of the columns in the wide format data
+FLAG_GROUPS = [("Languages", 18), ("Tools", 31), ("Databases", 21), ("Libraries", 18), ("Degree", 4), ("Major", 5),
+               ("Knowledge", 13), ("Soft_skills", 10), ("Experience", 4)]
+FLAG_COLUMNS = list(REQUIREMENT_PATTERNS) + EXPERIENCE_CATEGORIES
+# names of the flags per group
+GROUP_COLUMNS = {group: FLAG_COLUMNS[end - size:end]
+                 for (group, size), end in zip(FLAG_GROUPS, accumulate(size for _, size in FLAG_GROUPS))}
+# number of set bits for every possible byte
+POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint8)
+
+
+def pack_flags(df):
+    """Converts the requirement flags of the wide format data into a bit-packed matrix.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        wide format data (contains one entry per job)
+
+    Returns
+    -------
+    matrix: dict
+        links of the job ads, names of the flags and the bit-packed flags (one row per job ad)
+    """
+
+    flags = df[FLAG_COLUMNS].fillna(False).to_numpy(dtype=bool)
+    matrix = {"links": df["link"].to_numpy(dtype=str), "columns": list(FLAG_COLUMNS),
+              "bits": np.packbits(flags, axis=1)}
+    return matrix
+
+
+def unpack_flags(matrix):
+    """Converts a bit-packed matrix back into the layout of the wide format data.
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        one boolean column per flag, grouped by a second column level as in the web app
+    """
+
+    flags = np.unpackbits(matrix["bits"], axis=1, count=len(matrix["columns"])).astype(bool)
+    groups = [group for group, size in FLAG_GROUPS for _ in range(size)]
+    df = pd.DataFrame(flags, columns=pd.MultiIndex.from_arrays([groups, matrix["columns"]]))
+    return df
+
+
+def concat_matrices(matrices):
+    """Combines several bit-packed matrices (e.g. of several chunks) into one.
+
+    Parameters
+    ----------
+    matrices: list
+        bit-packed matrices with the same flags
+
+    Returns
+    -------
+    matrix: dict
+        bit-packed flags of all job ads
+    """
+
+    matrix = {"links": np.concatenate([element["links"] for element in matrices]),
+              "columns": list(FLAG_COLUMNS),
+              "bits": np.concatenate([element["bits"] for element in matrices])}
+    return matrix
+
+
+def save_skill_matrix(matrix, path):
+    """Saves a bit-packed matrix.
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+    path: str
+        path where the matrix is saved
+    """
+
+    np.savez_compressed(path, links=matrix["links"], columns=np.array(matrix["columns"]), bits=matrix["bits"])
+    return None
+
+
+def load_skill_matrix(path):
+    """Loads a bit-packed matrix.
+
+    Parameters
+    ----------
+    path: str
+        path to the saved matrix
+
+    Returns
+    -------
+    matrix: dict
+        bit-packed flags
+    """
+
+    saved = np.load(path)
+    matrix = {"links": saved["links"], "columns": saved["columns"].tolist(), "bits": saved["bits"]}
+    return matrix
+
+
+def select_rows(matrix, rows):
+    """Selects job ads of a bit-packed matrix.
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+    rows: numpy.ndarray
+        boolean mask or positions of the selected job ads
+
+    Returns
+    -------
+    matrix: dict
+        bit-packed flags of the selected job ads
+    """
+
+    matrix = {"links": matrix["links"][rows], "columns": matrix["columns"], "bits": matrix["bits"][rows]}
+    return matrix
+
+
+def column_mask(matrix, columns):
+    """Creates a bit mask with the same layout as a row of the matrix.
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+    columns: list
+        names of the flags to be set
+
+    Returns
+    -------
+    mask: numpy.ndarray
+        bit-packed mask
+    """
+
+    flags = np.isin(matrix["columns"], columns)
+    mask = np.packbits(flags)
+    return mask
+
+
+def count_matches(matrix, columns):
+    """Counts for every job ad how many of the specified flags are set (popcount of the masked rows).
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+    columns: list
+        names of the flags
+
+    Returns
+    -------
+    counts: numpy.ndarray
+        number of set flags per job ad
+    """
+
+    mask = column_mask(matrix, columns)
+    # only the bytes that contain at least one of the flags are considered
+    nonzero = np.flatnonzero(mask)
+    masked = matrix["bits"][:, nonzero] & mask[nonzero]
+    counts = POPCOUNT[masked].sum(axis=1, dtype=np.int64)
+    return counts
+
+
+def any_flag(matrix, columns):
+    """Checks for every job ad if at least one of the specified flags is set.
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+    columns: list
+        names of the flags
+
+    Returns
+    -------
+    rows: numpy.ndarray
+        boolean mask of the job ads
+    """
+
+    rows = (matrix["bits"] & column_mask(matrix, columns)).any(axis=1)
+    return rows
+
+
+def count_flags(matrix, rows=None):
+    """Counts for every flag in how many job ads it is set.
+
+    Parameters
+    ----------
+    matrix: dict
+        bit-packed flags
+    rows: numpy.ndarray
+        boolean mask of the job ads to be considered (all job ads if None)
+
+    Returns
+    -------
+    counts: pandas.Series
+        number of job ads per flag
+    """
+
+    bits = matrix["bits"] if rows is None else matrix["bits"][rows]
+    counts = np.unpackbits(bits, axis=1, count=len(matrix["columns"])).sum(axis=0, dtype=np.int64)
+    counts = pd.Series(counts, index=matrix["columns"])
+    return counts
@@ -0,0 +1,300 @@
+"""
+This script trains the model for the salary estimation (the scripted version of the searches in
+'notebooks/Modeling.ipynb').
+
+The salaried job ads of the feature store (see feature_store.py) are split into training and test data. As in the
+notebook, a fifth of the job ads is used as test data, but it is selected by a checksum of the link instead of randomly,
+so that a job ad stays in the test data when new job ads are added and model_refresh.py holds out the same job ads.
+For every model family of the notebook, a randomized search with cross validation tunes the encoding of the
+features (one-hot encoding or target encoding) together with the hyperparameters of the model. The candidates of a
+search are evaluated in parallel on all cores, and the fitted encoders are cached on disk with the memory of the
+pipeline, so that candidates with the same encoding do not fit it again for every fold. Afterwards, the selected model
+family is trained on the training data with its best parameters and saved (together with the compiled predictor of the
+web app if the model can be compiled), and a report with the scores and durations of all searches is written. Example:
+
+    python src/training.py --directory data --candidates lasso ridge xgboost --final lasso
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+import warnings
+import zlib
+
+import joblib
+import numpy as np
+from category_encoders.target_encoder import TargetEncoder
+from lightgbm import LGBMRegressor
+from sklearn.base import clone
+from sklearn.compose import TransformedTargetRegressor
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.impute import SimpleImputer
+from sklearn.linear_model import Lasso, Ridge, ElasticNet
+from sklearn.metrics import mean_absolute_error
+from sklearn.model_selection import RandomizedSearchCV
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.svm import SVR
+from xgboost import XGBRegressor
+
+from arguments import parse_training
+from feature_store import FEATURES, TARGET, update_feature_store
+from salary_predictor import compile_model, save_predictor
+
+
+# one of HOLDOUT_BUCKETS job ads is held out as test data
+HOLDOUT_BUCKETS = 5
+RANDOM_STATE = 0
+# names of the steps of the saved model (as expected by salary_predictor.compile_model)
+STEP_NAMES = {"ohe": "encoder", "te": "encoder"}
+
+
+def create_candidates():
+    """Creates the model families and the hyperparameters of the searches of the notebook.
+
+    Returns
+    -------
+    candidates: dict
+        model and parameter distributions (without the parameters of the encoding) per model family
+    """
+
+    def log_target(regressor):
+        return TransformedTargetRegressor(regressor, func=np.log, inverse_func=np.exp)
+
+    candidates = {
+        "lasso": (log_target(Lasso()), {"model__regressor__alpha": np.arange(1e-5, 1e-3, 1e-5)}),
+        "ridge": (log_target(Ridge()), {"model__regressor__alpha": np.arange(0.1, 50, 0.1)}),
+        "elastic_net": (log_target(ElasticNet()), {"model__regressor__alpha": np.arange(1e-5, 1e-3, 1e-5),
+                                                   "model__regressor__l1_ratio": np.arange(0.1, 1, 0.01)}),
+        "svr": (SVR(max_iter=10000), {"model__C": [1000, 2500, 5000, 7500, 10000, 20000, 50000, 100000],
+                                      "model__kernel": ["linear", "rbf", "poly"],
+                                      "model__epsilon": [0.0001, 0.001, 0.01, 0.1, 1, 10]}),
+        "random_forest": (RandomForestRegressor(random_state=RANDOM_STATE),
+                          {"model__criterion": ["squared_error", "absolute_error"],
+                           "model__n_estimators": [100, 200, 500, 1000, 2000],
+                           "model__max_depth": [5, 10, 15, 20, 30, None],
+                           "model__max_features": [0.3, 0.5, 0.7, 0.9, 1],
+                           "model__max_samples": [0.3, 0.5, 0.7, 0.9, 1],
+                           "model__min_samples_leaf": [1, 3, 5],
+                           "model__ccp_alpha": [0, 0.5, 1, 5, 10, 20, 50]}),
+        "xgboost": (XGBRegressor(random_state=RANDOM_STATE),
+                    {"model__n_estimators": np.arange(200, 2000, 100),
+                     "model__learning_rate": [0.01, 0.05, 0.1, 0.2],
+                     "model__max_depth": [4, 6, 8, 10, 15, 20],
+                     "model__subsample": [0.3, 0.5, 0.7, 0.9, 1],
+                     "model__colsample_bylevel": [0.5, 0.7, 0.9, 1],
+                     "model__colsample_bytree": [0.5, 0.7, 0.9, 1],
+                     "model__colsample_bynode": [0.5, 0.7, 0.9, 1],
+                     "model__reg_lambda": [0, 1, 3, 5, 10, 20],
+                     "model__reg_alpha": [0, 1, 3, 5, 10, 20],
+                     "model__gamma": [0, 1, 3, 5, 10, 20]}),
+        "lightgbm": (LGBMRegressor(random_state=RANDOM_STATE, verbose=-1),
+                     {"model__colsample_bytree": np.arange(0.1, 1, 0.1),
+                      "model__subsample": np.arange(0.1, 1, 0.1),
+                      "model__learning_rate": np.arange(0.01, 0.1, 0.01),
+                      "model__n_estimators": np.arange(200, 2000, 100),
+                      "model__min_split_gain": np.arange(0, 10, 1),
+                      "model__reg_lambda": np.arange(0, 10, 1),
+                      "model__max_depth": np.arange(5, 20, 2)})
+    }
+    return candidates
+
+
+def main():
+    """Runs the searches, trains and saves the final model and writes the report."""
+
+    warnings.filterwarnings("ignore")
+    args = parse_training()
+    candidates = create_candidates()
+    if args.final not in args.candidates:
+        args.candidates.append(args.final)
+    unknown = [name for name in args.candidates if name not in candidates]
+    if unknown:
+        print(f"Unknown model families: {', '.join(unknown)} (available: {', '.join(candidates)})")
+        return None
+    store = update_feature_store(args.directory, FEATURES)
+    if store is None:
+        print("Needed data was not found in directory.")
+        return None
+    df = store["frame"]
+
+    start = time.perf_counter()
+    X_train, X_test, y_train, y_test = load_training_data(df)
+    report = {"feature_store_version": store["version"], "training_rows": len(X_train), "test_rows": len(X_test),
+              "latest_release_date": select_salaried_jobs(df)["release_date"].max(), "searches": {}}
+    cache = args.cache or tempfile.mkdtemp(prefix="training_cache_")
+    searches = {}
+    for name in args.candidates:
+        print(f"searching {name}")
+        model, distributions = candidates[name]
+        searches[name], report["searches"][name] = run_search(model, distributions, X_train, y_train, args.iterations,
+                                                              args.jobs, cache)
+        print(f"{name}: validation MAE {report['searches'][name]['validation_mae']:.0f} "
+              f"({report['searches'][name]['seconds']:.1f} s)")
+
+    print(f"training {args.final}")
+    fit_start = time.perf_counter()
+    model = create_final_model(searches[args.final].best_estimator_)
+    model.fit(X_train, y_train)
+    report["final"] = {"model": args.final, "test_mae": mean_absolute_error(y_test, model.predict(X_test)),
+                       "seconds": time.perf_counter() - fit_start}
+    report["seconds"] = time.perf_counter() - start
+    if args.cache is None:
+        shutil.rmtree(cache, ignore_errors=True)
+    os.makedirs(os.path.dirname(args.model) or ".", exist_ok=True)
+    joblib.dump(model, args.model)
+    try:
+        save_predictor(compile_model(model), args.predictor)
+        print(f"compiled predictor saved to {args.predictor}")
+    except (KeyError, ValueError):
+        # e.g. tree based models or target encoding
+        print(f"{args.final} cannot be compiled into a predictor for the web app")
+    with open(args.report, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2,
+                  default=lambda value: value.item() if isinstance(value, np.generic) else str(value))
+    print(f"test MAE of {args.final}: {report['final']['test_mae']:.0f}, model saved to {args.model}, "
+          f"report saved to {args.report}")
+    return None
+
+
+def load_training_data(df):
+    """Selects the salaried job ads and splits them into training and test data.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        data of the feature store (contains one entry per job)
+
+    Returns
+    -------
+    X_train: pandas.DataFrame
+        features of the training data
+    X_test: pandas.DataFrame
+        features of the test data
+    y_train: pandas.Series
+        salaries of the training data
+    y_test: pandas.Series
+        salaries of the test data
+    """
+
+    df_train, df_test = split_holdout(select_salaried_jobs(df))
+    return df_train[FEATURES], df_test[FEATURES], df_train[TARGET], df_test[TARGET]
+
+
+def split_holdout(df):
+    """Splits the job ads into the ones used for the training and the held-out ones.
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        salaried job ads of the feature store
+
+    Returns
+    -------
+    df_train: pandas.DataFrame
+        job ads that are used for the training (and the refreshes of the model)
+    df_holdout: pandas.DataFrame
+        job ads that are used to test the model (and to compare the saved and a refreshed model)
+    """
+
+    # in contrast to a random split, the checksum of a link does not change when new job ads are added
+    holdout = df["link"].map(lambda link: zlib.crc32(str(link).encode()) % HOLDOUT_BUCKETS == 0)
+    return df.loc[~holdout], df.loc[holdout]
+
+
+def select_salaried_jobs(df):
+    """Selects the job ads that are used for the salary estimation (job ads with salary and known title category).
+
+    Parameters
+    ----------
+    df: pandas.DataFrame
+        data of the feature store (contains one entry per job)
+
+    Returns
+    -------
+    df: pandas.DataFrame
+        selected job ads
+    """
+
+    df = df.loc[df["title_category"] != "Others"].dropna(subset=[TARGET])
+    return df
+
+
+def run_search(model, distributions, X, y, iterations, jobs, cache):
+    """Tunes the encoding and the hyperparameters of a model family with a randomized search.
+
+    Parameters
+    ----------
+    model: sklearn.base.BaseEstimator
+        model of the family
+    distributions: dict
+        parameter distributions of the model
+    X: pandas.DataFrame
+        features of the training data
+    y: pandas.Series
+        salaries of the training data
+    iterations: int
+        number of sampled candidates
+    jobs: int
+        number of candidates that are evaluated in parallel (-1 for all cores)
+    cache: str
+        directory where the fitted encoders are cached
+
+    Returns
+    -------
+    search: sklearn.model_selection.RandomizedSearchCV
+        fitted search
+    result: dict
+        best parameters, mean absolute error on the training and validation folds and duration of the search
+    """
+
+    onehot_encoding = Pipeline([
+        ("imputer", SimpleImputer(strategy="constant", fill_value="missing_value")),
+        ("ohe", OneHotEncoder(handle_unknown="ignore", drop="if_binary"))
+    ])
+    target_encoding = Pipeline([
+        ("te", TargetEncoder()),
+        ("scaler", StandardScaler())
+    ])
+    pipe = Pipeline([("encoder", None), ("model", clone(model))], memory=joblib.Memory(cache, verbose=0))
+    param_grid = [{"encoder": [onehot_encoding], "encoder__ohe__min_frequency": list(range(1, 10)), **distributions},
+                  {"encoder": [target_encoding], "encoder__te__smoothing": [0.1, 0.5, 1.0, 5.0, 10., 20.],
+                   **distributions}]
+
+    start = time.perf_counter()
+    search = RandomizedSearchCV(pipe, param_grid, n_iter=iterations, scoring="neg_mean_absolute_error",
+                                return_train_score=True, n_jobs=jobs, random_state=RANDOM_STATE)
+    search.fit(X, y)
+    encodings = {id(onehot_encoding): "one-hot encoding", id(target_encoding): "target encoding"}
+    result = {"best_params": {key: (encodings[id(value)] if key == "encoder" else value)
+                              for key, value in search.best_params_.items()},
+              "training_mae": -search.cv_results_["mean_train_score"][search.best_index_],
+              "validation_mae": -search.cv_results_["mean_test_score"][search.best_index_],
+              "seconds": time.perf_counter() - start}
+    return search, result
+
+
+def create_final_model(pipe):
+    """Creates an unfitted model with the steps of the encoding and the model at the top level of the pipeline.
+
+    Parameters
+    ----------
+    pipe: sklearn.pipeline.Pipeline
+        best pipeline of a search (with the encoding as nested pipeline)
+
+    Returns
+    -------
+    model: sklearn.pipeline.Pipeline
+        pipeline with the steps 'imputer' and 'encoder' (one-hot encoding) or 'encoder' and 'scaler' (target
+        encoding) and 'model'
+    """
+
+    steps = [(STEP_NAMES.get(name, name), clone(step)) for name, step in pipe["encoder"].steps]
+    model = Pipeline(steps + [("model", clone(pipe["model"]))])
+    return model
+
+
+if __name__ == "__main__":
+    main()
@@ -2,23 +2,26 @@
 Script to generate the web app.
 """
 
-import joblib
+import os
+import zipfile
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
-from geographical_analysis import geographical_analysis
-from job_recommendation import job_recommendation
-from salary_estimation import salary_estimation
-from requirement_analysis import requirements_analysis
+from requirement_cube import create_cube, load_cube
+from location_counts import create_location_counts, load_location_counts
+from skill_matrix import pack_flags, load_skill_matrix, select_rows
 
 # st.set_page_config(layout="wide")
 
 def main():
-    """Loads the data and implements the functionality of the sidebar."""
+    """Implements the functionality of the sidebar and loads only the data that is required by the selected page.
+
+    The pages are imported when they are opened for the first time, so that the start of the web app does not wait for
+    the dependencies of all pages (e.g. plotly, scipy and scikit-learn).
+    """
 
-    data_long, data_wide = load_data()
-    model = load_model()
     st.sidebar.title("📊 Analyzing the Data Science Job Market in Germany")
     st.sidebar.write("")
     st.sidebar.write("")
@@ -28,55 +31,184 @@ def main():
     st.sidebar.write("")
 
     if options == "Requirements Analysis":
-        requirements_analysis(data_wide)
+        from requirement_analysis import requirements_analysis
+        requirements_analysis(load_requirement_data())
     elif options == "Geographical Analysis":
-        geographical_analysis(data_long)
+        from geographical_analysis import geographical_analysis
+        geographical_analysis(load_location_data())
     elif options == "Salary Estimation":
-        salary_estimation(model)
+        from salary_estimation import salary_estimation
+        salary_estimation(load_model(), load_job_cache(), load_feature_store())
     else:
-        job_recommendation(data_wide)
+        from job_recommendation import job_recommendation
+        job_recommendation(*load_recommendation_data())
 
 
-@st.cache_data
-def load_data():
-    """Loading the required data for the webapp.
+def is_outdated(path, data_path):
+    """Checks whether precomputed data is missing or older than the data it was created from.
 
-    Another column index is added to the long format data to make it easier to group the different requirements.
+    Parameters
+    ----------
+    path: str
+        path to the precomputed data
+    data_path: str
+        path to the data the precomputed data is created from
+
+    Returns
+    -------
+    outdated: bool
+        True if the precomputed data has to be created again
+    """
+
+    return not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(data_path)
+
+
+# The loaders below use st.cache_resource instead of st.cache_data: the data is loaded once per process and the same
+# objects are shared by all sessions without being copied, so the pages must not modify them.
+
+@st.cache_resource
+def load_job_data():
+    """Loads the wide format data and the bit-packed requirement flags.
 
     Returns
     -------
-    df_long: pandas.DataFrame
-        contains one entry per location
     df_wide: pandas.DataFrame
         contains one entry per job
+    skills: dict
+        bit-packed requirement flags with the same rows as df_wide
     """
 
-    df_long = pd.read_csv("data/data_long.csv")
-    df_long = df_long.loc[df_long["title_category"] != "Others"]
     df_wide = pd.read_csv("data/data_wide.csv")
-    df_wide = df_wide.loc[df_wide["title_category"] != "Others"]
-    if "main_region" in df_wide.columns:
-        groups = (21*["General_info"] + 18*["Languages"] + 31*["Tools"] + 21*["Databases"] + 18*["Libraries"] 
-                  + 4*["Degree"] + 5*["Major"] + 13*["Knowledge"] + 10*["Soft_skills"] + 4*["Experience"])
-    else:
-        groups = (20*["General_info"] + 18*["Languages"] + 31*["Tools"] + 21*["Databases"] + 18*["Libraries"] 
-                  + 4*["Degree"] + 5*["Major"] + 13*["Knowledge"] + 10*["Soft_skills"] + 4*["Experience"])
-    df_wide.columns = pd.MultiIndex.from_arrays([groups, df_wide.columns])
-    return df_long, df_wide
+    try:
+        skills = load_skill_matrix("data/skills.npz")
+    except FileNotFoundError:
+        skills = pack_flags(df_wide)
+    # the matrix is created again if it does not belong to the current data
+    if not np.array_equal(skills["links"], df_wide["link"].to_numpy(dtype=str)):
+        skills = pack_flags(df_wide)
+    return df_wide, skills
+
+
+@st.cache_resource
+def load_requirement_data():
+    """Loads the aggregate cube for the requirement analysis.
+
+    The wide format data is only read if the cube has to be created again.
+
+    Returns
+    -------
+    cube: pandas.DataFrame
+        number of jobs per requirement for every combination of the filters of the requirement analysis
+    """
+
+    if is_outdated("data/requirements_cube.csv", "data/data_wide.csv"):
+        return create_cube(*load_job_data())
+    cube = load_cube("data/requirements_cube.csv")
+    return cube
+
+
+@st.cache_resource
+def load_location_data():
+    """Loads the number of jobs per location and title category for the geographical analysis.
+
+    Returns
+    -------
+    location_counts: pandas.DataFrame
+        number of jobs per location and title category (None if no geographic information is available)
+    """
+
+    if is_outdated("data/location_counts.csv", "data/data_long.csv"):
+        df_long = pd.read_csv("data/data_long.csv")
+        return create_location_counts(df_long) if "latitude" in df_long.columns else None
+    location_counts = load_location_counts("data/location_counts.csv")
+    return location_counts
 
 
-@st.cache_data
+@st.cache_resource
+def load_recommendation_data():
+    """Loads the matching engine and the nearest-neighbour index for the job recommendation.
+
+    Returns
+    -------
+    engine: dict
+        matching engine for the job recommendation
+    neighbours: dict
+        nearest-neighbour index with the same jobs as the engine
+    """
+
+    from recommendation_engine import create_engine
+    from similar_jobs import relevant_job_features, create_similarity_index, load_similarity_index
+
+    df_wide, skills = load_job_data()
+    relevant = (df_wide["title_category"] != "Others").to_numpy()
+    try:
+        neighbours = load_similarity_index("data/similar_jobs.npz")
+    except FileNotFoundError:
+        neighbours = None
+    # the index is created again if it does not belong to the current data
+    if neighbours is None or not np.array_equal(neighbours["links"], skills["links"][relevant]):
+        neighbours = create_similarity_index(*relevant_job_features(df_wide, skills))
+    engine = create_engine(df_wide.loc[relevant], select_rows(skills, relevant))
+    return engine, neighbours
+
+
+@st.cache_resource
 def load_model():
-    """Loads the model for the prediction of the salary.
+    """Loads the compiled predictor for the estimation of the salary (see salary_predictor.load_estimator).
+
+    Returns
+    -------
+    predictor: dict or sklearn.pipeline.Pipeline
+        compiled predictor or trained pipeline for the estimation of the salary
+    """
+
+    from salary_predictor import load_estimator
+
+    predictor = load_estimator("models/model.joblib", "models/predictor.json")
+    return predictor
+
+
+@st.cache_resource
+def load_job_cache():
+    """Creates the cache of scraped job ads for the salary estimation that is shared by all sessions.
+
+    Returns
+    -------
+    cache: dict
+        cache of recently scraped job ads
+    """
+
+    from job_cache import create_cache
+
+    cache = create_cache()
+    return cache
+
+
+@st.cache_resource
+def load_feature_store():
+    """Loads the feature store of the preprocessed job ads, so that their salaries are estimated without scraping.
+
+    Only the latest saved version is loaded, new versions are created by the preprocessing. The store is not used if it
+    cannot be read (e.g. a partially written file) or its features do not match the features of the model, which is
+    reported as warning.
 
     Returns
     -------
-    model: sklearn.pipeline.Pipeline
-        model for the prediction of the salary
+    store: dict
+        feature store (None if the store cannot be used)
     """
 
-    model = joblib.load("models/model.joblib")
-    return model
+    from feature_store import load_feature_store
+    from salary_predictor import model_features
+
+    features = model_features(load_model())
+    try:
+        return load_feature_store("data", features=features)
+    except ValueError as error:
+        st.warning(f"{error} The feature store is not used.")
+        return None
+    except (OSError, EOFError, KeyError, zipfile.BadZipFile):
+        return None
 
 
 if __name__ == "__main__":
@@ -11,13 +11,7 @@ import requests
 import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 from tqdm import tqdm
-from webdriver_manager.chrome import ChromeDriverManager
 
 import config
 from arguments import parse_webscraper
@@ -102,6 +96,14 @@ def get_cookies():
         contains all cookies of the session
     """
 
+    # selenium is only needed for the login, so it is not imported together with the scraping functions
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    from webdriver_manager.chrome import ChromeDriverManager
+
     driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
     driver.get(
         "https://www.stepstone.de/candidate/login?login_source=Homepage_top-login&intcid=Button_Homepage"